@@ -4,15 +4,35 @@ sql-composer: A type-safe SQL query builder and composer for Python.
 
 from sql_composer.sql_composer import SqlComposer
 from sql_composer.sql_translator import SqlTranslator
-from sql_composer.db_models import Table, Column
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_cache import QueryCache, CacheStats
+from sql_composer.sql_sink import SqlSink
+from sql_composer.sql_json import JsonCodec, StdlibJsonCodec, OrjsonCodec, fastest_json_codec
+from sql_composer.sql_placeholders import (
+    Placeholders,
+    PercentPlaceholders,
+    NumberedPlaceholders,
+    NamedPlaceholders,
+    QmarkPlaceholders,
+)
+from sql_composer.db_models import Table, Column, ColumnRef
+from sql_composer.sql_observer import SqlObserver, ComposeEvent, CompositeObserver, MetricsAggregator
 from sql_composer.db_conditions import (
     FilterOp,
     Where,
+    RowIn,
     WhereClause,
+    AndGroup,
+    OrGroup,
+    Not,
     Sort,
     SortType,
     Page,
     SqlQueryCriteria,
+    Join,
+    JoinType,
+    Aggregate,
+    AggregateFunc,
 )
 
 __version__ = "0.1.0"
@@ -21,15 +41,44 @@ __all__ = [
     # Core
     "SqlComposer",
     "SqlTranslator",
+    "SqlExecutor",
+    "QueryCache",
+    "CacheStats",
+    "SqlSink",
+    # JSON
+    "JsonCodec",
+    "StdlibJsonCodec",
+    "OrjsonCodec",
+    "fastest_json_codec",
+    # Placeholders
+    "Placeholders",
+    "PercentPlaceholders",
+    "NumberedPlaceholders",
+    "NamedPlaceholders",
+    "QmarkPlaceholders",
     # Models
     "Table",
     "Column",
+    "ColumnRef",
     # Conditions
     "FilterOp",
     "Where",
+    "RowIn",
     "WhereClause",
+    "AndGroup",
+    "OrGroup",
+    "Not",
     "Sort",
     "SortType",
     "Page",
     "SqlQueryCriteria",
+    "Join",
+    "JoinType",
+    "Aggregate",
+    "AggregateFunc",
+    # Observability
+    "SqlObserver",
+    "ComposeEvent",
+    "CompositeObserver",
+    "MetricsAggregator",
 ]
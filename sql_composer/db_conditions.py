@@ -1,6 +1,7 @@
-from typing import List, Any
+from typing import List, Any, Tuple, Union
 from enum import Enum
 from dataclasses import dataclass
+from sql_composer.db_models import Column, ColumnRef, Table
 
 
 # Sort Clause
@@ -13,6 +14,8 @@ class SortType(Enum):
 class Sort:
     field: str
     sort_type: SortType
+    # Rendered as `field COLLATE "<collation>"`, e.g. "C" to sort text by byte order
+    collation: str | None = None
 
 
 # Pagination Clause
@@ -36,10 +39,40 @@ class Where:
     values: List[Any]
 
 
-# WHERE Clause
+@dataclass
+class RowIn:
+    """
+    Several fields compared as a row with a list of value tuples, `(a, b) IN ((1, 'x'), (2, 'y'))`,
+    e.g. to look up a batch of rows by composite key. The fields must be columns of the table.
+    """
+
+    fields: List[str]
+    rows: List[Tuple[Any, ...]]
+
+
+# Boolean groups - nest inside a WhereClause or inside each other
+@dataclass
+class AndGroup:
+    conditions: List["Condition"]
+
+
+@dataclass
+class OrGroup:
+    conditions: List["Condition"]
+
+
+@dataclass
+class Not:
+    condition: "Condition"
+
+
+Condition = Union[Where, RowIn, AndGroup, OrGroup, Not]
+
+
+# WHERE Clause - top level conditions are joined with AND
 @dataclass
 class WhereClause:
-    conditions: List[Where]
+    conditions: List[Condition]
 
 
 # SQL Query Criteria - Wrapper for all query conditions
@@ -48,3 +81,57 @@ class SqlQueryCriteria:
     where: WhereClause | None = None
     sort: List[Sort] | None = None
     page: Page | None = None
+
+
+# JOIN Clause
+class JoinType(Enum):
+    INNER = "INNER"
+    LEFT = "LEFT"
+
+
+@dataclass
+class Join:
+    """
+    Join another table into a SELECT.
+    `on` pairs columns that must be equal. A lateral join runs the joined table as a correlated
+    subquery, so `query_criteria` may also sort and page it (e.g. the latest 3 orders per user);
+    for a plain join only `query_criteria.where` is used and it is added to the ON clause.
+    """
+
+    table: Table
+    alias: str
+    on: List[Tuple[ColumnRef, ColumnRef]]
+    join_type: JoinType = JoinType.INNER
+    lateral: bool = False
+    query_criteria: SqlQueryCriteria | None = None
+
+
+# Aggregates
+class AggregateFunc(Enum):
+    COUNT = "COUNT"
+    SUM = "SUM"
+    AVG = "AVG"
+    MIN = "MIN"
+    MAX = "MAX"
+
+
+@dataclass
+class Aggregate:
+    """
+    An aggregate in the select list, e.g. `SUM(total) FILTER (WHERE status = 'paid') AS paid_total`.
+    COUNT without a column counts rows. The alias defaults to `<func>_<column>` (or `count`);
+    HAVING conditions and sorts refer to the aggregate by its alias.
+    """
+
+    func: AggregateFunc
+    column: Column | None = None
+    alias: str | None = None
+    distinct: bool = False
+    filter: WhereClause | None = None
+
+    @property
+    def name(self) -> str:
+        if self.alias:
+            return self.alias
+        func = self.func.value.lower()
+        return func if self.column is None else f"{func}_{self.column.name}"
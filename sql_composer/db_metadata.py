@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 
 @dataclass
@@ -57,3 +57,54 @@ class PostgresColumnMetadata:
         # Filter out duplicate keys and convert types appropriately
         filtered_data = {k: v for k, v in data.items() if k in cls.__annotations__}
         return cls(**filtered_data)
+
+
+@dataclass
+class PostgresStatStatement:
+    """Represents a row from the pg_stat_statements extension view"""
+
+    query: str
+    calls: int
+    total_exec_time: float
+    mean_exec_time: float
+    rows: int
+    userid: Optional[int] = None
+    dbid: Optional[int] = None
+    queryid: Optional[int] = None
+    min_exec_time: Optional[float] = None
+    max_exec_time: Optional[float] = None
+    stddev_exec_time: Optional[float] = None
+    shared_blks_hit: Optional[int] = None
+    shared_blks_read: Optional[int] = None
+    temp_blks_written: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PostgresStatStatement":
+        """Create a PostgresStatStatement instance from a dictionary."""
+        filtered_data = {k: v for k, v in data.items() if k in cls.__annotations__}
+        return cls(**filtered_data)
+
+
+@dataclass
+class PostgresIndexMetadata:
+    """Represents an index from pg_indexes, with the pg_index/pg_am details needed to judge its use"""
+
+    schemaname: str
+    tablename: str
+    indexname: str
+    indexdef: str
+    access_method: str = "btree"
+    # Indexed columns in key order; expression keys are left out
+    columns: List[str] = field(default_factory=list)
+    opclasses: List[str] = field(default_factory=list)
+    is_unique: bool = False
+    is_primary: bool = False
+    is_valid: bool = True
+    # WHERE clause of a partial index
+    predicate: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PostgresIndexMetadata":
+        """Create a PostgresIndexMetadata instance from a dictionary."""
+        filtered_data = {k: v for k, v in data.items() if k in cls.__annotations__}
+        return cls(**filtered_data)
@@ -10,9 +10,23 @@ class Column:
     type_: Enum
 
 
+@dataclass
+class ColumnRef:
+    """A column qualified by the alias (or name) of the table it is selected from"""
+
+    table_alias: str
+    column: Column
+
+    @property
+    def sql_name(self) -> str:
+        return f"{self.table_alias}.{self.column.name}" if self.table_alias else self.column.name
+
+
 class Table(ABC):
     name: str
     columns: List[Column] = []
+    # Name of the column the rows are hash-sharded by, for tables spread over several databases
+    shard_key: str | None = None
 
     def __init__(self, name: str):
         self.name = name
@@ -5,9 +5,47 @@ PostgreSQL-specific components for sql-composer.
 from sql_composer.pg.pg_translator import PgSqlTranslator
 from sql_composer.pg.pg_data_types import PgDataTypes
 from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_executor import PgExecutor
+from sql_composer.pg.pg_prepared import PgPreparedExecutor
+from sql_composer.pg.pg_router import PgReplicaRouter, Replica
+from sql_composer.pg.pg_shard import PgShardedComposer, ShardMap
+from sql_composer.pg.pg_parallel import PgParallelScanner
+from sql_composer.pg.pg_in_list import InListStrategy, PgInListFilter
+from sql_composer.pg.pg_count import CountStrategy, PgRowCounter
+from sql_composer.pg.pg_batch import PgBatchWriter
+from sql_composer.pg.pg_notify import PgCacheInvalidationListener, PgCacheNotifier, PgNotificationBus
+from sql_composer.pg.pg_index_advisor import AdvisorMode, PgIndexAdvisor
+from sql_composer.pg.pg_workload import PgWorkloadRecorder
+from sql_composer.pg.pg_explain import ExplainPlan, PlanNode, analyze_plan, check_plan_fixture
+from sql_composer.pg.pg_fingerprint import FingerprintRegistry, fingerprint, join_pg_stat_statements
 
 __all__ = [
     "PgSqlTranslator",
     "PgDataTypes",
     "PgFilterOp",
+    "PgExecutor",
+    "PgPreparedExecutor",
+    "PgReplicaRouter",
+    "Replica",
+    "PgShardedComposer",
+    "ShardMap",
+    "PgParallelScanner",
+    "InListStrategy",
+    "PgInListFilter",
+    "CountStrategy",
+    "PgRowCounter",
+    "PgBatchWriter",
+    "PgCacheNotifier",
+    "PgCacheInvalidationListener",
+    "PgNotificationBus",
+    "AdvisorMode",
+    "PgIndexAdvisor",
+    "PgWorkloadRecorder",
+    "ExplainPlan",
+    "PlanNode",
+    "analyze_plan",
+    "check_plan_fixture",
+    "FingerprintRegistry",
+    "fingerprint",
+    "join_pg_stat_statements",
 ]
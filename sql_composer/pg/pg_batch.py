@@ -0,0 +1,151 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Tuple
+from sql_composer.db_models import Column
+from sql_composer.db_conditions import Page, Sort, SortType, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_placeholders import Params
+from sql_composer.sql_ir import (
+    AndNode,
+    ComparisonNode,
+    DeleteNode,
+    InSubqueryNode,
+    Param,
+    PredicateNode,
+    SelectNode,
+    UpdateNode,
+    is_always_false,
+)
+
+"""
+Batched UPDATE and DELETE.
+
+One statement over millions of rows holds its row locks until it commits and
+writes all of its WAL at once. Batching addresses N rows at a time through a
+key-ordered subselect and commits each batch:
+
+    DELETE FROM events
+    WHERE ctid = ANY(ARRAY(
+    SELECT ctid FROM events WHERE expires_at < %s ORDER BY ctid ASC LIMIT 10000
+    ))
+
+Deletes loop until a batch comes back short. Updated rows usually still match
+the WHERE clause, so updates walk the key instead (keyset pagination), using
+RETURNING to find where the next batch starts.
+"""
+
+# Physical row address - addresses rows without an index, in heap order
+CTID = Column("ctid", PgDataTypes.TID)
+
+
+@dataclass
+class BatchResult:
+    rows: int = 0
+    batches: int = 0
+
+
+class PgBatchWriter:
+    def __init__(
+        self,
+        composer: SqlComposer,
+        executor: SqlExecutor,
+        batch_size: int = 10_000,
+        pause: float = 0.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.composer = composer
+        self.executor = executor
+        self.batch_size = batch_size
+        # Seconds to wait between batches, e.g. to let replicas and autovacuum catch up
+        self.pause = pause
+        self._sleep = sleep
+
+    def delete_batch_with_params(self, where: WhereClause | None, key: Column | None = None) -> Tuple[str, Params]:
+        """One batch of the DELETE - the first `batch_size` matching rows by key (ctid by default)"""
+        key = key or CTID
+        node = DeleteNode(table=self.composer.table, where=self._batch(where, key))
+        return self.composer.translator.render(node, parameterized=True)
+
+    def update_batch_with_params(
+        self, key_values: dict[str, Any], where: WhereClause | None, key: Column, after: Any = None
+    ) -> Tuple[str, Params]:
+        """One batch of the UPDATE - the next `batch_size` matching rows with a key greater than `after`"""
+        self._validate_key(key)
+        node = self.composer.build_update(key_values, where)
+        node = UpdateNode(
+            table=node.table,
+            assignments=node.assignments,
+            where=self._batch(where, key, after),
+            returning=[key],
+        )
+        return self.composer.translator.render(node, parameterized=True)
+
+    def delete(self, where: WhereClause | None, key: Column | None = None) -> BatchResult:
+        """Delete all matching rows, one committed batch at a time"""
+        result = BatchResult()
+        if self._never_matches(where):
+            return result
+
+        sql, params = self.delete_batch_with_params(where, key)
+        while True:
+            deleted = self.executor.execute(sql, params)
+            # Each batch is committed, so reads cached since the previous one are stale
+            self.composer.invalidate_cache()
+            result.rows += deleted
+            result.batches += 1
+            if deleted < self.batch_size:
+                return result
+            self._wait()
+
+    def update(self, key_values: dict[str, Any], where: WhereClause | None, key: Column) -> BatchResult:
+        """Update all matching rows in key order, one committed batch at a time. The key must be unique."""
+        result = BatchResult()
+        if self._never_matches(where):
+            return result
+
+        after = None
+        while True:
+            sql, params = self.update_batch_with_params(key_values, where, key, after)
+            keys = [row[0] for row in self.executor.fetch_all(sql, params)]
+            self.composer.invalidate_cache()
+            result.rows += len(keys)
+            result.batches += 1
+            if len(keys) < self.batch_size:
+                return result
+            after = max(keys)
+            self._wait()
+
+    def _batch(self, where: WhereClause | None, key: Column, after: Any = None) -> InSubqueryNode:
+        if key is not CTID:
+            self._validate_key(key)
+        predicate = self.composer.build_write_where(where)
+        if after is not None:
+            cursor = ComparisonNode(key.name, PgFilterOp.GREATER_THAN, [Param(after, key)])
+            children: List[PredicateNode] = [cursor] if predicate is None else [predicate, cursor]
+            predicate = AndNode(children)
+
+        subquery = SelectNode(
+            table=self.composer.table,
+            columns=[key],
+            where=predicate,
+            sort=[Sort(key.name, SortType.ASC)],
+            page=Page(limit=self.batch_size),
+        )
+        # ctid = ANY(ARRAY(...)) is planned as a TID scan, ctid IN (...) as a join
+        return InSubqueryNode(key.name, subquery, array=key is CTID)
+
+    def _validate_key(self, key: Column):
+        if key not in self.composer.table.columns:
+            raise ValueError(f"Unknown key column: {key.name}")
+
+    def _never_matches(self, where: WhereClause | None) -> bool:
+        return is_always_false(self.composer.build_write_where(where))
+
+    def _wait(self):
+        if self.pause > 0:
+            self._sleep(self.pause)
@@ -0,0 +1,137 @@
+import json
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, List, Sequence
+from sql_composer.db_models import Column, ColumnRef
+from sql_composer.db_conditions import Join, SqlQueryCriteria
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+
+"""
+Row count strategies for paginated endpoints.
+
+- exact: SELECT COUNT(*) with the page's WHERE clause, without sort and page.
+- window: COUNT(*) OVER () added to the page query, one round trip for rows and total.
+- estimate: the planner's estimate - pg_class.reltuples for an unfiltered table,
+  otherwise the row estimate of EXPLAIN. Cheap on any table size, but approximate.
+- auto: estimate first and count exactly only when the estimate is below a threshold,
+  so small results get exact totals and huge ones never pay for a full count.
+"""
+
+RELTUPLES_SQL = "SELECT reltuples::bigint FROM pg_class WHERE oid = {}::regclass"
+
+
+class CountStrategy(Enum):
+    EXACT = "exact"
+    WINDOW = "window"
+    ESTIMATE = "estimate"
+    AUTO = "auto"
+
+
+@dataclass
+class CountResult:
+    count: int
+    exact: bool
+    # The strategy that produced the count, never AUTO
+    strategy: CountStrategy
+
+
+@dataclass
+class CountedPage:
+    rows: List[tuple]
+    total: CountResult
+
+
+class PgRowCounter:
+    def __init__(self, composer: SqlComposer, executor: SqlExecutor, auto_threshold: int = 100_000):
+        self.composer = composer
+        self.executor = executor
+        self.auto_threshold = auto_threshold
+
+    def count(
+        self,
+        query_criteria: SqlQueryCriteria | None = None,
+        strategy: CountStrategy = CountStrategy.AUTO,
+        alias: str | None = None,
+        joins: List[Join] | None = None,
+    ) -> CountResult:
+        """Count the rows matching the criteria, joined like the SELECT. Use `select_page()` for the window strategy."""
+        if self.composer.never_matches(query_criteria):
+            return CountResult(count=0, exact=True, strategy=CountStrategy.EXACT)
+
+        match strategy:
+            case CountStrategy.EXACT:
+                return self._exact(query_criteria, alias, joins)
+            case CountStrategy.ESTIMATE:
+                return self._estimate(query_criteria, alias, joins)
+            case CountStrategy.AUTO:
+                estimate = self._estimate(query_criteria, alias, joins)
+                if estimate.count < self.auto_threshold:
+                    return self._exact(query_criteria, alias, joins)
+                return estimate
+            case _:
+                raise ValueError(f"Count strategy {strategy.value} requires a page query, use select_page()")
+
+    def select_page(
+        self,
+        columns: Sequence[Column | ColumnRef],
+        alias: str | None = None,
+        query_criteria: SqlQueryCriteria | None = None,
+        joins: List[Join] | None = None,
+        strategy: CountStrategy = CountStrategy.AUTO,
+    ) -> CountedPage:
+        """Fetch a page of rows together with the total number of matching rows"""
+        if strategy != CountStrategy.WINDOW:
+            sql, params = self.composer.select_with_params(columns, alias, query_criteria, joins)
+            rows = self.executor.fetch_all(sql, params)
+            return CountedPage(rows=rows, total=self.count(query_criteria, strategy, alias, joins))
+
+        sql, params = self.composer.select_with_total_with_params(columns, alias, query_criteria, joins)
+        rows_with_total = self.executor.fetch_all(sql, params)
+        rows = [row[:-1] for row in rows_with_total]
+        if rows_with_total:
+            total = CountResult(count=int(rows_with_total[0][-1]), exact=True, strategy=CountStrategy.WINDOW)
+        elif query_criteria is not None and query_criteria.page is not None and query_criteria.page.offset:
+            # A page past the end has no rows to carry the total
+            total = self._exact(query_criteria, alias, joins)
+        else:
+            total = CountResult(count=0, exact=True, strategy=CountStrategy.WINDOW)
+        return CountedPage(rows=rows, total=total)
+
+    def _exact(
+        self, query_criteria: SqlQueryCriteria | None, alias: str | None, joins: List[Join] | None
+    ) -> CountResult:
+        sql, params = self.composer.count_with_params(query_criteria, alias, joins)
+        rows = self.executor.fetch_all(sql, params)
+        return CountResult(count=int(rows[0][0]), exact=True, strategy=CountStrategy.EXACT)
+
+    def _estimate(
+        self, query_criteria: SqlQueryCriteria | None, alias: str | None, joins: List[Join] | None
+    ) -> CountResult:
+        unfiltered = query_criteria is None or not query_criteria.where or not query_criteria.where.conditions
+        if unfiltered and not joins:
+            placeholders = self.composer.translator.placeholders
+            rows = self.executor.fetch_all(*placeholders.format(RELTUPLES_SQL, [self.composer.table.name]))
+            # reltuples is -1 (0 before PostgreSQL 14) until the table is first vacuumed or analyzed
+            if rows and rows[0][0] is not None and rows[0][0] > 0:
+                return CountResult(count=int(rows[0][0]), exact=False, strategy=CountStrategy.ESTIMATE)
+
+        where = query_criteria.where if query_criteria else None
+        # Planned only: ANALYZE would run the query, and BUFFERS needs ANALYZE before PostgreSQL 13
+        sql, params = self.composer.explain_with_params(
+            self.composer.table.columns[:1],
+            SqlQueryCriteria(where=where),
+            analyze=False,
+            buffers=False,
+            alias=alias,
+            joins=joins,
+        )
+        rows = self.executor.fetch_all(sql, params)
+        return CountResult(count=_plan_rows(rows[0][0]), exact=False, strategy=CountStrategy.ESTIMATE)
+
+
+def _plan_rows(explain_output: Any) -> int:
+    """Top level row estimate of EXPLAIN (FORMAT JSON), as returned parsed or as text"""
+    if isinstance(explain_output, str):
+        explain_output = json.loads(explain_output)
+    return int(explain_output[0]["Plan"]["Plan Rows"])
@@ -43,3 +43,16 @@ class PgDataTypes(Enum):
 
     # UUID type
     UUID = "uuid"
+
+    # Array types
+    TEXT_ARRAY = "text[]"
+    INT_ARRAY = "int[]"
+    BIGINT_ARRAY = "bigint[]"
+    UUID_ARRAY = "uuid[]"
+
+    # System types
+    TID = "tid"
+
+
+# Character types, which full text search and pattern operator classes apply to
+TEXT_TYPES = (PgDataTypes.TEXT, PgDataTypes.VARCHAR, PgDataTypes.CHAR, PgDataTypes.CHARACTER_VARYING)
@@ -0,0 +1,70 @@
+from typing import Any, Iterable, Iterator, List, Sequence
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_placeholders import Params
+
+"""
+SqlExecutor over a DB-API 2.0 connection, e.g. psycopg2.
+"""
+
+
+class PgExecutor(SqlExecutor):
+    def __init__(self, connection: Any, autocommit: bool = True):
+        self.connection = connection
+        # Commit after each statement; disable to manage transactions yourself
+        self.autocommit = autocommit
+
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = [tuple(row) for row in cursor.fetchall()]
+        if self.autocommit:
+            self.connection.commit()
+        return rows
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rowcount = cursor.rowcount
+        if self.autocommit:
+            self.connection.commit()
+        return rowcount
+
+    def copy_rows(self, table: str, columns: List[str], rows: Iterable[Sequence[Any]]) -> int:
+        """
+        COPY rows into a table in text format with psycopg2's `copy_expert`. The rows are
+        formatted as the driver reads them, so a lazy iterable is never materialized.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", _CopyReader(rows))
+            rowcount = cursor.rowcount
+        if self.autocommit:
+            self.connection.commit()
+        return rowcount
+
+
+def copy_field(value: Any) -> str:
+    """A value in COPY text format, NULL as \\N and backslashes and line breaks escaped"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class _CopyReader:
+    """File-like COPY input producing lines from the rows as it is read"""
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self._lines: Iterator[str] = ("\t".join(copy_field(value) for value in row) + "\n" for row in rows)
+        self._buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
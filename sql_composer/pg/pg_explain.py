@@ -0,0 +1,236 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List
+
+"""
+EXPLAIN (FORMAT JSON) plans as a typed tree, with analysis and regression checks.
+
+analyze_plan() points out the usual causes of slow queries: sequential scans,
+row estimates far from the actual rows (stale statistics, correlated columns),
+sorts spilling to disk and the most expensive nodes. plan_shape() reduces a
+plan to its node types, relations and indexes, so a test can compare it with
+a stored fixture and fail when a query silently switches plans.
+"""
+
+
+@dataclass
+class PlanNode:
+    node_type: str
+    startup_cost: float
+    total_cost: float
+    plan_rows: int
+    plan_width: int = 0
+    relation_name: str | None = None
+    alias: str | None = None
+    index_name: str | None = None
+    join_type: str | None = None
+    filter: str | None = None
+    # Set when the plan was EXPLAIN ANALYZEd
+    actual_rows: float | None = None
+    actual_loops: int | None = None
+    actual_total_time: float | None = None
+    rows_removed_by_filter: int | None = None
+    sort_method: str | None = None
+    sort_space_used: int | None = None
+    sort_space_type: str | None = None
+    # Set with BUFFERS
+    shared_hit_blocks: int | None = None
+    shared_read_blocks: int | None = None
+    temp_written_blocks: int | None = None
+    children: List["PlanNode"] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PlanNode":
+        return cls(
+            node_type=data["Node Type"],
+            startup_cost=data.get("Startup Cost", 0.0),
+            total_cost=data.get("Total Cost", 0.0),
+            plan_rows=data.get("Plan Rows", 0),
+            plan_width=data.get("Plan Width", 0),
+            relation_name=data.get("Relation Name"),
+            alias=data.get("Alias"),
+            index_name=data.get("Index Name"),
+            join_type=data.get("Join Type"),
+            filter=data.get("Filter"),
+            actual_rows=data.get("Actual Rows"),
+            actual_loops=data.get("Actual Loops"),
+            actual_total_time=data.get("Actual Total Time"),
+            rows_removed_by_filter=data.get("Rows Removed by Filter"),
+            sort_method=data.get("Sort Method"),
+            sort_space_used=data.get("Sort Space Used"),
+            sort_space_type=data.get("Sort Space Type"),
+            shared_hit_blocks=data.get("Shared Hit Blocks"),
+            shared_read_blocks=data.get("Shared Read Blocks"),
+            temp_written_blocks=data.get("Temp Written Blocks"),
+            children=[cls.from_dict(child) for child in data.get("Plans", [])],
+        )
+
+    def walk(self) -> Iterator["PlanNode"]:
+        """This node and all of its descendants, depth first"""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    @property
+    def estimate_error(self) -> float | None:
+        """How many times the row estimate is off (>= 1), None unless analyzed"""
+        if self.actual_rows is None:
+            return None
+        # Plan Rows is per loop, like Actual Rows
+        estimated = max(self.plan_rows, 1)
+        actual = max(self.actual_rows, 1)
+        return max(estimated / actual, actual / estimated)
+
+    @property
+    def label(self) -> str:
+        label = self.node_type
+        if self.index_name:
+            label += f" using {self.index_name}"
+        if self.relation_name:
+            label += f" on {self.relation_name}"
+        return label
+
+
+@dataclass
+class ExplainPlan:
+    root: PlanNode
+    planning_time: float | None = None
+    execution_time: float | None = None
+
+    def walk(self) -> Iterator[PlanNode]:
+        return self.root.walk()
+
+
+@dataclass
+class PlanIssue:
+    # seq_scan, estimate_error or disk_sort
+    kind: str
+    node: PlanNode
+    message: str
+
+
+@dataclass
+class PlanAnalysis:
+    issues: List[PlanIssue]
+    # The most expensive nodes by their own cost (excluding children), highest first
+    costliest: List[PlanNode]
+
+    def of_kind(self, kind: str) -> List[PlanIssue]:
+        return [issue for issue in self.issues if issue.kind == kind]
+
+
+class PlanRegressionError(ValueError):
+    def __init__(self, differences: List[str]):
+        super().__init__("Plan changed:\n" + "\n".join(differences))
+        self.differences = differences
+
+
+def parse_explain(output: Any) -> ExplainPlan:
+    """Parse EXPLAIN (FORMAT JSON) output, either as decoded by the driver or as text"""
+    if isinstance(output, (str, bytes)):
+        output = json.loads(output)
+    if isinstance(output, list):
+        output = output[0]
+    return ExplainPlan(
+        root=PlanNode.from_dict(output["Plan"]),
+        planning_time=output.get("Planning Time"),
+        execution_time=output.get("Execution Time"),
+    )
+
+
+def _own_cost(node: PlanNode) -> float:
+    return max(node.total_cost - sum(child.total_cost for child in node.children), 0.0)
+
+
+def analyze_plan(plan: ExplainPlan, estimate_error_threshold: float = 10.0, top: int = 3) -> PlanAnalysis:
+    issues = []
+    for node in plan.walk():
+        if node.node_type == "Seq Scan":
+            removed = f", {node.rows_removed_by_filter} rows removed by filter" if node.rows_removed_by_filter else ""
+            issues.append(PlanIssue("seq_scan", node, f"Seq Scan on {node.relation_name}{removed}"))
+
+        error = node.estimate_error
+        if error is not None and error >= estimate_error_threshold:
+            issues.append(
+                PlanIssue(
+                    "estimate_error",
+                    node,
+                    f"{node.label}: estimated {node.plan_rows} rows, actual {node.actual_rows:g} ({error:.0f}x off)",
+                )
+            )
+
+        if node.sort_space_type == "Disk" or (node.sort_method or "").startswith("external"):
+            issues.append(
+                PlanIssue(
+                    "disk_sort",
+                    node,
+                    f"{node.label} spilled to disk ({node.sort_method}, {node.sort_space_used} kB), "
+                    "consider an index on the sort key or more work_mem",
+                )
+            )
+
+    costliest = sorted(plan.walk(), key=_own_cost, reverse=True)[:top]
+    return PlanAnalysis(issues=issues, costliest=costliest)
+
+
+def plan_shape(plan: ExplainPlan | PlanNode) -> Dict[str, Any]:
+    """The plan without costs or row counts - what a plan regression test compares"""
+    node = plan.root if isinstance(plan, ExplainPlan) else plan
+    shape: Dict[str, Any] = {"node_type": node.node_type}
+    if node.relation_name:
+        shape["relation"] = node.relation_name
+    if node.index_name:
+        shape["index"] = node.index_name
+    if node.join_type:
+        shape["join_type"] = node.join_type
+    if node.children:
+        shape["children"] = [plan_shape(child) for child in node.children]
+    return shape
+
+
+def compare_plan_shapes(expected: Dict[str, Any], actual: Dict[str, Any], path: str = "Plan") -> List[str]:
+    """Differences between two plan shapes, one message per changed node"""
+    differences = []
+    own_keys = ("node_type", "relation", "index", "join_type")
+    if any(expected.get(key) != actual.get(key) for key in own_keys):
+        differences.append(f"{path}: expected {_shape_label(expected)}, got {_shape_label(actual)}")
+
+    expected_children = expected.get("children", [])
+    actual_children = actual.get("children", [])
+    if len(expected_children) != len(actual_children):
+        differences.append(f"{path}: expected {len(expected_children)} child nodes, got {len(actual_children)}")
+    common = min(len(expected_children), len(actual_children))
+    for i, (expected_child, actual_child) in enumerate(
+        zip(expected_children[:common], actual_children[:common], strict=True)
+    ):
+        differences.extend(compare_plan_shapes(expected_child, actual_child, f"{path} > {i}"))
+    return differences
+
+
+def check_plan_fixture(plan: ExplainPlan, fixture_path: str, update: bool = False) -> None:
+    """
+    Compare the plan's shape with the fixture and raise PlanRegressionError when it changed.
+    A missing fixture is written, and so is a changed one with `update`.
+    """
+    shape = plan_shape(plan)
+    if update or not os.path.exists(fixture_path):
+        with open(fixture_path, "w") as f:
+            json.dump(shape, f, indent=2)
+            f.write("\n")
+        return
+
+    with open(fixture_path) as f:
+        expected = json.load(f)
+    differences = compare_plan_shapes(expected, shape)
+    if differences:
+        raise PlanRegressionError(differences)
+
+
+def _shape_label(shape: Dict[str, Any]) -> str:
+    label = shape.get("node_type", "nothing")
+    if shape.get("index"):
+        label += f" using {shape['index']}"
+    if shape.get("relation"):
+        label += f" on {shape['relation']}"
+    return label
@@ -1,3 +1,4 @@
+from typing import Dict, Tuple
 from sql_composer.db_conditions import FilterOp
 
 
@@ -81,3 +82,61 @@ class PgFilterOp:
     # Exists operators
     EXISTS = FilterOp(name="EXISTS", sql="EXISTS")
     NOT_EXISTS = FilterOp(name="NOT_EXISTS", sql="NOT EXISTS")
+
+
+# Index access methods that can serve each operator, preferred first.
+# Pattern operators need a trigram opclass (gin_trgm_ops / gist_trgm_ops) on GIN and GiST,
+# and btree only serves them for a left-anchored pattern.
+_INDEX_METHODS: Dict[str, Tuple[str, ...]] = {
+    PgFilterOp.EQUAL.name: ("btree", "hash"),
+    PgFilterOp.LESS_THAN.name: ("btree",),
+    PgFilterOp.LESS_THAN_OR_EQUAL.name: ("btree",),
+    PgFilterOp.GREATER_THAN.name: ("btree",),
+    PgFilterOp.GREATER_THAN_OR_EQUAL.name: ("btree",),
+    PgFilterOp.IN.name: ("btree",),
+    PgFilterOp.BETWEEN.name: ("btree",),
+    PgFilterOp.IS_NULL.name: ("btree",),
+    PgFilterOp.IS_NOT_DISTINCT_FROM.name: ("btree",),
+    PgFilterOp.ANY.name: ("btree",),
+    PgFilterOp.LIKE.name: ("btree", "gin", "gist"),
+    PgFilterOp.ILIKE.name: ("gin", "gist"),
+    PgFilterOp.CONTAINS_STRING.name: ("btree", "gin", "gist"),
+    PgFilterOp.CONTAINS_STRING_CASE_INSENSITIVE.name: ("gin", "gist"),
+    PgFilterOp.REGEXP.name: ("gin", "gist"),
+    PgFilterOp.REGEXP_CASE_INSENSITIVE.name: ("gin", "gist"),
+    PgFilterOp.SIMILAR_TO.name: ("gin", "gist"),
+    PgFilterOp.CONTAINS.name: ("gin",),
+    PgFilterOp.IS_CONTAINED_BY.name: ("gin",),
+    PgFilterOp.OVERLAPS.name: ("gin",),
+    PgFilterOp.JSON_CONTAINS.name: ("gin",),
+    PgFilterOp.JSON_IS_CONTAINED_BY.name: ("gin",),
+    PgFilterOp.JSON_HAS_KEY.name: ("gin",),
+    PgFilterOp.JSON_HAS_ANY_KEY.name: ("gin",),
+    PgFilterOp.JSON_HAS_ALL_KEYS.name: ("gin",),
+    PgFilterOp.OVERLAPS_GEOMETRY.name: ("gist",),
+    PgFilterOp.CONTAINS_GEOMETRY.name: ("gist",),
+    PgFilterOp.IS_CONTAINED_BY_GEOMETRY.name: ("gist",),
+    PgFilterOp.INTERSECTS.name: ("gist",),
+    PgFilterOp.CONTAINS_INET.name: ("gist",),
+    PgFilterOp.IS_CONTAINED_BY_INET.name: ("gist",),
+    PgFilterOp.IS_SUBNET.name: ("gist",),
+    PgFilterOp.IS_SUPERNET.name: ("gist",),
+    PgFilterOp.FULLTEXT_MATCH.name: ("gin", "gist"),
+    PgFilterOp.FULLTEXT_QUERY.name: ("gin", "gist"),
+}
+
+# Operators matching text patterns, which a btree only serves when left-anchored
+PATTERN_OPS = (
+    PgFilterOp.LIKE,
+    PgFilterOp.ILIKE,
+    PgFilterOp.CONTAINS_STRING,
+    PgFilterOp.CONTAINS_STRING_CASE_INSENSITIVE,
+    PgFilterOp.REGEXP,
+    PgFilterOp.REGEXP_CASE_INSENSITIVE,
+    PgFilterOp.SIMILAR_TO,
+)
+
+
+def index_methods(op: FilterOp) -> Tuple[str, ...]:
+    """Index access methods able to serve the operator, empty when no index helps (e.g. negations)"""
+    return _INDEX_METHODS.get(op.name, ())
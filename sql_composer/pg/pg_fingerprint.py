@@ -0,0 +1,293 @@
+import hashlib
+import os
+import re
+import sys
+import threading
+from types import FrameType
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List
+from sql_composer.db_conditions import AndGroup, Condition, Not, OrGroup, RowIn, SqlQueryCriteria, Where
+from sql_composer.db_metadata import PostgresStatStatement
+from sql_composer.sql_observer import ComposeEvent, SqlObserver
+
+"""
+Query fingerprinting compatible with pg_stat_statements.
+
+pg_stat_statements stores each statement with its constants replaced by $n
+placeholders. fingerprint() applies the same normalization to composed SQL,
+so the statements a service composes can be joined with the rows read from
+pg_stat_statements. Placeholder lists are collapsed so IN lists of any length
+share one fingerprint, and the fingerprint counts `= ?` as a one-value IN list,
+which is how PgSqlTranslator renders one.
+"""
+
+PG_STAT_STATEMENTS_SQL = """
+SELECT userid, dbid, queryid, query, calls, total_exec_time, mean_exec_time, min_exec_time,
+       max_exec_time, stddev_exec_time, rows, shared_blks_hit, shared_blks_read, temp_blks_written
+FROM pg_stat_statements
+ORDER BY total_exec_time DESC
+"""
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<string>[EeBbXxUuNn]?'(?:[^']|'')*')
+    | (?P<ident>"(?:[^"]|"")*")
+    | (?P<param>%\([^)]+\)s|%s|\$\d+)
+    | (?P<percent>%%)
+    | (?P<number>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+    | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+    | (?P<space>\s+)
+    | (?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_CONSTANT = "?"
+_CONSTANT_LIST = "?..."
+_CONSTANT_WORDS = {"true", "false"}
+
+
+def _tokens(sql: str) -> List[str]:
+    tokens: List[str] = []
+    for match in _TOKEN_RE.finditer(sql):
+        kind = match.lastgroup
+        text = match.group()
+        match kind:
+            case "comment" | "space":
+                continue
+            case "string" | "param" | "number":
+                # Fold a unary minus into the constant, as the PostgreSQL parser does
+                unary_minus = tokens and tokens[-1] == "-" and (len(tokens) < 2 or _is_operator(tokens[-2]))
+                if kind == "number" and unary_minus:
+                    tokens.pop()
+                tokens.append(_CONSTANT)
+            case "percent":
+                tokens.append("%")
+            case "word":
+                lowered = text.lower()
+                tokens.append(_CONSTANT if lowered in _CONSTANT_WORDS else lowered)
+            case _:
+                tokens.append(text)
+    return tokens
+
+
+def _is_operator(token: str) -> bool:
+    return not (token[0].isalnum() or token[0] in ('"', "_", ")") or token in (_CONSTANT, _CONSTANT_LIST))
+
+
+def _collapse_constant_lists(tokens: List[str]) -> List[str]:
+    """Collapse `( ?, ?, ... )` into `( ?... )` so list lengths don't split fingerprints"""
+    collapsed: List[str] = []
+    i = 0
+    while i < len(tokens):
+        if tokens[i] == "(":
+            j = i + 1
+            while j + 1 < len(tokens) and tokens[j] == _CONSTANT and tokens[j + 1] == ",":
+                j += 2
+            if j + 1 < len(tokens) and tokens[j] == _CONSTANT and tokens[j + 1] == ")":
+                collapsed.extend(["(", _CONSTANT_LIST, ")"])
+                i = j + 2
+                continue
+        collapsed.append(tokens[i])
+        i += 1
+    return collapsed
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Normalize SQL text for fingerprinting.
+    Literals and placeholders become `?`, placeholder lists become `(?...)`,
+    comments and formatting are dropped and keywords are lower-cased.
+    """
+    tokens = _collapse_constant_lists(_tokens(sql))
+    while tokens and tokens[-1] == ";":
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def _fold_memberships(tokens: List[str]) -> List[str]:
+    """
+    Fold `= ?` into `in ( ?... )` and `!= ?` / `<> ?` into `not in ( ?... )`, so a filter on one value
+    shares the fingerprint of the IN lists it is rendered for (an IN of one value renders `= %s`).
+    Assignments in a SET list are left as they are.
+    """
+    folded: List[str] = []
+    in_set = False
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token == "set":
+            in_set = True
+        elif token in ("where", "from", "returning"):
+            in_set = False
+        constant_follows = i + 1 < len(tokens) and tokens[i + 1] == _CONSTANT
+        if token == "=" and constant_follows and not in_set:
+            previous = folded[-1] if folded else ""
+            if previous == "!":
+                folded[-1:] = ["not", "in", "(", _CONSTANT_LIST, ")"]
+                i += 2
+                continue
+            if previous not in ("<", ">", "=", ":"):
+                folded.extend(["in", "(", _CONSTANT_LIST, ")"])
+                i += 2
+                continue
+        if token == ">" and constant_follows and folded and folded[-1] == "<":
+            folded[-1:] = ["not", "in", "(", _CONSTANT_LIST, ")"]
+            i += 2
+            continue
+        folded.append(token)
+        i += 1
+    return folded
+
+
+def _hash(normalized_sql: str) -> str:
+    # normalize_sql() joins the tokens with single spaces, splitting them again round-trips
+    folded = " ".join(_fold_memberships(normalized_sql.split(" ")))
+    return hashlib.blake2b(folded.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def fingerprint(sql: str) -> str:
+    """Return a stable 16 hex character fingerprint of the normalized SQL"""
+    return _hash(normalize_sql(sql))
+
+
+def criteria_shape(query_criteria: SqlQueryCriteria | None) -> str:
+    """Describe the shape of a SqlQueryCriteria (fields and operators, no values)"""
+    if query_criteria is None:
+        return ""
+
+    parts = []
+    if query_criteria.where:
+        conditions = [_condition_shape(condition) for condition in query_criteria.where.conditions]
+        parts.append(f"where=[{','.join(conditions)}]")
+    if query_criteria.sort:
+        sorts = [f"{sort.field}:{sort.sort_type.value}" for sort in query_criteria.sort]
+        parts.append(f"sort=[{','.join(sorts)}]")
+    if query_criteria.page:
+        page = [name for name in ("limit", "offset") if getattr(query_criteria.page, name)]
+        parts.append(f"page=[{','.join(page)}]")
+    return ";".join(parts)
+
+
+def _condition_shape(condition: Condition) -> str:
+    match condition:
+        case Where():
+            return f"{condition.field}:{condition.op.name}"
+        case RowIn():
+            return f"({','.join(condition.fields)}):ROW_IN"
+        case AndGroup():
+            return f"and({','.join(_condition_shape(c) for c in condition.conditions)})"
+        case OrGroup():
+            return f"or({','.join(_condition_shape(c) for c in condition.conditions)})"
+        case Not():
+            return f"not({_condition_shape(condition.condition)})"
+        case _:
+            raise ValueError(f"Unsupported condition: {type(condition).__name__}")
+
+
+@dataclass(frozen=True)
+class CallSite:
+    filename: str
+    lineno: int
+    function: str
+
+
+@dataclass
+class FingerprintEntry:
+    """Everything recorded for one fingerprint"""
+
+    fingerprint: str
+    normalized_sql: str
+    kind: str
+    table: str
+    count: int = 0
+    call_sites: Dict[CallSite, int] = field(default_factory=dict)
+    criteria_shapes: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class StatStatementMatch:
+    """A pg_stat_statements row joined with the fingerprint that produced it"""
+
+    entry: FingerprintEntry
+    stat: PostgresStatStatement
+
+
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+
+def _caller_call_site() -> CallSite | None:
+    """Return the first stack frame outside of the sql_composer package"""
+    frame: FrameType | None = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if not filename.startswith(_PACKAGE_DIR):
+            return CallSite(filename=filename, lineno=frame.f_lineno, function=frame.f_code.co_name)
+        frame = frame.f_back
+    return None
+
+
+class FingerprintRegistry(SqlObserver):
+    """
+    Records the fingerprint, call sites and criteria shapes of composed statements.
+    Attach it as an observer, or call `record()` directly.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, FingerprintEntry] = {}
+        self._lock = threading.Lock()
+
+    def on_compose(self, event: ComposeEvent) -> None:
+        # Criteria fragments are never executed on their own, only the statements embedding them
+        if event.sql and event.kind != "criteria":
+            self.record(event.sql, kind=event.kind, table=event.table, query_criteria=event.query_criteria)
+
+    def record(
+        self,
+        sql: str,
+        kind: str = "",
+        table: str = "",
+        query_criteria: SqlQueryCriteria | None = None,
+        call_site: CallSite | None = None,
+    ) -> str:
+        normalized = normalize_sql(sql)
+        fp = _hash(normalized)
+        call_site = call_site or _caller_call_site()
+        shape = criteria_shape(query_criteria)
+
+        with self._lock:
+            entry = self._entries.get(fp)
+            if entry is None:
+                entry = FingerprintEntry(fingerprint=fp, normalized_sql=normalized, kind=kind, table=table)
+                self._entries[fp] = entry
+            entry.count += 1
+            if call_site is not None:
+                entry.call_sites[call_site] = entry.call_sites.get(call_site, 0) + 1
+            if shape:
+                entry.criteria_shapes[shape] = entry.criteria_shapes.get(shape, 0) + 1
+        return fp
+
+    def get(self, fp: str) -> FingerprintEntry | None:
+        with self._lock:
+            return self._entries.get(fp)
+
+    def entries(self) -> List[FingerprintEntry]:
+        with self._lock:
+            return list(self._entries.values())
+
+
+def join_pg_stat_statements(registry: FingerprintRegistry, rows: Iterable[dict]) -> List[StatStatementMatch]:
+    """
+    Join pg_stat_statements rows (as dictionaries, e.g. from PG_STAT_STATEMENTS_SQL) with the
+    fingerprints recorded by the registry. Rows without a recorded fingerprint are skipped.
+    Matches are returned by total execution time, slowest first.
+    """
+    matches = []
+    for row in rows:
+        stat = PostgresStatStatement.from_dict(row)
+        entry = registry.get(fingerprint(stat.query))
+        if entry is not None:
+            matches.append(StatStatementMatch(entry=entry, stat=stat))
+    matches.sort(key=lambda match: match.stat.total_exec_time, reverse=True)
+    return matches
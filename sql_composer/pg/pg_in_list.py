@@ -0,0 +1,183 @@
+import contextlib
+import uuid
+from dataclasses import replace
+from enum import Enum
+from typing import Any, List, Sequence, Tuple, TypeGuard
+from sql_composer.db_models import Column, ColumnRef, Table
+from sql_composer.db_conditions import Condition, SqlQueryCriteria, Where, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_executor import PgExecutor
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_ir import (
+    AndNode,
+    InSubqueryNode,
+    InUnnestNode,
+    Param,
+    PredicateNode,
+    SelectNode,
+    is_always_false,
+)
+from sql_composer.sql_placeholders import Params
+
+"""
+Strategies for IN filters with very many values, e.g. ids from an upstream export.
+
+An IN list of hundreds of thousands of values is slow to parse and plan, and
+`= ANY(array)` tests every row against the array one element at a time. Above
+a threshold, top-level IN conditions of the criteria are rewritten:
+
+- temp_table: the distinct values are COPYed into a session temp table, which
+  is ANALYZEd and semi-joined with `field IN (SELECT value FROM sc_in_...)`,
+  then dropped - after a failed statement too, or by the caller's rollback when
+  the executor doesn't autocommit. The planner sees the real row count and picks a hash or merge
+  join. Needs a PgExecutor, as the table lives on its connection.
+- unnest: `field IN (SELECT unnest(%s::type[]))` binds the values as a single
+  array, which is planned as a hashed semi-join. One statement and no session
+  state, so it works over pooled or routed executors too.
+
+The temp table and array types come from the column's `Column.type_`.
+"""
+
+
+class InListStrategy(Enum):
+    TEMP_TABLE = "temp_table"
+    UNNEST = "unnest"
+
+
+class PgInListFilter:
+    def __init__(
+        self,
+        composer: SqlComposer,
+        executor: SqlExecutor,
+        threshold: int = 10_000,
+        strategy: InListStrategy = InListStrategy.TEMP_TABLE,
+    ):
+        if strategy == InListStrategy.TEMP_TABLE and not isinstance(executor, PgExecutor):
+            raise ValueError("The temp table strategy requires a PgExecutor")
+        self.composer = composer
+        self.executor = executor
+        # IN lists with more values than this are rewritten, shorter ones are rendered as they are
+        self.threshold = threshold
+        self.strategy = strategy
+
+    def select_with_params(
+        self,
+        columns: Sequence[Column | ColumnRef],
+        query_criteria: SqlQueryCriteria | None = None,
+        alias: str | None = None,
+    ) -> Tuple[str, Params]:
+        """The SELECT with the large IN lists as unnest() semi-joins, whatever the strategy"""
+        node = self._build_select(columns, query_criteria, alias, [])
+        return self.composer.translator.render(node, parameterized=True)
+
+    def select(
+        self,
+        columns: Sequence[Column | ColumnRef],
+        query_criteria: SqlQueryCriteria | None = None,
+        alias: str | None = None,
+    ) -> List[tuple]:
+        """Run the SELECT, loading the large IN lists into temp tables first with the temp table strategy"""
+        large = self._large_in_lists(query_criteria)
+        if self.strategy == InListStrategy.UNNEST or not large:
+            return self.executor.fetch_all(*self.select_with_params(columns, query_criteria, alias))
+
+        temp_tables = [f"sc_in_{uuid.uuid4().hex[:16]}" for _ in large]
+        node = self._build_select(columns, query_criteria, alias, temp_tables)
+        if is_always_false(node.where):
+            return []
+        try:
+            for table, where in zip(temp_tables, large, strict=True):
+                self._load_temp_table(table, where)
+            rows = self.executor.fetch_all(*self.composer.translator.render(node, parameterized=True))
+        except Exception:
+            self._drop_after_error(temp_tables)
+            raise
+        for table in temp_tables:
+            self.executor.execute(f"DROP TABLE IF EXISTS {table}")
+        return rows
+
+    def _drop_after_error(self, temp_tables: List[str]):
+        """
+        The failed statement aborted the transaction, which rejects the DROP. With autocommit the
+        temp tables were committed, so the transaction is rolled back first; otherwise they were
+        created in the caller's transaction and are dropped by the caller's rollback.
+        """
+        executor = self._pg_executor()
+        if executor.autocommit:
+            executor.connection.rollback()
+        for table in temp_tables:
+            # The error of the failed statement is the one raised
+            with contextlib.suppress(Exception):
+                executor.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def _pg_executor(self) -> PgExecutor:
+        if not isinstance(self.executor, PgExecutor):
+            raise ValueError("The temp table strategy requires a PgExecutor")
+        return self.executor
+
+    def _large_in_lists(self, query_criteria: SqlQueryCriteria | None) -> List[Where]:
+        if query_criteria is None or query_criteria.where is None:
+            return []
+        return [c for c in query_criteria.where.conditions if self._is_large_in_list(c)]
+
+    def _is_large_in_list(self, condition: Condition) -> TypeGuard[Where]:
+        return isinstance(condition, Where) and condition.op == PgFilterOp.IN and len(condition.values) > self.threshold
+
+    def _column(self, field: str) -> Column:
+        for column in self.composer.table.columns:
+            if column.name == field:
+                if not isinstance(column.type_, PgDataTypes):
+                    raise ValueError(f"Column {field} has no PostgreSQL type")
+                return column
+        raise ValueError(f"Unknown IN field: {field}")
+
+    def _build_select(
+        self,
+        columns: Sequence[Column | ColumnRef],
+        query_criteria: SqlQueryCriteria | None,
+        alias: str | None,
+        temp_tables: List[str],
+    ) -> SelectNode:
+        """
+        The SELECT without the large IN lists, ANDed with a semi-join for each of them - against
+        the corresponding temp table when there are temp tables, against unnest() otherwise.
+        """
+        large = self._large_in_lists(query_criteria)
+        if query_criteria is None or query_criteria.where is None or not large:
+            return self.composer.build_select(columns, alias, query_criteria)
+
+        semi_joins: List[PredicateNode] = []
+        for i, where in enumerate(large):
+            column = self._column(where.field)
+            if temp_tables:
+                values = SelectNode(table=Table(temp_tables[i]), columns=[Column("value", column.type_)])
+                semi_joins.append(InSubqueryNode(where.field, values))
+            else:
+                semi_joins.append(InUnnestNode(where.field, Param(_distinct(where.values), column)))
+
+        rest = [c for c in query_criteria.where.conditions if not self._is_large_in_list(c)]
+        node = self.composer.build_select(
+            columns, alias, replace(query_criteria, where=WhereClause(rest) if rest else None)
+        )
+        if not is_always_false(node.where):
+            conditions = node.where.children if isinstance(node.where, AndNode) else [node.where] if node.where else []
+            node.where = AndNode(conditions + semi_joins)
+        return node
+
+    def _load_temp_table(self, table: str, where: Where):
+        column = self._column(where.field)
+        # A bare `char` is char(1) and would truncate the values
+        type_name = "bpchar" if column.type_ == PgDataTypes.CHAR else column.type_.value
+
+        executor = self._pg_executor()
+        executor.execute(f"CREATE TEMP TABLE {table} (value {type_name})")
+        executor.copy_rows(table, ["value"], ([value] for value in _distinct(where.values)))
+        # Autovacuum never analyzes temp tables, without statistics the planner assumes a default size
+        executor.execute(f"ANALYZE {table}")
+
+
+def _distinct(values: List[Any]) -> List[Any]:
+    """The values without duplicates and NULLs, which IN never matches"""
+    return [value for value in dict.fromkeys(values) if value is not None]
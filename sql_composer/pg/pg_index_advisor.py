@@ -0,0 +1,261 @@
+import warnings
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterable, List
+from sql_composer.db_models import ColumnRef, Table
+from sql_composer.db_conditions import AndGroup, Condition, Not, OrGroup, RowIn, SqlQueryCriteria, Where
+from sql_composer.db_metadata import PostgresIndexMetadata
+from sql_composer.pg.pg_filter_op import PATTERN_OPS, PgFilterOp, index_methods
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_ir import Scope, table_scope
+from sql_composer.sql_observer import ComposeEvent, SqlObserver
+from sql_composer.sql_placeholders import PercentPlaceholders, Placeholders
+
+"""
+Index advisor - checks composed query criteria against the table's indexes.
+
+It flags the shapes that make PostgreSQL fall back to a sequential scan or a
+full sort: WHERE fields and ORDER BY columns no index can serve, LIKE/ILIKE
+patterns with a leading wildcard on columns without a trigram index, anchored
+patterns without a text_pattern_ops btree (the default opclass only serves them
+under the C collation) or trigram index, and large OFFSETs. Attach it as an observer in tests and CI, in warn mode to
+collect QueryAdviceWarnings or in strict mode to fail on the first finding.
+"""
+
+PG_INDEXES_SQL = """
+SELECT i.schemaname, i.tablename, i.indexname, i.indexdef,
+       am.amname AS access_method,
+       ARRAY(
+           SELECT a.attname FROM unnest(ix.indkey) WITH ORDINALITY AS k(attnum, n)
+           JOIN pg_attribute a ON a.attrelid = ix.indrelid AND a.attnum = k.attnum
+           ORDER BY k.n
+       ) AS columns,
+       ARRAY(
+           SELECT o.opcname FROM unnest(ix.indclass) WITH ORDINALITY AS c(opclass, n)
+           JOIN pg_opclass o ON o.oid = c.opclass
+           ORDER BY c.n
+       ) AS opclasses,
+       ix.indisunique AS is_unique, ix.indisprimary AS is_primary, ix.indisvalid AS is_valid,
+       pg_get_expr(ix.indpred, ix.indrelid) AS predicate
+FROM pg_indexes i
+JOIN pg_namespace ns ON ns.nspname = i.schemaname
+JOIN pg_class ic ON ic.relname = i.indexname AND ic.relnamespace = ns.oid
+JOIN pg_index ix ON ix.indexrelid = ic.oid
+JOIN pg_am am ON am.oid = ic.relam
+WHERE i.tablename = ANY({})
+"""
+
+_TRIGRAM_OPCLASSES = ("gin_trgm_ops", "gist_trgm_ops")
+# The default btree opclass only serves anchored patterns under the C collation
+_PATTERN_OPCLASSES = ("text_pattern_ops", "varchar_pattern_ops", "bpchar_pattern_ops")
+
+
+class AdvisorMode(Enum):
+    WARN = "warn"
+    STRICT = "strict"
+
+
+@dataclass
+class QueryAdvice:
+    table: str
+    # unindexed_filter, unindexed_sort, leading_wildcard or large_offset
+    kind: str
+    field: str
+    message: str
+
+
+class QueryAdviceWarning(UserWarning):
+    pass
+
+
+class QueryAdviceError(ValueError):
+    def __init__(self, advice: List[QueryAdvice]):
+        super().__init__("; ".join(a.message for a in advice))
+        self.advice = advice
+
+
+class PgIndexAdvisor(SqlObserver):
+    def __init__(
+        self,
+        indexes: Iterable[PostgresIndexMetadata | dict],
+        mode: AdvisorMode = AdvisorMode.WARN,
+        offset_threshold: int = 1000,
+        tables: Iterable[Table] = (),
+    ):
+        self.mode = mode
+        self.offset_threshold = offset_threshold
+        # Composed events only name their table, these resolve the names to the table's columns
+        self._tables: Dict[str, Table] = {table.name: table for table in tables}
+        self._indexes: Dict[str, List[PostgresIndexMetadata]] = {}
+        for index in indexes:
+            if isinstance(index, dict):
+                index = PostgresIndexMetadata.from_dict(index)
+            if index.is_valid:
+                self._indexes.setdefault(index.tablename, []).append(index)
+
+    @classmethod
+    def load(
+        cls, executor: SqlExecutor, tables: List[Table], placeholders: Placeholders | None = None, **kwargs
+    ) -> "PgIndexAdvisor":
+        """Read the indexes of the tables from the catalog, with parameters in the executor's placeholder style"""
+        placeholders = placeholders or PercentPlaceholders()
+        rows = executor.fetch_all(*placeholders.format(PG_INDEXES_SQL, [[table.name for table in tables]]))
+        names = list(PostgresIndexMetadata.__annotations__)
+        return cls([dict(zip(names, row, strict=True)) for row in rows], tables=tables, **kwargs)
+
+    def on_compose(self, event: ComposeEvent) -> None:
+        # The statements embedding a criteria fragment are checked instead
+        if event.kind != "criteria" and event.query_criteria is not None:
+            self.check(event.table, event.query_criteria)
+
+    def check(self, table: Table | str, query_criteria: SqlQueryCriteria | None) -> List[QueryAdvice]:
+        """Advise on the criteria; warns or raises according to the mode and returns the advice"""
+        advice = self.advise(table, query_criteria)
+        if advice and self.mode == AdvisorMode.STRICT:
+            raise QueryAdviceError(advice)
+        for item in advice:
+            warnings.warn(item.message, QueryAdviceWarning, stacklevel=2)
+        return advice
+
+    def advise(self, table: Table | str, query_criteria: SqlQueryCriteria | None) -> List[QueryAdvice]:
+        table_name = table if isinstance(table, str) else table.name
+        if query_criteria is None:
+            return []
+
+        # Fields are resolved like the composer does, which drops unknown fields from the statement
+        if isinstance(table, str):
+            table = self._tables.get(table, table)
+        scope = table_scope(table) if isinstance(table, Table) else None
+        advice: List[QueryAdvice] = []
+        flagged = set()
+        for where in _where_conditions(query_criteria.where.conditions if query_criteria.where else []):
+            if where.field in flagged or not _is_table_column(where.field, scope):
+                continue
+            item = self._advise_where(table_name, where)
+            if item is not None:
+                flagged.add(where.field)
+                advice.append(item)
+
+        for sort in query_criteria.sort or []:
+            if _is_table_column(sort.field, scope) and not self._indexes_with(table_name, sort.field, ("btree",)):
+                advice.append(
+                    QueryAdvice(
+                        table_name,
+                        "unindexed_sort",
+                        sort.field,
+                        f"{table_name}: ORDER BY {sort.field} has no btree index and sorts every matching row",
+                    )
+                )
+
+        page = query_criteria.page
+        if page is not None and page.offset and page.offset > self.offset_threshold:
+            advice.append(
+                QueryAdvice(
+                    table_name,
+                    "large_offset",
+                    "",
+                    f"{table_name}: OFFSET {page.offset} reads and discards {page.offset} rows, "
+                    "use keyset pagination on the sort key instead",
+                )
+            )
+        return advice
+
+    def _advise_where(self, table_name: str, where: Where) -> QueryAdvice | None:
+        methods = index_methods(where.op)
+        if not methods:
+            # Negations and the like can't use an index on the column
+            return None
+
+        if where.op in PATTERN_OPS:
+            if self._trigram_indexes(table_name, where.field):
+                return None
+            if _leading_wildcard(where):
+                return QueryAdvice(
+                    table_name,
+                    "leading_wildcard",
+                    where.field,
+                    f"{table_name}: {where.field} {where.op.sql} {where.values[0]!r} starts with a wildcard "
+                    "and needs a trigram (gin_trgm_ops) index",
+                )
+            if self._pattern_btree_indexes(table_name, where.field):
+                return None
+            return QueryAdvice(
+                table_name,
+                "unindexed_filter",
+                where.field,
+                f"{table_name}: no text_pattern_ops btree or trigram index can serve {where.field} {where.op.sql}",
+            )
+
+        if self._indexes_with(table_name, where.field, methods):
+            return None
+        return QueryAdvice(
+            table_name,
+            "unindexed_filter",
+            where.field,
+            f"{table_name}: no {'/'.join(methods)} index can serve {where.field} {where.op.sql}",
+        )
+
+    def _trigram_indexes(self, table_name: str, column: str) -> List[PostgresIndexMetadata]:
+        return [
+            index
+            for index in self._indexes_with(table_name, column, ("gin", "gist"))
+            if any(opclass in _TRIGRAM_OPCLASSES for opclass in index.opclasses)
+        ]
+
+    def _pattern_btree_indexes(self, table_name: str, column: str) -> List[PostgresIndexMetadata]:
+        return [
+            index
+            for index in self._indexes_with(table_name, column, ("btree",))
+            if index.opclasses and index.opclasses[0] in _PATTERN_OPCLASSES
+        ]
+
+    def _indexes_with(self, table_name: str, column: str, methods: Iterable[str]) -> List[PostgresIndexMetadata]:
+        """Indexes of the given methods usable for the column - btree and hash only by their leading column"""
+        usable = []
+        for index in self._indexes.get(table_name, []):
+            if index.access_method not in methods or column not in index.columns:
+                continue
+            if index.access_method in ("btree", "hash") and index.columns[0] != column:
+                continue
+            usable.append(index)
+        return usable
+
+
+def _is_table_column(field: str, scope: Scope | None) -> bool:
+    """
+    Whether the field is a column of the advised table, and not unknown or a column of a joined table.
+    Without the table's columns (an unknown table name) only qualified fields are ruled out.
+    """
+    if scope is None:
+        return "." not in field
+    return isinstance(scope.get(field), ColumnRef)
+
+
+def _where_conditions(conditions: List[Condition]) -> Iterable[Where]:
+    for condition in conditions:
+        match condition:
+            case Where():
+                yield condition
+            case RowIn():
+                yield from _row_in_conditions(condition)
+            case AndGroup() | OrGroup():
+                yield from _where_conditions(condition.conditions)
+            case Not():
+                # A negated condition can't use an index
+                continue
+
+
+def _row_in_conditions(row_in: RowIn) -> Iterable[Where]:
+    """A RowIn as the IN condition it implies on each of its fields"""
+    for i, field_name in enumerate(row_in.fields):
+        yield Where(field_name, PgFilterOp.IN, [row[i] for row in row_in.rows])
+
+
+def _leading_wildcard(where: Where) -> bool:
+    """A pattern that is not anchored to the start of the string"""
+    if not where.values or not isinstance(where.values[0], str):
+        return False
+    pattern = where.values[0]
+    if where.op in (PgFilterOp.REGEXP, PgFilterOp.REGEXP_CASE_INSENSITIVE):
+        return not pattern.startswith("^")
+    return pattern[:1] in ("%", "_")
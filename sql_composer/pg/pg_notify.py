@@ -0,0 +1,194 @@
+import select
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Tuple
+from sql_composer.sql_cache import QueryCache
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_placeholders import Params, PercentPlaceholders, Placeholders
+
+"""
+Cross-process cache invalidation over PostgreSQL LISTEN/NOTIFY.
+
+A QueryCache is local to its process, so a write composed by one worker only
+invalidates that worker's cache. PgCacheNotifier runs a `pg_notify` for the
+written tables alongside each write; every process runs a
+PgCacheInvalidationListener that LISTENs on the channel in a background thread
+and drops the cached reads of the notified tables.
+
+Notifications are only delivered once the writing transaction commits, so a
+listener never evicts before the write is visible. The writing process receives
+its own notifications too, which evicts any read cached between composing the
+write and committing it.
+"""
+
+INVALIDATION_CHANNEL = "sql_composer_invalidate"
+
+# One round trip for any number of tables
+NOTIFY_SQL = "SELECT pg_notify({}, t) FROM unnest({}::text[]) AS t"
+
+
+@dataclass
+class Notification:
+    channel: str
+    payload: str
+    pid: int = 0
+
+
+class NotificationBus(ABC):
+    """Source of notifications for a PgCacheInvalidationListener"""
+
+    @abstractmethod
+    def listen(self, channel: str) -> None:
+        """Start (or restart, e.g. after a lost connection) listening on the channel"""
+        pass
+
+    @abstractmethod
+    def poll(self, timeout: float) -> List[Notification]:
+        """Wait up to `timeout` seconds and return the notifications received"""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class PgNotificationBus(NotificationBus):
+    """
+    NotificationBus over a dedicated psycopg2 connection.
+    `connect` opens a new connection; it is called again to reconnect after an error.
+    """
+
+    def __init__(self, connect: Callable[[], Any]):
+        self._connect = connect
+        self.connection: Any = None
+
+    def listen(self, channel: str) -> None:
+        self.close()
+        self.connection = self._connect()
+        # LISTEN takes effect on commit, and a listening connection must not sit in a transaction
+        self.connection.autocommit = True
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {_quote_identifier(channel)}")
+
+    def poll(self, timeout: float) -> List[Notification]:
+        readable, _, _ = select.select([self.connection], [], [], timeout)
+        if readable:
+            self.connection.poll()
+        notifications = [Notification(n.channel, n.payload, n.pid) for n in self.connection.notifies]
+        self.connection.notifies.clear()
+        return notifications
+
+    def close(self) -> None:
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            finally:
+                self.connection = None
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class PgCacheNotifier:
+    """Runs writes together with a pg_notify naming the tables they change"""
+
+    def __init__(
+        self,
+        executor: SqlExecutor,
+        channel: str = INVALIDATION_CHANNEL,
+        placeholders: Placeholders | None = None,
+    ):
+        self.executor = executor
+        self.channel = channel
+        # The executor's parameter style, e.g. its composer's `translator.placeholders`
+        self.placeholders = placeholders or PercentPlaceholders()
+
+    def notify_with_params(self, tables: Iterable[str]) -> Tuple[str, Params]:
+        return self.placeholders.format(NOTIFY_SQL, [self.channel, sorted(set(tables))])
+
+    def notify(self, tables: Iterable[str]) -> None:
+        tables = set(tables)
+        if tables:
+            self.executor.fetch_all(*self.notify_with_params(tables))
+
+    def execute(self, sql: str, params: Params | None, tables: Iterable[str]) -> int:
+        """
+        Run a composed write, then notify the tables it changed.
+        Returns the number of affected rows. With a non-autocommit executor both statements
+        run in the caller's transaction and the notification is sent when it commits.
+        """
+        rowcount = self.executor.execute(sql, params)
+        self.notify(tables)
+        return rowcount
+
+
+class PgCacheInvalidationListener:
+    """
+    Evicts the cached reads of notified tables from a QueryCache, in a background thread.
+    Notifications sent while the bus is disconnected are lost, so the whole cache is cleared
+    whenever listening (re)starts.
+    """
+
+    def __init__(
+        self,
+        cache: QueryCache,
+        bus: NotificationBus,
+        channel: str = INVALIDATION_CHANNEL,
+        poll_timeout: float = 1.0,
+        retry_interval: float = 5.0,
+    ):
+        self.cache = cache
+        self.bus = bus
+        self.channel = channel
+        self.poll_timeout = poll_timeout
+        self.retry_interval = retry_interval
+        self.last_error: Exception | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise ValueError("Listener already started")
+        self._stop.clear()
+        self._listen()
+        self._thread = threading.Thread(target=self._run, name="sql-composer-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.bus.close()
+
+    def __enter__(self) -> "PgCacheInvalidationListener":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def handle(self, notification: Notification) -> None:
+        if notification.channel == self.channel and notification.payload:
+            self.cache.invalidate_table(notification.payload)
+
+    def _listen(self) -> None:
+        self.bus.listen(self.channel)
+        self.cache.clear()
+
+    def _run(self) -> None:
+        listening = True
+        while not self._stop.is_set():
+            try:
+                if not listening:
+                    self._listen()
+                    listening = True
+                for notification in self.bus.poll(self.poll_timeout):
+                    self.handle(notification)
+            except Exception as e:
+                self.last_error = e
+                listening = False
+                self.cache.clear()
+                self._stop.wait(self.retry_interval)
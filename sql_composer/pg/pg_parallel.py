@@ -0,0 +1,161 @@
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import replace
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterator, List
+from sql_composer.db_models import Column
+from sql_composer.db_conditions import (
+    Aggregate,
+    AggregateFunc,
+    Condition,
+    OrGroup,
+    SqlQueryCriteria,
+    Where,
+    WhereClause,
+)
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_shard import byte_order_sorts, merge_sorted
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+
+"""
+Parallel key-range scans, e.g. for exports of large tables.
+
+parallel_select() splits a scan into disjoint ranges of a key column and runs
+one range-restricted SELECT per partition concurrently:
+
+    partition 0:  key < b1 OR key IS NULL
+    partition i:  key >= bi AND key < bi+1
+    partition N:  key >= bN-1
+
+The split points come from the column's `pg_stats` histogram, whose buckets
+hold about the same number of rows each, or else from an even split of the
+key's MIN/MAX. The outer ranges are open, so every row is scanned exactly once
+even when the statistics are stale. Partitions are yielded as they complete, or
+heap-merged when the criteria sort the rows - text sort keys then sort
+`COLLATE "C"`, the order the merge compares them in.
+"""
+
+HISTOGRAM_BOUNDS_SQL = """
+SELECT histogram_bounds::text::text[]
+FROM pg_stats
+WHERE schemaname = ANY(current_schemas(false)) AND tablename = {} AND attname = {}
+LIMIT 1
+"""
+
+
+class PgParallelScanner:
+    def __init__(self, composer: SqlComposer, executor: SqlExecutor, max_workers: int = 8):
+        # The executor is called from several threads at once, e.g. a PgReplicaRouter over pooled connections
+        self.composer = composer
+        self.executor = executor
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+    def parallel_select(
+        self,
+        columns: List[Column],
+        query_criteria: SqlQueryCriteria | None = None,
+        partitions: int = 4,
+        key: Column | None = None,
+    ) -> Iterator[tuple]:
+        if key is None or key not in self.composer.table.columns:
+            raise ValueError("parallel_select() requires a key column of the table")
+        if partitions < 1:
+            raise ValueError("partitions must be positive")
+        if query_criteria is not None and query_criteria.page is not None:
+            raise ValueError("Paged criteria cannot be split into partitions")
+
+        if query_criteria is not None and query_criteria.sort:
+            query_criteria = replace(query_criteria, sort=byte_order_sorts(query_criteria.sort, columns))
+        bounds = self.partition_bounds(key, partitions, query_criteria)
+        criteria = [self._partition_criteria(key, bounds, i, query_criteria) for i in range(len(bounds) + 1)]
+        futures = [self._pool.submit(self._fetch, columns, c) for c in criteria]
+        return self._stream(futures, columns, query_criteria)
+
+    def partition_bounds(
+        self, key: Column, partitions: int, query_criteria: SqlQueryCriteria | None = None
+    ) -> List[Any]:
+        """Up to `partitions - 1` ascending split points of the key"""
+        if partitions < 2:
+            return []
+        bounds = self._histogram_bounds(key, partitions)
+        if bounds is None:
+            bounds = self._min_max_bounds(key, partitions, query_criteria)
+        # Both sources are ascending in the server's order - sorting in Python could reorder text by another
+        # collation, or fail on values that don't compare
+        return list(dict.fromkeys(bounds))
+
+    def _histogram_bounds(self, key: Column, partitions: int) -> List[Any] | None:
+        placeholders = self.composer.translator.placeholders
+        rows = self.executor.fetch_all(*placeholders.format(HISTOGRAM_BOUNDS_SQL, [self.composer.table.name, key.name]))
+        if not rows or not rows[0][0] or len(rows[0][0]) < 2:
+            return None
+        histogram = [self.composer.translator.sql_to_val(key, value) for value in rows[0][0]]
+        last = len(histogram) - 1
+        return [histogram[round(i * last / partitions)] for i in range(1, partitions)]
+
+    def _min_max_bounds(self, key: Column, partitions: int, query_criteria: SqlQueryCriteria | None) -> List[Any]:
+        sql, params = self.composer.aggregate_with_params(
+            [Aggregate(AggregateFunc.MIN, key, alias="low"), Aggregate(AggregateFunc.MAX, key, alias="high")],
+            query_criteria=SqlQueryCriteria(where=query_criteria.where) if query_criteria else None,
+        )
+        rows = self.executor.fetch_all(sql, params)
+        if not rows or rows[0][0] is None:
+            return []
+        low, high = (self.composer.translator.sql_to_val(key, value) for value in rows[0])
+
+        match low:
+            case bool():
+                return []
+            case int():
+                return [low + (high - low) * i // partitions for i in range(1, partitions)]
+            case float() | Decimal() | datetime() | date():
+                # Dates step by whole days
+                return [low + (high - low) * i / partitions for i in range(1, partitions)]
+            case _:
+                # No arithmetic on e.g. text or UUIDs without a histogram
+                return []
+
+    def _partition_criteria(
+        self, key: Column, bounds: List[Any], index: int, query_criteria: SqlQueryCriteria | None
+    ) -> SqlQueryCriteria:
+        conditions: List[Condition] = []
+        if index == 0:
+            if bounds:
+                below = Where(key.name, PgFilterOp.LESS_THAN, [bounds[0]])
+                conditions.append(OrGroup([below, Where(key.name, PgFilterOp.IS_NULL, [])]))
+        else:
+            conditions.append(Where(key.name, PgFilterOp.GREATER_THAN_OR_EQUAL, [bounds[index - 1]]))
+            if index < len(bounds):
+                conditions.append(Where(key.name, PgFilterOp.LESS_THAN, [bounds[index]]))
+
+        where = query_criteria.where.conditions if query_criteria and query_criteria.where else []
+        return SqlQueryCriteria(
+            where=WhereClause(list(where) + conditions) if where or conditions else None,
+            sort=query_criteria.sort if query_criteria else None,
+        )
+
+    def _fetch(self, columns: List[Column], query_criteria: SqlQueryCriteria) -> List[tuple]:
+        sql, params = self.composer.select_with_params(columns, query_criteria=query_criteria)
+        return self.executor.fetch_all(sql, params)
+
+    def _stream(
+        self, futures: List[Future], columns: List[Column], query_criteria: SqlQueryCriteria | None
+    ) -> Iterator[tuple]:
+        try:
+            if query_criteria is not None and query_criteria.sort:
+                yield from merge_sorted([_rows(future) for future in futures], columns, query_criteria.sort)
+            else:
+                for future in as_completed(futures):
+                    yield from future.result()
+        finally:
+            # The consumer stopped early or a partition failed
+            for future in futures:
+                future.cancel()
+
+
+def _rows(future: Future) -> Iterator[tuple]:
+    yield from future.result()
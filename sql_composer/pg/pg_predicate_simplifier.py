@@ -0,0 +1,211 @@
+from typing import Any, Dict, List
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.sql_ir import (
+    AndNode,
+    ColumnEqualsNode,
+    ComparisonNode,
+    InSubqueryNode,
+    InUnnestNode,
+    RowInNode,
+    NotNode,
+    OrNode,
+    Param,
+    PredicateNode,
+    always_false,
+    always_true,
+    is_always_false,
+    is_always_true,
+)
+
+"""
+Predicate simplifier - an optimization pass over the predicate tree before rendering.
+
+- Duplicate conditions are removed and IN values are deduplicated and sorted.
+- Under AND, EQUAL/IN conditions on one field are intersected and BETWEEN ranges
+  on one field are narrowed to their overlap.
+- Under OR, EQUAL/IN conditions on one field are merged into a single IN.
+- Conditions that can never match (an empty IN or RowIn, conflicting
+  equalities, an empty range) collapse the tree to "always false", which callers
+  can detect with sql_ir.is_always_false() and answer without going to the
+  database.
+"""
+
+
+def simplify_predicate(node: PredicateNode | None) -> PredicateNode | None:
+    """Simplify a predicate tree. Returns None when the predicate is always true."""
+    if node is None:
+        return None
+
+    simplified = _simplify(node)
+    return None if is_always_true(simplified) else simplified
+
+
+def _simplify(node: PredicateNode) -> PredicateNode:
+    match node:
+        case ComparisonNode():
+            return _simplify_comparison(node)
+        case ColumnEqualsNode() | InSubqueryNode() | InUnnestNode():
+            return node
+        case RowInNode():
+            return node if node.rows else always_false()
+        case NotNode():
+            child = _simplify(node.child)
+            if is_always_true(child):
+                return always_false()
+            if is_always_false(child):
+                return always_true()
+            if isinstance(child, NotNode):
+                return child.child
+            return NotNode(child)
+        case AndNode():
+            children: List[PredicateNode] = []
+            for child in (_simplify(c) for c in node.children):
+                if is_always_false(child):
+                    return always_false()
+                children.extend(child.children if isinstance(child, AndNode) else [child])
+            children = _merge_and(_unique(children))
+            if any(is_always_false(child) for child in children):
+                return always_false()
+            return children[0] if len(children) == 1 else AndNode(children)
+        case OrNode():
+            children = []
+            for child in (_simplify(c) for c in node.children):
+                if is_always_true(child):
+                    return always_true()
+                children.extend(child.children if isinstance(child, OrNode) else [child])
+            children = _merge_or(_unique(children))
+            return children[0] if len(children) == 1 else OrNode(children)
+        case _:
+            raise ValueError(f"Unsupported predicate node: {type(node).__name__}")
+
+
+def _simplify_comparison(node: ComparisonNode) -> PredicateNode:
+    match node.op:
+        case PgFilterOp.IN:
+            if not node.params:
+                return always_false()
+            return _membership(node.field, _canonical_params(node.params))
+        case PgFilterOp.NOT_IN:
+            if not node.params:
+                return always_true()
+            params = _canonical_params(node.params)
+            op = PgFilterOp.NOT_EQUAL if len(params) == 1 else PgFilterOp.NOT_IN
+            return ComparisonNode(node.field, op, params)
+        case PgFilterOp.BETWEEN:
+            if len(node.params) == 2 and _greater(node.params[0].value, node.params[1].value):
+                return always_false()
+            return node
+        case _:
+            return node
+
+
+def _membership(field: str, params: List[Param]) -> PredicateNode:
+    """EQUAL for a single value, IN otherwise, always false for none"""
+    if not params:
+        return always_false()
+    if len(params) == 1:
+        return ComparisonNode(field, PgFilterOp.EQUAL, params)
+    return ComparisonNode(field, PgFilterOp.IN, params)
+
+
+def _merge_and(children: List[PredicateNode]) -> List[PredicateNode]:
+    """Intersect EQUAL/IN sets and BETWEEN ranges per field"""
+    merged: List[PredicateNode] = []
+    memberships: Dict[str, int] = {}
+    ranges: Dict[str, int] = {}
+
+    for child in children:
+        if isinstance(child, ComparisonNode) and child.op in (PgFilterOp.EQUAL, PgFilterOp.IN):
+            if child.field in memberships:
+                index = memberships[child.field]
+                current = merged[index]
+                if not isinstance(current, ComparisonNode):
+                    # Already narrowed down to "always false"
+                    continue
+                values = [param.value for param in child.params]
+                merged[index] = _membership(child.field, [p for p in current.params if p.value in values])
+                continue
+            memberships[child.field] = len(merged)
+
+        if isinstance(child, ComparisonNode) and child.op == PgFilterOp.BETWEEN and len(child.params) == 2:
+            if child.field in ranges:
+                index = ranges[child.field]
+                current = merged[index]
+                if not isinstance(current, ComparisonNode):
+                    continue
+                narrowed = _intersect_ranges(current, child)
+                if narrowed is not None:
+                    merged[index] = narrowed
+                    continue
+            else:
+                ranges[child.field] = len(merged)
+
+        merged.append(child)
+    return merged
+
+
+def _merge_or(children: List[PredicateNode]) -> List[PredicateNode]:
+    """Union EQUAL/IN conditions per field into a single IN"""
+    merged: List[PredicateNode] = []
+    memberships: Dict[str, int] = {}
+
+    for child in children:
+        if isinstance(child, ComparisonNode) and child.op in (PgFilterOp.EQUAL, PgFilterOp.IN):
+            if child.field in memberships:
+                index = memberships[child.field]
+                current = merged[index]
+                if isinstance(current, ComparisonNode):
+                    merged[index] = _membership(child.field, _canonical_params(current.params + child.params))
+                    continue
+            memberships[child.field] = len(merged)
+        merged.append(child)
+    return merged
+
+
+def _intersect_ranges(a: ComparisonNode, b: ComparisonNode) -> PredicateNode | None:
+    """Overlap of two BETWEEN conditions, or None when the bounds can't be compared"""
+    try:
+        low = a.params[0] if a.params[0].value >= b.params[0].value else b.params[0]
+        high = a.params[1] if a.params[1].value <= b.params[1].value else b.params[1]
+        if low.value > high.value:
+            return always_false()
+    except TypeError:
+        return None
+    return ComparisonNode(a.field, PgFilterOp.BETWEEN, [low, high])
+
+
+def _greater(a: Any, b: Any) -> bool:
+    try:
+        return a > b
+    except TypeError:
+        return False
+
+
+def _canonical_params(params: List[Param]) -> List[Param]:
+    """Deduplicate parameters by value and sort them when the values are comparable"""
+    unique_params: List[Param] = []
+    try:
+        seen = set()
+        for param in params:
+            if param.value not in seen:
+                seen.add(param.value)
+                unique_params.append(param)
+    except TypeError:
+        # Unhashable values, e.g. JSON documents
+        unique_params = []
+        for param in params:
+            if all(param.value != p.value for p in unique_params):
+                unique_params.append(param)
+
+    try:
+        return sorted(unique_params, key=lambda param: param.value)
+    except TypeError:
+        return unique_params
+
+
+def _unique(children: List[PredicateNode]) -> List[PredicateNode]:
+    unique_children: List[PredicateNode] = []
+    for child in children:
+        if child not in unique_children:
+            unique_children.append(child)
+    return unique_children
@@ -0,0 +1,130 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Any, List, Tuple
+from sql_composer.pg.pg_executor import PgExecutor
+from sql_composer.sql_placeholders import Params
+
+"""
+Server-side prepared statements.
+
+Drivers such as psycopg2 interpolate `%s` parameters on the client, so the
+server parses and plans every composed statement again. PgPreparedExecutor
+rewrites a statement's `%s` placeholders to `$1..$n`, runs `PREPARE name AS ...`
+the first time the connection sees it and `EXECUTE name(...)` from then on,
+which lets PostgreSQL reuse the parse tree and, after a few executions, a
+generic plan.
+
+Prepared statements belong to a session. The executor tracks the statements
+prepared on its connection and DEALLOCATEs the least recently used beyond
+`max_prepared`. Call `reset()` after anything that drops them server-side, e.g.
+a reconnect or DISCARD ALL. Poolers that hand out a different session per
+transaction (pgbouncer in transaction mode) can't be used with this executor.
+"""
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<string>[EeBbXxUuNn]?'(?:[^']|'')*')
+    | (?P<ident>"(?:[^"]|"")*")
+    | (?P<named>%\([^)]+\)s)
+    | (?P<param>%s)
+    | (?P<percent>%%)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# Statements PREPARE accepts
+_PREPARABLE_RE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|VALUES|MERGE)\b", re.IGNORECASE)
+
+
+def to_numbered_params(sql: str) -> Tuple[str, int]:
+    """
+    Rewrite `%s` placeholders to `$1..$n` and `%%` to `%`, leaving string literals, quoted identifiers
+    and comments as they are. Returns the SQL and the number of parameters.
+    """
+    count = 0
+
+    def replace(match: re.Match) -> str:
+        nonlocal count
+        match match.lastgroup:
+            case "param":
+                count += 1
+                return f"${count}"
+            case "percent":
+                return "%"
+            case "named":
+                raise ValueError(f"Named parameters are not supported: {match.group()}")
+            case _:
+                return match.group()
+
+    return _TOKEN_RE.sub(replace, sql), count
+
+
+def statement_name(sql: str) -> str:
+    return "sc_" + hashlib.blake2b(sql.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class PgPreparedExecutor(PgExecutor):
+    def __init__(self, connection: Any, autocommit: bool = True, max_prepared: int = 256):
+        super().__init__(connection, autocommit)
+        if max_prepared < 1:
+            raise ValueError("max_prepared must be positive")
+        self.max_prepared = max_prepared
+        # Composed SQL -> (statement name, parameter count), least recently used first
+        self._prepared: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+
+    @property
+    def prepared(self) -> List[str]:
+        """Names of the statements prepared on the connection, least recently used first"""
+        return [name for name, _ in self._prepared.values()]
+
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        return super().fetch_all(*self._execute_prepared(sql, params))
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        return super().execute(*self._execute_prepared(sql, params))
+
+    def reset(self) -> None:
+        """Forget the prepared statements, e.g. after the connection was re-established"""
+        self._prepared.clear()
+
+    def deallocate_all(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute("DEALLOCATE ALL")
+        self._prepared.clear()
+
+    def _execute_prepared(self, sql: str, params: Params | None) -> Tuple[str, Params | None]:
+        """The EXECUTE running the statement, which is prepared first when the connection hasn't seen it"""
+        if not _PREPARABLE_RE.match(sql):
+            return sql, params
+        if isinstance(params, dict):
+            raise ValueError("Named parameters are not supported")
+
+        prepared = self._prepared.get(sql)
+        if prepared is None:
+            name = self._prepare(sql, len(params or ()))
+        else:
+            name, count = prepared
+            if count != len(params or ()):
+                raise ValueError(f"Statement has {count} placeholders but {len(params or ())} parameters")
+            self._prepared.move_to_end(sql)
+
+        if not params:
+            return f"EXECUTE {name}", None
+        return f"EXECUTE {name}({', '.join(['%s'] * len(params))})", params
+
+    def _prepare(self, sql: str, param_count: int) -> str:
+        numbered_sql, count = to_numbered_params(sql)
+        if count != param_count:
+            raise ValueError(f"Statement has {count} placeholders but {param_count} parameters")
+
+        name = statement_name(sql)
+        with self.connection.cursor() as cursor:
+            # Without parameters the driver sends the text as-is, so `%` needs no escaping
+            cursor.execute(f"PREPARE {name} AS {numbered_sql}")
+            while len(self._prepared) >= self.max_prepared:
+                _, (evicted, _) = self._prepared.popitem(last=False)
+                cursor.execute(f"DEALLOCATE {evicted}")
+        self._prepared[sql] = (name, count)
+        return name
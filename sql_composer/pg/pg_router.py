@@ -0,0 +1,140 @@
+import random
+import re
+import threading
+from dataclasses import dataclass
+from typing import List
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_placeholders import Params
+
+"""
+Read-replica routing.
+
+PgReplicaRouter is a SqlExecutor that sends reads to streaming replicas, picked
+by weight, and everything else to the primary. A session adds read-your-writes:
+after each write it records the primary's WAL position (`pg_current_wal_lsn()`)
+and later reads only go to replicas whose replay position
+(`pg_last_wal_replay_lsn()`) has reached it, falling back to the primary when
+none has.
+
+A statement is a read when it starts with SELECT or EXPLAIN and does not lock
+rows or call a function that writes (FOR UPDATE/SHARE, pg_notify, nextval,
+setval).
+"""
+
+CURRENT_LSN_SQL = "SELECT pg_current_wal_lsn()::text"
+REPLAY_LSN_SQL = "SELECT pg_last_wal_replay_lsn()::text"
+
+_READ_RE = re.compile(r"^\s*(?:--[^\n]*\n\s*|/\*.*?\*/\s*)*(SELECT|EXPLAIN)\b", re.IGNORECASE | re.DOTALL)
+_WRITE_IN_READ_RE = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b|\b(?:pg_notify|nextval|setval)\s*\(",
+    re.IGNORECASE,
+)
+
+
+def is_read(sql: str) -> bool:
+    """True when the statement can run on a read-only replica"""
+    return _READ_RE.match(sql) is not None and _WRITE_IN_READ_RE.search(sql) is None
+
+
+def parse_lsn(lsn: str) -> int:
+    """Parse a pg_lsn, e.g. `16/B374D848`, into a comparable integer"""
+    high, _, low = lsn.partition("/")
+    if not low:
+        raise ValueError(f"Invalid LSN: {lsn}")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+@dataclass
+class Replica:
+    executor: SqlExecutor
+    # Relative share of reads, 0 drains the replica
+    weight: float = 1.0
+    name: str = ""
+
+
+class PgReplicaRouter(SqlExecutor):
+    def __init__(self, primary: SqlExecutor, replicas: List[Replica], rand: random.Random | None = None):
+        self.primary = primary
+        self.replicas = replicas
+        self._rand = rand or random.Random()
+        # Highest replay LSN seen per replica; replay only moves forward, so it is a safe lower bound
+        self._replayed = [0] * len(replicas)
+        self._lock = threading.Lock()
+
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        return self.executor_for(sql).fetch_all(sql, params)
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        return self.executor_for(sql).execute(sql, params)
+
+    def executor_for(self, sql: str, min_lsn: int = 0) -> SqlExecutor:
+        """The executor a statement is routed to. With `min_lsn`, reads need a replica replayed up to it."""
+        if not is_read(sql):
+            return self.primary
+        for index in self._replica_order():
+            if self._replayed_to(index, min_lsn):
+                return self.replicas[index].executor
+        return self.primary
+
+    def session(self, lsn: str | None = None) -> "PgRoutingSession":
+        """
+        A read-your-writes session. Pass the LSN of an earlier session (e.g. kept in a cookie)
+        to carry its writes over to a new request.
+        """
+        return PgRoutingSession(self, parse_lsn(lsn) if lsn else 0)
+
+    def _replica_order(self) -> List[int]:
+        """Weighted random order of the replicas - earlier is likelier for heavier weights"""
+        keys = []
+        for index, replica in enumerate(self.replicas):
+            if replica.weight > 0:
+                keys.append((self._rand.random() ** (1.0 / replica.weight), index))
+        return [index for _, index in sorted(keys, reverse=True)]
+
+    def _replayed_to(self, index: int, min_lsn: int) -> bool:
+        if self._replayed[index] >= min_lsn:
+            return True
+        rows = self.replicas[index].executor.fetch_all(REPLAY_LSN_SQL)
+        # NULL when the node is not in recovery
+        if not rows or rows[0][0] is None:
+            return False
+        lsn = parse_lsn(rows[0][0])
+        with self._lock:
+            self._replayed[index] = max(self._replayed[index], lsn)
+        return lsn >= min_lsn
+
+
+class PgRoutingSession(SqlExecutor):
+    """
+    Routes like its router, but reads only from replicas that have replayed this session's writes.
+    With a primary executor that does not autocommit, call `record_write()` after committing.
+    """
+
+    def __init__(self, router: PgReplicaRouter, min_lsn: int = 0):
+        self.router = router
+        self.min_lsn = min_lsn
+
+    @property
+    def lsn(self) -> str | None:
+        """The WAL position of the session's last write, as a pg_lsn"""
+        if not self.min_lsn:
+            return None
+        return f"{self.min_lsn >> 32:X}/{self.min_lsn & 0xFFFFFFFF:X}"
+
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        executor = self.router.executor_for(sql, self.min_lsn)
+        rows = executor.fetch_all(sql, params)
+        if not is_read(sql):
+            self.record_write()
+        return rows
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        executor = self.router.executor_for(sql, self.min_lsn)
+        rowcount = executor.execute(sql, params)
+        if not is_read(sql):
+            self.record_write()
+        return rowcount
+
+    def record_write(self) -> None:
+        rows = self.router.primary.fetch_all(CURRENT_LSN_SQL)
+        self.min_lsn = max(self.min_lsn, parse_lsn(rows[0][0]))
@@ -0,0 +1,194 @@
+import hashlib
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple, TypeGuard
+from sql_composer.db_models import Column
+from sql_composer.db_conditions import (
+    AndGroup,
+    Condition,
+    Page,
+    Sort,
+    SortType,
+    SqlQueryCriteria,
+    Where,
+    WhereClause,
+)
+from sql_composer.pg.pg_data_types import TEXT_TYPES
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+
+"""
+Hash sharding across several PostgreSQL databases.
+
+A sharded table declares its shard key (`Table.shard_key`) and a ShardMap
+assigns each key value to a shard by a stable hash. PgShardedComposer routes a
+SELECT whose criteria pin the shard key with EQUAL or IN to the shards owning
+those values, each with only its own values in the IN list. Any other SELECT is
+scattered to every shard in parallel and the results are gathered:
+
+- With a sort, each shard returns its rows sorted and the rows are combined
+  with a k-way heap merge, so the merged result is sorted too. Text sort keys
+  are sorted `COLLATE "C"` on every shard - byte order, which is the order
+  Python compares them in - instead of the database collation.
+- A page is pushed down as LIMIT offset + limit on every shard; the offset and
+  limit are applied to the merged rows.
+
+Joins and aggregates across shards are not supported.
+"""
+
+
+class ShardMap:
+    """Assigns shard key values to shards by hash, modulo the number of shards"""
+
+    def __init__(self, shards: Sequence[SqlExecutor]):
+        if not shards:
+            raise ValueError("A shard map needs at least one shard")
+        self.shards = shards
+
+    def shard_for(self, value: Any) -> int:
+        # Python's hash() of strings changes between processes, the shard of a row must not
+        digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % len(self.shards)
+
+
+class _Descending:
+    """Inverts the order of a sort key"""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: Any):
+        self.key = key
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.key < self.key
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.key == other.key
+
+
+def byte_order_sorts(sorts: List[Sort], columns: Sequence[Column]) -> List[Sort]:
+    """The sorts with text sort keys collated "C", so each stream is sorted the way merge_sorted() compares"""
+    text_fields = {column.name for column in columns if column.type_ in TEXT_TYPES}
+    return [replace(sort, collation="C") if sort.field in text_fields else sort for sort in sorts]
+
+
+def merge_sorted(results: Sequence[Iterable[tuple]], columns: Sequence[Column], sorts: List[Sort]) -> Iterator[tuple]:
+    """
+    K-way heap merge of row streams that are each sorted by `sorts`, the sort fields being selected columns.
+    Python compares text by code point, so text sort keys must be sorted COLLATE "C" (see byte_order_sorts()) -
+    streams sorted by a linguistic collation would be interleaved out of order without an error.
+    """
+    positions = {column.name: index for index, column in enumerate(columns)}
+    keys = []
+    for sort in sorts:
+        if sort.field not in positions:
+            raise ValueError(f"Sort field must be selected to merge results: {sort.field}")
+        if columns[positions[sort.field]].type_ in TEXT_TYPES and sort.collation != "C":
+            raise ValueError(f'Text sort field {sort.field} must be sorted COLLATE "C" to merge results')
+        keys.append((positions[sort.field], sort.sort_type == SortType.DESC))
+
+    def sort_key(row: tuple) -> Tuple[Any, ...]:
+        # PostgreSQL sorts NULLs last ascending and first descending
+        return tuple(
+            _Descending((row[i] is None, row[i])) if descending else (row[i] is None, row[i]) for i, descending in keys
+        )
+
+    return heapq.merge(*results, key=sort_key)
+
+
+class PgShardedComposer:
+    def __init__(self, composer: SqlComposer, shard_map: ShardMap, max_workers: int | None = None):
+        shard_key = composer.table.shard_key
+        if shard_key is None or all(column.name != shard_key for column in composer.table.columns):
+            raise ValueError(f"Table {composer.table.name} has no shard key column")
+        self.composer = composer
+        self.shard_map = shard_map
+        self.shard_key = shard_key
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or len(shard_map.shards))
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+    def route(self, query_criteria: SqlQueryCriteria | None) -> Dict[int, SqlQueryCriteria | None]:
+        """
+        The criteria to run on each shard. Criteria pinning the shard key go to the shards owning
+        the pinned values, an empty dict when no value can match; others go to every shard as-is.
+        """
+        where = query_criteria.where if query_criteria else None
+        pinned = self._pinned_values(where.conditions) if where else None
+        if query_criteria is None or where is None or pinned is None:
+            return {shard: query_criteria for shard in range(len(self.shard_map.shards))}
+
+        values_by_shard: Dict[int, List[Any]] = {}
+        for value in pinned:
+            values_by_shard.setdefault(self.shard_map.shard_for(value), []).append(value)
+
+        conditions = [c for c in where.conditions if not self._pins_shard_key(c)]
+        routed = {}
+        for shard, values in values_by_shard.items():
+            op = PgFilterOp.EQUAL if len(values) == 1 else PgFilterOp.IN
+            shard_where = WhereClause(conditions + [Where(self.shard_key, op, values)])
+            routed[shard] = replace(query_criteria, where=shard_where)
+        return routed
+
+    def select(self, columns: List[Column], query_criteria: SqlQueryCriteria | None = None) -> List[tuple]:
+        routed = self.route(query_criteria)
+        if len(routed) == 1:
+            [(shard, criteria)] = routed.items()
+            return self._fetch(shard, columns, criteria)
+
+        page = query_criteria.page if query_criteria else None
+        shard_page = None
+        if page is not None and page.limit is not None:
+            shard_page = Page(limit=(page.offset or 0) + page.limit)
+        sorts = byte_order_sorts(query_criteria.sort, columns) if query_criteria and query_criteria.sort else []
+        futures = [
+            self._pool.submit(
+                self._fetch,
+                shard,
+                columns,
+                replace(criteria or SqlQueryCriteria(), page=shard_page, sort=sorts or None),
+            )
+            for shard, criteria in routed.items()
+        ]
+        results = [future.result() for future in futures]
+
+        merged = merge_sorted(results, columns, sorts) if sorts else itertools.chain.from_iterable(results)
+        start = (page.offset or 0) if page else 0
+        stop = start + page.limit if page and page.limit is not None else None
+        return list(itertools.islice(merged, start, stop))
+
+    def insert(self, key_values: Dict[str, Any]) -> int:
+        """Insert a row into the shard owning its shard key value"""
+        if self.shard_key not in key_values:
+            raise ValueError(f"Missing shard key: {self.shard_key}")
+        sql, params = self.composer.insert_with_params(key_values)
+        return self.shard_map.shards[self.shard_map.shard_for(key_values[self.shard_key])].execute(sql, params)
+
+    def _fetch(self, shard: int, columns: List[Column], criteria: SqlQueryCriteria | None) -> List[tuple]:
+        sql, params = self.composer.select_with_params(columns, query_criteria=criteria)
+        return self.shard_map.shards[shard].fetch_all(sql, params)
+
+    def _pinned_values(self, conditions: List[Condition]) -> List[Any] | None:
+        """Shard key values the ANDed conditions allow, None when they allow any value"""
+        pinned: List[Any] | None = None
+        for condition in conditions:
+            if isinstance(condition, AndGroup):
+                values = self._pinned_values(condition.conditions)
+            elif self._pins_shard_key(condition):
+                values = list(condition.values)
+            else:
+                continue
+            if values is not None:
+                pinned = values if pinned is None else [v for v in pinned if v in values]
+        return pinned
+
+    def _pins_shard_key(self, condition: Condition) -> TypeGuard[Where]:
+        return (
+            isinstance(condition, Where)
+            and condition.field == self.shard_key
+            and condition.op in (PgFilterOp.EQUAL, PgFilterOp.IN)
+        )
@@ -1,16 +1,203 @@
-import json
 import math
-from typing import Any, List, Tuple
-from sql_composer.db_models import Column, Table
-from sql_composer.db_conditions import Where, Sort, Page, SqlQueryCriteria
-from sql_composer.pg.pg_data_types import PgDataTypes
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+from sql_composer.db_models import Column, ColumnRef, Table
+from sql_composer.db_conditions import FilterOp, Where, Sort, Page, SqlQueryCriteria
+from sql_composer.pg.pg_data_types import TEXT_TYPES, PgDataTypes
 from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_explain import ExplainPlan, parse_explain
+from sql_composer.pg.pg_predicate_simplifier import simplify_predicate
+from sql_composer.sql_ir import (
+    AggregateNode,
+    AndNode,
+    ColumnEqualsNode,
+    ComparisonNode,
+    DeleteNode,
+    ExplainNode,
+    InSubqueryNode,
+    InUnnestNode,
+    RowInNode,
+    InsertManyNode,
+    InsertNode,
+    JoinNode,
+    NotNode,
+    OrNode,
+    Param,
+    PredicateNode,
+    SelectNode,
+    StatementNode,
+    UpdateNode,
+    comparison_from_where,
+    predicate_from_where_clause,
+    sort_from_query_criteria,
+)
+from sql_composer.sql_observer import SqlObserver, observed
+from sql_composer.sql_json import JsonCodec, StdlibJsonCodec
+from sql_composer.sql_placeholders import Params, Placeholders
+from sql_composer.sql_sink import SqlSink
 from sql_composer.sql_translator import SqlTranslator
 
 
+class _RenderContext:
+    """Output buffer and collected parameters of one rendering pass"""
+
+    def __init__(self, parameterized: bool, sink: SqlSink | None = None):
+        self.parameterized = parameterized
+        self.params: List[Any] = []
+        self._parts: List[str] = []
+        # Aggregates by alias, rendered in place of the alias while rendering HAVING
+        self.aggregates: Dict[str, AggregateNode] = {}
+        # With a sink, flush() moves the buffered fragments to it
+        self.sink = sink
+
+    def write(self, fragment: str):
+        self._parts.append(fragment)
+
+    def flush(self):
+        if self.sink is not None and self._parts:
+            self.sink.write("".join(self._parts))
+            self._parts.clear()
+
+    def sql(self) -> str:
+        return "".join(self._parts)
+
+
+# Operators taking exactly one value
+_SINGLE_VALUE_OPS = (
+    PgFilterOp.EQUAL,
+    PgFilterOp.NOT_EQUAL,
+    PgFilterOp.LESS_THAN,
+    PgFilterOp.LESS_THAN_OR_EQUAL,
+    PgFilterOp.GREATER_THAN,
+    PgFilterOp.GREATER_THAN_OR_EQUAL,
+    PgFilterOp.LIKE,
+    PgFilterOp.NOT_LIKE,
+    PgFilterOp.ILIKE,
+    PgFilterOp.NOT_ILIKE,
+    PgFilterOp.REGEXP,
+    PgFilterOp.NOT_REGEXP,
+    PgFilterOp.REGEXP_CASE_INSENSITIVE,
+    PgFilterOp.NOT_REGEXP_CASE_INSENSITIVE,
+    PgFilterOp.CONTAINS,
+    PgFilterOp.IS_CONTAINED_BY,
+    PgFilterOp.OVERLAPS,
+    PgFilterOp.JSON_CONTAINS,
+    PgFilterOp.JSON_IS_CONTAINED_BY,
+    PgFilterOp.JSON_HAS_KEY,
+    PgFilterOp.JSON_HAS_ANY_KEY,
+    PgFilterOp.JSON_HAS_ALL_KEYS,
+    PgFilterOp.CONTAINS_STRING,
+    PgFilterOp.NOT_CONTAINS_STRING,
+    PgFilterOp.CONTAINS_STRING_CASE_INSENSITIVE,
+    PgFilterOp.NOT_CONTAINS_STRING_CASE_INSENSITIVE,
+    PgFilterOp.SIMILAR_TO,
+    PgFilterOp.NOT_SIMILAR_TO,
+    PgFilterOp.OVERLAPS_GEOMETRY,
+    PgFilterOp.CONTAINS_GEOMETRY,
+    PgFilterOp.IS_CONTAINED_BY_GEOMETRY,
+    PgFilterOp.INTERSECTS,
+    PgFilterOp.CONTAINS_INET,
+    PgFilterOp.IS_CONTAINED_BY_INET,
+    PgFilterOp.IS_SUBNET,
+    PgFilterOp.IS_SUPERNET,
+    PgFilterOp.FULLTEXT_MATCH,
+    PgFilterOp.FULLTEXT_QUERY,
+    PgFilterOp.IS_DISTINCT_FROM,
+    PgFilterOp.IS_NOT_DISTINCT_FROM,
+    PgFilterOp.ANY,
+    PgFilterOp.ALL,
+    PgFilterOp.SOME,
+    PgFilterOp.EXISTS,
+    PgFilterOp.NOT_EXISTS,
+)
+
+# Operators taking exactly two values
+_TWO_VALUE_OPS = (
+    PgFilterOp.BETWEEN,
+    PgFilterOp.NOT_BETWEEN,
+)
+
+
+# Operators comparing the column with an array of its elements
+_ARRAY_PARAM_OPS = (
+    PgFilterOp.ANY,
+    PgFilterOp.ALL,
+    PgFilterOp.SOME,
+    PgFilterOp.CONTAINS,
+    PgFilterOp.IS_CONTAINED_BY,
+    PgFilterOp.OVERLAPS,
+)
+
+# Operators taking a text pattern whatever the column type
+_TEXT_PARAM_OPS = (
+    PgFilterOp.LIKE,
+    PgFilterOp.NOT_LIKE,
+    PgFilterOp.ILIKE,
+    PgFilterOp.NOT_ILIKE,
+    PgFilterOp.REGEXP,
+    PgFilterOp.NOT_REGEXP,
+    PgFilterOp.REGEXP_CASE_INSENSITIVE,
+    PgFilterOp.NOT_REGEXP_CASE_INSENSITIVE,
+    PgFilterOp.CONTAINS_STRING,
+    PgFilterOp.NOT_CONTAINS_STRING,
+    PgFilterOp.CONTAINS_STRING_CASE_INSENSITIVE,
+    PgFilterOp.NOT_CONTAINS_STRING_CASE_INSENSITIVE,
+    PgFilterOp.SIMILAR_TO,
+    PgFilterOp.NOT_SIMILAR_TO,
+)
+
+# Operators whose parameter type doesn't follow from the column (tsquery, geometry, inet, subqueries)
+_UNTYPED_PARAM_OPS = (
+    PgFilterOp.FULLTEXT_MATCH,
+    PgFilterOp.FULLTEXT_QUERY,
+    PgFilterOp.OVERLAPS_GEOMETRY,
+    PgFilterOp.CONTAINS_GEOMETRY,
+    PgFilterOp.IS_CONTAINED_BY_GEOMETRY,
+    PgFilterOp.INTERSECTS,
+    PgFilterOp.CONTAINS_INET,
+    PgFilterOp.IS_CONTAINED_BY_INET,
+    PgFilterOp.IS_SUBNET,
+    PgFilterOp.IS_SUPERNET,
+    PgFilterOp.EXISTS,
+    PgFilterOp.NOT_EXISTS,
+)
+
+
 class PgSqlTranslator(SqlTranslator):
     """PostgreSQL Translator"""
 
+    def __init__(
+        self,
+        observer: SqlObserver | None = None,
+        simplify_predicates: bool = False,
+        placeholders: Placeholders | None = None,
+        typed_params: bool = False,
+        json_codec: JsonCodec | None = None,
+        validate_json: bool = True,
+        row_in_unnest_threshold: int = 1000,
+        text_search_config: str | None = None,
+    ):
+        super().__init__(observer, placeholders)
+        # Cast parameters to their column's type (`%s::int8`) so the planner never has to infer it
+        self.typed_params = typed_params
+        self.json_codec = json_codec or StdlibJsonCodec()
+        # Parse JSON strings inlined into literal SQL to reject invalid documents; skip for trusted input
+        self.validate_json = validate_json
+        # RowIn conditions with more rows are rendered as a join with unnest() of one array per field
+        self.row_in_unnest_threshold = row_in_unnest_threshold
+        # Full text filters on text columns match `to_tsvector(config, field)`, which an expression index can serve;
+        # without a config `field @@ ...` uses the server's default_text_search_config
+        self.text_search_config = text_search_config
+        # Run pg_predicate_simplifier over every WHERE before rendering
+        self.simplify_predicates = simplify_predicates
+
+    def simplify_predicate(self, node: PredicateNode | None) -> PredicateNode | None:
+        if not self.simplify_predicates:
+            return node
+        return simplify_predicate(node)
+
     @staticmethod
     def _escape_string(value: str) -> str:
         """Enhanced string escaping for PostgreSQL - WARNING: Not sufficient for production use"""
@@ -61,229 +248,74 @@ class PgSqlTranslator(SqlTranslator):
             case PgDataTypes.TIME:
                 return f"'{self._escape_string(str(value))}'"
             case PgDataTypes.JSON | PgDataTypes.JSONB:
-                # If value is already a string, validate it's valid JSON
-                if isinstance(value, str):
+                if isinstance(value, (str, bytes, bytearray, memoryview)) and self.validate_json:
                     try:
-                        json.loads(value)
-                    except json.JSONDecodeError as e:
+                        self.json_codec.validate(value)
+                    except ValueError as e:
                         raise ValueError(f"Invalid JSON string for column '{column.name}': {e}")
-                    return f"'{self._escape_string(value)}'"
-                return f"'{self._escape_string(json.dumps(value))}'"
+                # A literal is part of the SQL string: encoded bytes are decoded and escaped into it, a copy each.
+                # Bind them as a parameter to skip the escaping copy
+                return f"'{self._escape_string(self._json_text(value))}'"
             case PgDataTypes.UUID:
                 return f"'{self._escape_string(str(value))}'"
             case _:
                 # Default case: treat as string
                 return f"'{self._escape_string(str(value))}'"
 
-    def where_to_sql(self, where: Where, column: Column) -> str:
-        # Convert all values to SQL expressions
-        values_as_pg_sql = [self.val_to_sql(column, value) for value in where.values]
-
-        if len(values_as_pg_sql) != 1 and where.op in (
-            PgFilterOp.EQUAL,
-            PgFilterOp.NOT_EQUAL,
-            PgFilterOp.LESS_THAN,
-            PgFilterOp.LESS_THAN_OR_EQUAL,
-            PgFilterOp.GREATER_THAN,
-            PgFilterOp.GREATER_THAN_OR_EQUAL,
-            PgFilterOp.LIKE,
-            PgFilterOp.NOT_LIKE,
-            PgFilterOp.ILIKE,
-            PgFilterOp.NOT_ILIKE,
-            PgFilterOp.REGEXP,
-            PgFilterOp.NOT_REGEXP,
-            PgFilterOp.REGEXP_CASE_INSENSITIVE,
-            PgFilterOp.NOT_REGEXP_CASE_INSENSITIVE,
-            PgFilterOp.CONTAINS,
-            PgFilterOp.IS_CONTAINED_BY,
-            PgFilterOp.OVERLAPS,
-            PgFilterOp.JSON_CONTAINS,
-            PgFilterOp.JSON_IS_CONTAINED_BY,
-            PgFilterOp.JSON_HAS_KEY,
-            PgFilterOp.JSON_HAS_ANY_KEY,
-            PgFilterOp.JSON_HAS_ALL_KEYS,
-            PgFilterOp.CONTAINS_STRING,
-            PgFilterOp.NOT_CONTAINS_STRING,
-            PgFilterOp.CONTAINS_STRING_CASE_INSENSITIVE,
-            PgFilterOp.NOT_CONTAINS_STRING_CASE_INSENSITIVE,
-            PgFilterOp.SIMILAR_TO,
-            PgFilterOp.NOT_SIMILAR_TO,
-            PgFilterOp.OVERLAPS_GEOMETRY,
-            PgFilterOp.CONTAINS_GEOMETRY,
-            PgFilterOp.IS_CONTAINED_BY_GEOMETRY,
-            PgFilterOp.INTERSECTS,
-            PgFilterOp.CONTAINS_INET,
-            PgFilterOp.IS_CONTAINED_BY_INET,
-            PgFilterOp.IS_SUBNET,
-            PgFilterOp.IS_SUPERNET,
-            PgFilterOp.FULLTEXT_MATCH,
-            PgFilterOp.FULLTEXT_QUERY,
-            PgFilterOp.IS_DISTINCT_FROM,
-            PgFilterOp.IS_NOT_DISTINCT_FROM,
-            PgFilterOp.ANY,
-            PgFilterOp.ALL,
-            PgFilterOp.SOME,
-            PgFilterOp.EXISTS,
-            PgFilterOp.NOT_EXISTS,
-        ):
-            raise ValueError(f"Operator {where.op} requires exactly 1 value, got {len(where.values)}")
-
-        if len(values_as_pg_sql) != 2 and where.op in (
-            PgFilterOp.BETWEEN,
-            PgFilterOp.NOT_BETWEEN,
-        ):
-            raise ValueError(f"Operator {where.op} requires exactly 2 values, got {len(where.values)}")
-
-        match where.op:
-            # Single value operators - raise exception if multiple values provided
-            case PgFilterOp.EQUAL:
-                return f"{where.field} = {values_as_pg_sql[0]}"
-            case PgFilterOp.NOT_EQUAL:
-                return f"{where.field} != {values_as_pg_sql[0]}"
-            case PgFilterOp.LESS_THAN:
-                return f"{where.field} < {values_as_pg_sql[0]}"
-            case PgFilterOp.LESS_THAN_OR_EQUAL:
-                return f"{where.field} <= {values_as_pg_sql[0]}"
-            case PgFilterOp.GREATER_THAN:
-                return f"{where.field} > {values_as_pg_sql[0]}"
-            case PgFilterOp.GREATER_THAN_OR_EQUAL:
-                return f"{where.field} >= {values_as_pg_sql[0]}"
-
-            # Multiple value operators - support multiple values
-            case PgFilterOp.IN:
-                if len(where.values) == 0:
-                    raise ValueError(f"Operator {where.op} requires at least 1 value, got 0")
-                if len(where.values) == 1:
-                    return f"{where.field} = {values_as_pg_sql[0]}"
-                else:
-                    return f"{where.field} IN ({', '.join(values_as_pg_sql)})"
-            case PgFilterOp.NOT_IN:
-                if len(where.values) == 0:
-                    raise ValueError(f"Operator {where.op} requires at least 1 value, got 0")
-                if len(where.values) == 1:
-                    return f"{where.field} != {values_as_pg_sql[0]}"
-                else:
-                    return f"{where.field} NOT IN ({', '.join(values_as_pg_sql)})"
-
-            # No value operators
-            case PgFilterOp.IS_NULL:
-                return f"{where.field} IS NULL"
-            case PgFilterOp.IS_NOT_NULL:
-                return f"{where.field} IS NOT NULL"
-
-            # Single value operators - pattern matching
-            case PgFilterOp.LIKE:
-                return f"{where.field} LIKE {values_as_pg_sql[0]}"
-            case PgFilterOp.NOT_LIKE:
-                return f"{where.field} NOT LIKE {values_as_pg_sql[0]}"
-            case PgFilterOp.ILIKE:
-                return f"{where.field} ILIKE {values_as_pg_sql[0]}"
-            case PgFilterOp.NOT_ILIKE:
-                return f"{where.field} NOT ILIKE {values_as_pg_sql[0]}"
-
-            # Two value operators - range operators
-            case PgFilterOp.BETWEEN:
-                return f"{where.field} BETWEEN {values_as_pg_sql[0]} AND {values_as_pg_sql[1]}"
-            case PgFilterOp.NOT_BETWEEN:
-                return f"{where.field} NOT BETWEEN {values_as_pg_sql[0]} AND {values_as_pg_sql[1]}"
-
-            # Single value operators - regular expressions
-            case PgFilterOp.REGEXP:
-                return f"{where.field} ~ {values_as_pg_sql[0]}"
-            case PgFilterOp.NOT_REGEXP:
-                return f"{where.field} !~ {values_as_pg_sql[0]}"
-            case PgFilterOp.REGEXP_CASE_INSENSITIVE:
-                return f"{where.field} ~* {values_as_pg_sql[0]}"
-            case PgFilterOp.NOT_REGEXP_CASE_INSENSITIVE:
-                return f"{where.field} !~* {values_as_pg_sql[0]}"
-
-            # Single value operators - arrays
-            case PgFilterOp.CONTAINS:
-                return f"{where.field} @> {values_as_pg_sql[0]}"
-            case PgFilterOp.IS_CONTAINED_BY:
-                return f"{where.field} <@ {values_as_pg_sql[0]}"
-            case PgFilterOp.OVERLAPS:
-                return f"{where.field} && {values_as_pg_sql[0]}"
-
-            # Single value operators - JSON
-            case PgFilterOp.JSON_CONTAINS:
-                return f"{where.field} @> {values_as_pg_sql[0]}"
-            case PgFilterOp.JSON_IS_CONTAINED_BY:
-                return f"{where.field} <@ {values_as_pg_sql[0]}"
-            case PgFilterOp.JSON_HAS_KEY:
-                return f"{where.field} ? {values_as_pg_sql[0]}"
-            case PgFilterOp.JSON_HAS_ANY_KEY:
-                return f"{where.field} ?| {values_as_pg_sql[0]}"
-            case PgFilterOp.JSON_HAS_ALL_KEYS:
-                return f"{where.field} ?& {values_as_pg_sql[0]}"
-
-            # Single value operators - strings
-            case PgFilterOp.CONTAINS_STRING:
-                return f"{where.field} ~~ {values_as_pg_sql[0]}"
-            case PgFilterOp.NOT_CONTAINS_STRING:
-                return f"{where.field} !~~ {values_as_pg_sql[0]}"
-            case PgFilterOp.CONTAINS_STRING_CASE_INSENSITIVE:
-                return f"{where.field} ~~* {values_as_pg_sql[0]}"
-            case PgFilterOp.NOT_CONTAINS_STRING_CASE_INSENSITIVE:
-                return f"{where.field} !~~* {values_as_pg_sql[0]}"
-
-            # Single value operators - similar to
-            case PgFilterOp.SIMILAR_TO:
-                return f"{where.field} SIMILAR TO {values_as_pg_sql[0]}"
-            case PgFilterOp.NOT_SIMILAR_TO:
-                return f"{where.field} NOT SIMILAR TO {values_as_pg_sql[0]}"
-
-            # Single value operators - geometric
-            case PgFilterOp.OVERLAPS_GEOMETRY:
-                return f"{where.field} && {values_as_pg_sql[0]}"
-            case PgFilterOp.CONTAINS_GEOMETRY:
-                return f"{where.field} @> {values_as_pg_sql[0]}"
-            case PgFilterOp.IS_CONTAINED_BY_GEOMETRY:
-                return f"{where.field} <@ {values_as_pg_sql[0]}"
-            case PgFilterOp.INTERSECTS:
-                return f"{where.field} && {values_as_pg_sql[0]}"
-
-            # Single value operators - network
-            case PgFilterOp.CONTAINS_INET:
-                return f"{where.field} >> {values_as_pg_sql[0]}"
-            case PgFilterOp.IS_CONTAINED_BY_INET:
-                return f"{where.field} << {values_as_pg_sql[0]}"
-            case PgFilterOp.IS_SUBNET:
-                return f"{where.field} >>= {values_as_pg_sql[0]}"
-            case PgFilterOp.IS_SUPERNET:
-                return f"{where.field} <<= {values_as_pg_sql[0]}"
-
-            # Single value operators - full text search
-            case PgFilterOp.FULLTEXT_MATCH:
-                return f"{where.field} @@ {values_as_pg_sql[0]}"
-            case PgFilterOp.FULLTEXT_QUERY:
-                return f"{where.field} @@@ {values_as_pg_sql[0]}"
+    def sql_to_val(self, column: Column, value: Any) -> Any:
+        """
+        Decode a value returned by the database. Drivers such as psycopg2 already return most types
+        as Python objects; text representations (e.g. from a text-mode driver) are parsed here.
+        """
+        if value is None or not isinstance(value, str):
+            return value
 
-            # Single value operators - special comparison
-            case PgFilterOp.IS_DISTINCT_FROM:
-                return f"{where.field} IS DISTINCT FROM {values_as_pg_sql[0]}"
-            case PgFilterOp.IS_NOT_DISTINCT_FROM:
-                return f"{where.field} IS NOT DISTINCT FROM {values_as_pg_sql[0]}"
+        match column.type_:
+            case (
+                PgDataTypes.INT
+                | PgDataTypes.INT4
+                | PgDataTypes.INTEGER
+                | PgDataTypes.BIGINT
+                | PgDataTypes.INT8
+                | PgDataTypes.SMALLINT
+                | PgDataTypes.INT2
+            ):
+                return int(value)
+            case PgDataTypes.NUMERIC | PgDataTypes.DECIMAL:
+                return Decimal(value)
+            case PgDataTypes.REAL | PgDataTypes.FLOAT4 | PgDataTypes.DOUBLE_PRECISION | PgDataTypes.FLOAT8:
+                return float(value)
+            case PgDataTypes.BOOLEAN | PgDataTypes.BOOL:
+                return value.lower() in ("t", "true")
+            case PgDataTypes.DATE:
+                return date.fromisoformat(value)
+            case (
+                PgDataTypes.TIMESTAMP
+                | PgDataTypes.TIMESTAMP_WITHOUT_TIME_ZONE
+                | PgDataTypes.TIMESTAMPTZ
+                | PgDataTypes.TIMESTAMP_WITH_TIME_ZONE
+            ):
+                return datetime.fromisoformat(value)
+            case PgDataTypes.TIME:
+                return time.fromisoformat(value)
+            case PgDataTypes.JSON | PgDataTypes.JSONB:
+                return self.json_codec.loads(value)
+            case PgDataTypes.UUID:
+                return uuid.UUID(value)
+            case _:
+                return value
 
-            # Single value operators - subquery
-            case PgFilterOp.ANY:
-                return f"{where.field} = ANY({values_as_pg_sql[0]})"
-            case PgFilterOp.ALL:
-                return f"{where.field} = ALL({values_as_pg_sql[0]})"
-            case PgFilterOp.SOME:
-                return f"{where.field} = SOME({values_as_pg_sql[0]})"
+    def parse_plan(self, rows: List[tuple]) -> ExplainPlan:
+        return parse_explain(rows[0][0])
 
-            # Single value operators - exists
-            case PgFilterOp.EXISTS:
-                return f"EXISTS({values_as_pg_sql[0]})"
-            case PgFilterOp.NOT_EXISTS:
-                return f"NOT EXISTS({values_as_pg_sql[0]})"
-
-            # Default case for any unhandled operators
-            case _:
-                raise ValueError(f"Unsupported operator: {where.op} for field {where.field}")
+    def where_to_sql(self, where: Where, column: Column) -> str:
+        ctx = _RenderContext(parameterized=False)
+        self._render_predicate(ctx, comparison_from_where(where, column))
+        return ctx.sql()
 
     def sort_to_sql(self, sort: Sort) -> str:
+        if sort.collation is not None:
+            return f'{sort.field} COLLATE "{sort.collation}" {sort.sort_type.value}'
         return f"{sort.field} {sort.sort_type.value}"
 
     def page_criteria_to_sql(self, pagination: Page) -> str:
@@ -294,293 +326,523 @@ class PgSqlTranslator(SqlTranslator):
             page_criteria_as_sql.append(f"OFFSET {pagination.offset}")
         return " ".join(page_criteria_as_sql)
 
+    @observed("criteria")
     def query_criteria_to_sql(self, query_criteria: SqlQueryCriteria | None, table: Table) -> str:
-        query_criteria_as_sql = ""
         if query_criteria is None:
-            return query_criteria_as_sql
-
-        columns_by_name = {c.name: c for c in table.columns}
+            return ""
 
-        # Query Criteria - Where
-        if query_criteria.where:
-            conditions_as_sql = [
-                f"{self.where_to_sql(condition, columns_by_name[condition.field])}"
-                for condition in query_criteria.where.conditions
-                if condition.field in columns_by_name
-            ]
-
-            if conditions_as_sql:
-                conditions_as_sql = "\nAND ".join(conditions_as_sql)
-                query_criteria_as_sql += f"\nWHERE {conditions_as_sql}"
-
-        # Query Criteria - Sort
-        if query_criteria.sort:
-            sort_criteria_as_sql = [
-                f"{self.sort_to_sql(sort)}" for sort in query_criteria.sort if sort.field in columns_by_name
-            ]
-
-            if sort_criteria_as_sql:
-                sort_criteria_as_sql = " ".join(sort_criteria_as_sql)
-                query_criteria_as_sql += f"\nORDER BY {sort_criteria_as_sql}"
-
-        # Query Criteria - Pagination
-        if query_criteria.page:
-            query_criteria_as_sql += f"\n{self.page_criteria_to_sql(query_criteria.page)}"
-
-        return query_criteria_as_sql
+        ctx = _RenderContext(parameterized=False)
+        self._render_query_criteria(ctx, query_criteria, table)
+        return ctx.sql()
 
+    @observed("criteria")
     def query_criteria_to_sql_with_params(
         self, query_criteria: SqlQueryCriteria | None, table: Table
-    ) -> Tuple[str, List[Any]]:
+    ) -> Tuple[str, Params]:
         """
         Generate parameterized SQL with extracted parameters.
-        Returns a tuple of (SQL with %s placeholders, parameters list).
+        Returns a tuple of (SQL with placeholders, parameters).
         """
         if query_criteria is None:
-            return "", []
-
-        columns_by_name = {c.name: c for c in table.columns}
-        query_criteria_as_sql = ""
-        params = []
-
-        # Query Criteria - Where
-        if query_criteria.where:
-            conditions_as_sql = []
-            for condition in query_criteria.where.conditions:
-                if condition.field in columns_by_name:
-                    condition_sql, condition_params = self.where_to_sql_with_params(condition)
-                    conditions_as_sql.append(condition_sql)
-                    params.extend(condition_params)
-
-            if conditions_as_sql:
-                conditions_as_sql = "\nAND ".join(conditions_as_sql)
-                query_criteria_as_sql += f"\nWHERE {conditions_as_sql}"
-
-        # Query Criteria - Sort
-        if query_criteria.sort:
-            sort_criteria_as_sql = [
-                f"{self.sort_to_sql(sort)}" for sort in query_criteria.sort if sort.field in columns_by_name
-            ]
-
-            if sort_criteria_as_sql:
-                sort_criteria_as_sql = " ".join(sort_criteria_as_sql)
-                query_criteria_as_sql += f"\nORDER BY {sort_criteria_as_sql}"
-
-        # Query Criteria - Pagination
-        if query_criteria.page:
-            query_criteria_as_sql += f"\n{self.page_criteria_to_sql(query_criteria.page)}"
+            return "", self.placeholders.bind([])
 
-        return query_criteria_as_sql, params
+        ctx = _RenderContext(parameterized=True)
+        self._render_query_criteria(ctx, query_criteria, table)
+        return ctx.sql(), self.placeholders.bind(ctx.params)
 
-    def where_to_sql_with_params(self, where: Where) -> Tuple[str, List[Any]]:
+    def where_to_sql_with_params(self, where: Where) -> Tuple[str, Params]:
         """
         Generate parameterized WHERE clause with extracted parameters.
-        Returns a tuple of (SQL with %s placeholders, parameters list).
+        Returns a tuple of (SQL with placeholders, parameters).
         """
+        ctx = _RenderContext(parameterized=True)
+        self._render_predicate(ctx, comparison_from_where(where))
+        return ctx.sql(), self.placeholders.bind(ctx.params)
 
-        # Validate number of values for the operator
-        if len(where.values) != 1 and where.op in (
-            PgFilterOp.EQUAL,
-            PgFilterOp.NOT_EQUAL,
-            PgFilterOp.LESS_THAN,
-            PgFilterOp.LESS_THAN_OR_EQUAL,
-            PgFilterOp.GREATER_THAN,
-            PgFilterOp.GREATER_THAN_OR_EQUAL,
-            PgFilterOp.LIKE,
-            PgFilterOp.NOT_LIKE,
-            PgFilterOp.ILIKE,
-            PgFilterOp.NOT_ILIKE,
-            PgFilterOp.REGEXP,
-            PgFilterOp.NOT_REGEXP,
-            PgFilterOp.REGEXP_CASE_INSENSITIVE,
-            PgFilterOp.NOT_REGEXP_CASE_INSENSITIVE,
-            PgFilterOp.CONTAINS,
-            PgFilterOp.IS_CONTAINED_BY,
-            PgFilterOp.OVERLAPS,
-            PgFilterOp.JSON_CONTAINS,
-            PgFilterOp.JSON_IS_CONTAINED_BY,
-            PgFilterOp.JSON_HAS_KEY,
-            PgFilterOp.JSON_HAS_ANY_KEY,
-            PgFilterOp.JSON_HAS_ALL_KEYS,
-            PgFilterOp.CONTAINS_STRING,
-            PgFilterOp.NOT_CONTAINS_STRING,
-            PgFilterOp.CONTAINS_STRING_CASE_INSENSITIVE,
-            PgFilterOp.NOT_CONTAINS_STRING_CASE_INSENSITIVE,
-            PgFilterOp.SIMILAR_TO,
-            PgFilterOp.NOT_SIMILAR_TO,
-            PgFilterOp.OVERLAPS_GEOMETRY,
-            PgFilterOp.CONTAINS_GEOMETRY,
-            PgFilterOp.IS_CONTAINED_BY_GEOMETRY,
-            PgFilterOp.INTERSECTS,
-            PgFilterOp.CONTAINS_INET,
-            PgFilterOp.IS_CONTAINED_BY_INET,
-            PgFilterOp.IS_SUBNET,
-            PgFilterOp.IS_SUPERNET,
-            PgFilterOp.FULLTEXT_MATCH,
-            PgFilterOp.FULLTEXT_QUERY,
-            PgFilterOp.IS_DISTINCT_FROM,
-            PgFilterOp.IS_NOT_DISTINCT_FROM,
-            PgFilterOp.ANY,
-            PgFilterOp.ALL,
-            PgFilterOp.SOME,
-            PgFilterOp.EXISTS,
-            PgFilterOp.NOT_EXISTS,
-        ):
-            raise ValueError(f"Operator {where.op} requires exactly 1 value, got {len(where.values)}")
+    def render(self, node: StatementNode, parameterized: bool = False) -> Tuple[str, Params]:
+        """
+        Render a statement node to SQL in a single pass.
+        Returns a tuple of (SQL, parameters); the parameters are empty unless parameterized.
+        """
+        ctx = _RenderContext(parameterized=parameterized)
+        self._render_statement(ctx, node)
+        return ctx.sql(), self.placeholders.bind(ctx.params) if parameterized else []
+
+    def render_to(self, node: StatementNode, sink: Any) -> None:
+        """
+        Render a statement node to literal SQL, streamed into a writable such as a file, io.BytesIO or
+        `socket.makefile("wb")`. Multi-row INSERTs are written row by row, so only one row is held in memory.
+        """
+        ctx = _RenderContext(parameterized=False, sink=sink if isinstance(sink, SqlSink) else SqlSink(sink))
+        self._render_statement(ctx, node)
+        ctx.flush()
+
+    # Rendering - statements
+    def _render_statement(self, ctx: _RenderContext, node: StatementNode):
+        match node:
+            case SelectNode():
+                self._render_select(ctx, node)
+            case InsertNode():
+                self._render_insert(ctx, node)
+            case InsertManyNode():
+                self._render_insert_many(ctx, node)
+            case UpdateNode():
+                self._render_update(ctx, node)
+            case DeleteNode():
+                self._render_delete(ctx, node)
+            case ExplainNode():
+                self._render_explain(ctx, node)
+            case _:
+                raise ValueError(f"Unsupported statement node: {type(node).__name__}")
+
+    def _render_select(self, ctx: _RenderContext, node: SelectNode):
+        ctx.write("\nSELECT\n    ")
+        for i, column in enumerate(node.columns):
+            if i:
+                ctx.write(", ")
+            if isinstance(column, AggregateNode):
+                self._render_aggregate(ctx, column)
+                ctx.write(f" AS {column.alias}")
+            else:
+                ctx.write(self._select_column_sql(node, column))
+
+        table_name = node.table.name if node.alias is None else f"{node.table.name} AS {node.alias}"
+        ctx.write(f"\nFROM {table_name}")
+        for join in node.joins:
+            self._render_join(ctx, join)
+        self._render_where(ctx, node.where)
+        if node.group_by:
+            ctx.write(f"\nGROUP BY {', '.join(self._select_column_sql(node, c) for c in node.group_by)}")
+        self._render_having(ctx, node)
+        self._render_sort(ctx, node.sort)
+        if node.page:
+            self._render_page(ctx, node.page)
+        ctx.write("\n")
+
+    def _render_explain(self, ctx: _RenderContext, node: ExplainNode):
+        options = ["FORMAT JSON"]
+        if node.analyze:
+            options.append("ANALYZE")
+        if node.buffers:
+            options.append("BUFFERS")
+        ctx.write(f"\nEXPLAIN ({', '.join(options)})")
+        self._render_select(ctx, node.statement)
 
-        if len(where.values) != 2 and where.op in (
-            PgFilterOp.BETWEEN,
-            PgFilterOp.NOT_BETWEEN,
+    @staticmethod
+    def _select_column_sql(node: SelectNode, column: Column | ColumnRef) -> str:
+        if isinstance(column, ColumnRef):
+            return column.sql_name
+        return column.name if node.alias is None else f"{node.alias}.{column.name}"
+
+    def _render_aggregate(self, ctx: _RenderContext, aggregate: AggregateNode):
+        distinct = "DISTINCT " if aggregate.distinct else ""
+        argument = "*" if aggregate.column is None else aggregate.column.name
+        ctx.write(f"{aggregate.func.value}({distinct}{argument})")
+        if aggregate.filter is not None:
+            ctx.write(" FILTER (WHERE ")
+            if isinstance(aggregate.filter, AndNode) and len(aggregate.filter.children) > 1:
+                for i, child in enumerate(aggregate.filter.children):
+                    if i:
+                        ctx.write(" AND ")
+                    self._render_predicate(ctx, child)
+            else:
+                self._render_predicate(ctx, aggregate.filter, top_level=True)
+            ctx.write(")")
+        if aggregate.window:
+            ctx.write(" OVER ()")
+
+    def _render_having(self, ctx: _RenderContext, node: SelectNode):
+        if node.having is None:
+            return
+        # PostgreSQL does not resolve output aliases in HAVING, so repeat the aggregate expressions
+        ctx.aggregates = {c.alias: c for c in node.columns if isinstance(c, AggregateNode)}
+        ctx.write("\nHAVING ")
+        self._render_predicate(ctx, node.having, top_level=True)
+        ctx.aggregates = {}
+
+    def _field_sql(self, ctx: _RenderContext, field: str) -> str:
+        aggregate = ctx.aggregates.get(field)
+        if aggregate is None:
+            return field
+        expression_ctx = _RenderContext(ctx.parameterized)
+        # Shared so placeholder positions keep counting across the statement
+        expression_ctx.params = ctx.params
+        self._render_aggregate(expression_ctx, aggregate)
+        return expression_ctx.sql()
+
+    def _render_join(self, ctx: _RenderContext, join: JoinNode):
+        if join.lateral is not None:
+            ctx.write(f"\n{join.join_type.value} JOIN LATERAL (")
+            self._render_select(ctx, join.lateral)
+            ctx.write(f") AS {join.alias} ON TRUE")
+            return
+
+        ctx.write(f"\n{join.join_type.value} JOIN {join.table.name} AS {join.alias} ON ")
+        if join.on is None:
+            ctx.write("TRUE")
+        else:
+            self._render_predicate(ctx, join.on, top_level=True)
+
+    def _render_insert(self, ctx: _RenderContext, node: InsertNode):
+        ctx.write(f"\nINSERT INTO {node.table.name}\n({','.join(c.name for c in node.columns)})\nVALUES\n(")
+        self._render_params(ctx, node.values)
+        ctx.write(")")
+        self._render_returning(ctx, node.returning)
+        ctx.write("\n;\n")
+
+    def _render_insert_many(self, ctx: _RenderContext, node: InsertManyNode):
+        ctx.write(f"\nINSERT INTO {node.table.name}\n({','.join(c.name for c in node.columns)})\nVALUES\n")
+        rows = 0
+        for row in node.rows:
+            if len(row) != len(node.columns):
+                raise ValueError(f"Row has {len(row)} values for {len(node.columns)} columns")
+            if rows:
+                ctx.write(",\n")
+            ctx.write("(")
+            self._render_params(ctx, row)
+            ctx.write(")")
+            rows += 1
+            # Streaming, a row is written out as soon as it is rendered
+            ctx.flush()
+        if not rows:
+            raise ValueError("No rows to insert")
+        self._render_returning(ctx, node.returning)
+        ctx.write("\n;\n")
+
+    def _render_update(self, ctx: _RenderContext, node: UpdateNode):
+        ctx.write(f"\nUPDATE {node.table.name}\nSET ")
+        for i, assignment in enumerate(node.assignments):
+            if i:
+                ctx.write(", ")
+            ctx.write(f"{assignment.column.name} = {self._render_param(ctx, assignment.param)}")
+        self._render_where(ctx, node.where)
+        self._render_returning(ctx, node.returning)
+        ctx.write("\n;\n")
+
+    def _render_delete(self, ctx: _RenderContext, node: DeleteNode):
+        ctx.write(f"\nDELETE FROM {node.table.name}")
+        self._render_where(ctx, node.where)
+        self._render_returning(ctx, node.returning)
+        ctx.write("\n;\n")
+
+    # Rendering - clauses
+    def _render_query_criteria(self, ctx: _RenderContext, query_criteria: SqlQueryCriteria, table: Table):
+        self._render_where(ctx, self.simplify_predicate(predicate_from_where_clause(query_criteria.where, table)))
+        self._render_sort(ctx, sort_from_query_criteria(query_criteria, table))
+        if query_criteria.page:
+            self._render_page(ctx, query_criteria.page)
+
+    def _render_returning(self, ctx: _RenderContext, returning: List[Column]):
+        if returning:
+            ctx.write(f"\nRETURNING {', '.join(c.name for c in returning)}")
+
+    def _render_where(self, ctx: _RenderContext, where: PredicateNode | None):
+        if where is None:
+            return
+        ctx.write("\nWHERE ")
+        self._render_predicate(ctx, where, top_level=True)
+
+    def _render_sort(self, ctx: _RenderContext, sort: List[Sort]):
+        if sort:
+            ctx.write(f"\nORDER BY {', '.join(self.sort_to_sql(s) for s in sort)}")
+
+    def _render_page(self, ctx: _RenderContext, page: Page):
+        page_sql = self.page_criteria_to_sql(page)
+        if page_sql:
+            ctx.write(f"\n{page_sql}")
+
+    def _render_predicate(self, ctx: _RenderContext, node: PredicateNode, top_level: bool = False):
+        match node:
+            case ComparisonNode():
+                field = self._field_sql(ctx, node.field)
+                if self._is_text_search(node):
+                    field = f"to_tsvector('{self.text_search_config}', {field})"
+                values_as_pg_sql = [self._render_param(ctx, param, node.op) for param in node.params]
+                ctx.write(self._comparison_sql(field, node.op, values_as_pg_sql))
+            case ColumnEqualsNode():
+                ctx.write(f"{node.left.sql_name} = {node.right.sql_name}")
+            case InSubqueryNode():
+                ctx.write(f"{node.field} = ANY(ARRAY(" if node.array else f"{node.field} IN (")
+                self._render_select(ctx, node.subquery)
+                ctx.write("))" if node.array else ")")
+            case InUnnestNode():
+                ctx.write(f"{node.field} IN (SELECT unnest({self._render_array_param(ctx, node.param)}))")
+            case RowInNode():
+                self._render_row_in(ctx, node)
+            case AndNode() | OrNode():
+                if not node.children:
+                    ctx.write("TRUE" if isinstance(node, AndNode) else "FALSE")
+                    return
+                if len(node.children) == 1:
+                    self._render_predicate(ctx, node.children[0], top_level)
+                    return
+                keyword = "AND" if isinstance(node, AndNode) else "OR"
+                separator = f"\n{keyword} " if top_level else f" {keyword} "
+                if not top_level:
+                    ctx.write("(")
+                for i, child in enumerate(node.children):
+                    if i:
+                        ctx.write(separator)
+                    self._render_predicate(ctx, child)
+                if not top_level:
+                    ctx.write(")")
+            case NotNode():
+                if isinstance(node.child, (AndNode, OrNode)) and len(node.child.children) > 1:
+                    # Nested groups bring their own parentheses
+                    ctx.write("NOT ")
+                    self._render_predicate(ctx, node.child)
+                else:
+                    ctx.write("NOT (")
+                    self._render_predicate(ctx, node.child, top_level=True)
+                    ctx.write(")")
+            case _:
+                raise ValueError(f"Unsupported predicate node: {type(node).__name__}")
+
+    def _is_text_search(self, node: ComparisonNode) -> bool:
+        if self.text_search_config is None or node.op not in (PgFilterOp.FULLTEXT_MATCH, PgFilterOp.FULLTEXT_QUERY):
+            return False
+        column = node.params[0].column if node.params else None
+        return column is not None and column.type_ in TEXT_TYPES
+
+    def _render_row_in(self, ctx: _RenderContext, node: RowInNode):
+        if not node.rows:
+            # Like an empty IN list, no row matches
+            ctx.write("FALSE")
+            return
+        ctx.write(f"({', '.join(node.fields)}) IN (")
+
+        columns = [param.column for param in node.rows[0]]
+        if len(node.rows) > self.row_in_unnest_threshold and all(
+            self._param_type(column, PgFilterOp.ANY) for column in columns
         ):
-            raise ValueError(f"Operator {where.op} requires exactly 2 values, got {len(where.values)}")
+            # A fixed number of parameters however many rows, unnest() zips the arrays back into rows
+            arrays = [
+                self._render_array_param(ctx, Param([row[i].value for row in node.rows], column))
+                for i, column in enumerate(columns)
+            ]
+            ctx.write(f"SELECT * FROM unnest({', '.join(arrays)}))")
+            return
+
+        for i, row in enumerate(node.rows):
+            if i:
+                ctx.write(", ")
+            ctx.write("(")
+            self._render_params(ctx, row)
+            ctx.write(")")
+        ctx.write(")")
+
+    def _render_params(self, ctx: _RenderContext, params: List[Param]):
+        for i, param in enumerate(params):
+            if i:
+                ctx.write(", ")
+            ctx.write(self._render_param(ctx, param))
+
+    def _render_param(self, ctx: _RenderContext, param: Param, op: FilterOp | None = None) -> str:
+        if ctx.parameterized:
+            param_type = self._param_type(param.column, op)
+            if param_type in ("json", "jsonb") and param.value is not None:
+                # Bound as JSON text, encoded once with the translator's codec
+                ctx.params.append(self._json_text(param.value))
+            else:
+                ctx.params.append(param.value)
+            placeholder = self.placeholders.placeholder(len(ctx.params))
+            return f"{placeholder}::{param_type}" if param_type and self.typed_params else placeholder
+        if param.column is None:
+            return f"'{self._escape_string(str(param.value))}'"
+        return self.val_to_sql(param.column, param.value)
+
+    def _render_array_param(self, ctx: _RenderContext, param: Param) -> str:
+        """A list of values of the param's column as one array, always cast so unnest() knows its element type"""
+        array_type = self._param_type(param.column, PgFilterOp.ANY)
+        if array_type is None or param.column is None:
+            raise ValueError("An array of values requires a column with a PostgreSQL type")
+        if ctx.parameterized:
+            ctx.params.append(list(param.value))
+            return f"{self.placeholders.placeholder(len(ctx.params))}::{array_type}"
+        return f"ARRAY[{', '.join(self.val_to_sql(param.column, value) for value in param.value)}]::{array_type}"
+
+    def _json_text(self, value: Any) -> str:
+        """
+        JSON text of a value - strings as they are, encoded bytes decoded once, anything else encoded.
+        Bytes are not passed through: drivers would bind them as bytea, and SQL text is str.
+        """
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return str(value, "utf-8")
+        return self.json_codec.dumps(value)
 
-        # Handle operators that need parameters
-        match where.op:
-            # Single value operators
+    @staticmethod
+    def _param_type(column: Column | None, op: FilterOp | None) -> str | None:
+        """The type of a parameter compared by `op` with (or assigned to) the column, if it follows from them"""
+        if column is None or not isinstance(column.type_, PgDataTypes):
+            return None
+        # A bare `char` is char(1) and would truncate the value
+        type_name = "bpchar" if column.type_ == PgDataTypes.CHAR else column.type_.value
+        element_type = type_name.removesuffix("[]")
+
+        if op in _ARRAY_PARAM_OPS:
+            return f"{element_type}[]"
+        if op in _TEXT_PARAM_OPS or op == PgFilterOp.JSON_HAS_KEY:
+            return "text"
+        if op in (PgFilterOp.JSON_HAS_ANY_KEY, PgFilterOp.JSON_HAS_ALL_KEYS):
+            return "text[]"
+        if op in _UNTYPED_PARAM_OPS:
+            return None
+        return type_name
+
+    def _comparison_sql(self, field: str, op: FilterOp, values_as_pg_sql: List[str]) -> str:
+        if len(values_as_pg_sql) != 1 and op in _SINGLE_VALUE_OPS:
+            raise ValueError(f"Operator {op} requires exactly 1 value, got {len(values_as_pg_sql)}")
+
+        if len(values_as_pg_sql) != 2 and op in _TWO_VALUE_OPS:
+            raise ValueError(f"Operator {op} requires exactly 2 values, got {len(values_as_pg_sql)}")
+
+        match op:
+            # Single value operators - raise exception if multiple values provided
             case PgFilterOp.EQUAL:
-                return f"{where.field} = %s", [where.values[0]]
+                return f"{field} = {values_as_pg_sql[0]}"
             case PgFilterOp.NOT_EQUAL:
-                return f"{where.field} != %s", [where.values[0]]
+                return f"{field} != {values_as_pg_sql[0]}"
             case PgFilterOp.LESS_THAN:
-                return f"{where.field} < %s", [where.values[0]]
+                return f"{field} < {values_as_pg_sql[0]}"
             case PgFilterOp.LESS_THAN_OR_EQUAL:
-                return f"{where.field} <= %s", [where.values[0]]
+                return f"{field} <= {values_as_pg_sql[0]}"
             case PgFilterOp.GREATER_THAN:
-                return f"{where.field} > %s", [where.values[0]]
+                return f"{field} > {values_as_pg_sql[0]}"
             case PgFilterOp.GREATER_THAN_OR_EQUAL:
-                return f"{where.field} >= %s", [where.values[0]]
+                return f"{field} >= {values_as_pg_sql[0]}"
 
-            case PgFilterOp.IS_NULL:
-                return f"{where.field} IS NULL", []
-            case PgFilterOp.IS_NOT_NULL:
-                return f"{where.field} IS NOT NULL", []
-
-            # Multiple value operators
+            # Multiple value operators - support multiple values
             case PgFilterOp.IN:
-                if len(where.values) == 0:
-                    raise ValueError(f"Operator {where.op} requires at least 1 value, got 0")
-                if len(where.values) == 1:
-                    return f"{where.field} = %s", [where.values[0]]
+                if len(values_as_pg_sql) == 0:
+                    raise ValueError(f"Operator {op} requires at least 1 value, got 0")
+                if len(values_as_pg_sql) == 1:
+                    return f"{field} = {values_as_pg_sql[0]}"
                 else:
-                    placeholders = ", ".join(["%s"] * len(where.values))
-                    return f"{where.field} IN ({placeholders})", where.values
+                    return f"{field} IN ({', '.join(values_as_pg_sql)})"
             case PgFilterOp.NOT_IN:
-                if len(where.values) == 0:
-                    raise ValueError(f"Operator {where.op} requires at least 1 value, got 0")
-                if len(where.values) == 1:
-                    return f"{where.field} != %s", [where.values[0]]
+                if len(values_as_pg_sql) == 0:
+                    raise ValueError(f"Operator {op} requires at least 1 value, got 0")
+                if len(values_as_pg_sql) == 1:
+                    return f"{field} != {values_as_pg_sql[0]}"
                 else:
-                    placeholders = ", ".join(["%s"] * len(where.values))
-                    return f"{where.field} NOT IN ({placeholders})", where.values
+                    return f"{field} NOT IN ({', '.join(values_as_pg_sql)})"
 
-            # Pattern matching operators
+            # No value operators
+            case PgFilterOp.IS_NULL:
+                return f"{field} IS NULL"
+            case PgFilterOp.IS_NOT_NULL:
+                return f"{field} IS NOT NULL"
+
+            # Single value operators - pattern matching
             case PgFilterOp.LIKE:
-                return f"{where.field} LIKE %s", [where.values[0]]
+                return f"{field} LIKE {values_as_pg_sql[0]}"
             case PgFilterOp.NOT_LIKE:
-                return f"{where.field} NOT LIKE %s", [where.values[0]]
+                return f"{field} NOT LIKE {values_as_pg_sql[0]}"
             case PgFilterOp.ILIKE:
-                return f"{where.field} ILIKE %s", [where.values[0]]
+                return f"{field} ILIKE {values_as_pg_sql[0]}"
             case PgFilterOp.NOT_ILIKE:
-                return f"{where.field} NOT ILIKE %s", [where.values[0]]
+                return f"{field} NOT ILIKE {values_as_pg_sql[0]}"
 
-            # Range operators
+            # Two value operators - range operators
             case PgFilterOp.BETWEEN:
-                return f"{where.field} BETWEEN %s AND %s", where.values
+                return f"{field} BETWEEN {values_as_pg_sql[0]} AND {values_as_pg_sql[1]}"
             case PgFilterOp.NOT_BETWEEN:
-                return f"{where.field} NOT BETWEEN %s AND %s", where.values
+                return f"{field} NOT BETWEEN {values_as_pg_sql[0]} AND {values_as_pg_sql[1]}"
 
-            # Regular expressions
+            # Single value operators - regular expressions
             case PgFilterOp.REGEXP:
-                return f"{where.field} ~ %s", [where.values[0]]
+                return f"{field} ~ {values_as_pg_sql[0]}"
             case PgFilterOp.NOT_REGEXP:
-                return f"{where.field} !~ %s", [where.values[0]]
+                return f"{field} !~ {values_as_pg_sql[0]}"
             case PgFilterOp.REGEXP_CASE_INSENSITIVE:
-                return f"{where.field} ~* %s", [where.values[0]]
+                return f"{field} ~* {values_as_pg_sql[0]}"
             case PgFilterOp.NOT_REGEXP_CASE_INSENSITIVE:
-                return f"{where.field} !~* %s", [where.values[0]]
+                return f"{field} !~* {values_as_pg_sql[0]}"
 
-            # Array operators
+            # Single value operators - arrays
             case PgFilterOp.CONTAINS:
-                return f"{where.field} @> %s", [where.values[0]]
+                return f"{field} @> {values_as_pg_sql[0]}"
             case PgFilterOp.IS_CONTAINED_BY:
-                return f"{where.field} <@ %s", [where.values[0]]
+                return f"{field} <@ {values_as_pg_sql[0]}"
             case PgFilterOp.OVERLAPS:
-                return f"{where.field} && %s", [where.values[0]]
+                return f"{field} && {values_as_pg_sql[0]}"
 
-            # JSON operators
+            # Single value operators - JSON
             case PgFilterOp.JSON_CONTAINS:
-                return f"{where.field} @> %s", [where.values[0]]
+                return f"{field} @> {values_as_pg_sql[0]}"
             case PgFilterOp.JSON_IS_CONTAINED_BY:
-                return f"{where.field} <@ %s", [where.values[0]]
+                return f"{field} <@ {values_as_pg_sql[0]}"
             case PgFilterOp.JSON_HAS_KEY:
-                return f"{where.field} ? %s", [where.values[0]]
+                return f"{field} ? {values_as_pg_sql[0]}"
             case PgFilterOp.JSON_HAS_ANY_KEY:
-                return f"{where.field} ?| %s", [where.values[0]]
+                return f"{field} ?| {values_as_pg_sql[0]}"
             case PgFilterOp.JSON_HAS_ALL_KEYS:
-                return f"{where.field} ?& %s", [where.values[0]]
+                return f"{field} ?& {values_as_pg_sql[0]}"
 
-            # String operators
+            # Single value operators - strings
             case PgFilterOp.CONTAINS_STRING:
-                return f"{where.field} ~~ %s", [where.values[0]]
+                return f"{field} ~~ {values_as_pg_sql[0]}"
             case PgFilterOp.NOT_CONTAINS_STRING:
-                return f"{where.field} !~~ %s", [where.values[0]]
+                return f"{field} !~~ {values_as_pg_sql[0]}"
             case PgFilterOp.CONTAINS_STRING_CASE_INSENSITIVE:
-                return f"{where.field} ~~* %s", [where.values[0]]
+                return f"{field} ~~* {values_as_pg_sql[0]}"
             case PgFilterOp.NOT_CONTAINS_STRING_CASE_INSENSITIVE:
-                return f"{where.field} !~~* %s", [where.values[0]]
+                return f"{field} !~~* {values_as_pg_sql[0]}"
 
-            # Similar to
+            # Single value operators - similar to
             case PgFilterOp.SIMILAR_TO:
-                return f"{where.field} SIMILAR TO %s", [where.values[0]]
+                return f"{field} SIMILAR TO {values_as_pg_sql[0]}"
             case PgFilterOp.NOT_SIMILAR_TO:
-                return f"{where.field} NOT SIMILAR TO %s", [where.values[0]]
+                return f"{field} NOT SIMILAR TO {values_as_pg_sql[0]}"
 
-            # Geometric operators
+            # Single value operators - geometric
             case PgFilterOp.OVERLAPS_GEOMETRY:
-                return f"{where.field} && %s", [where.values[0]]
+                return f"{field} && {values_as_pg_sql[0]}"
             case PgFilterOp.CONTAINS_GEOMETRY:
-                return f"{where.field} @> %s", [where.values[0]]
+                return f"{field} @> {values_as_pg_sql[0]}"
             case PgFilterOp.IS_CONTAINED_BY_GEOMETRY:
-                return f"{where.field} <@ %s", [where.values[0]]
+                return f"{field} <@ {values_as_pg_sql[0]}"
             case PgFilterOp.INTERSECTS:
-                return f"{where.field} && %s", [where.values[0]]
+                return f"{field} && {values_as_pg_sql[0]}"
 
-            # Network operators
+            # Single value operators - network
             case PgFilterOp.CONTAINS_INET:
-                return f"{where.field} >> %s", [where.values[0]]
+                return f"{field} >> {values_as_pg_sql[0]}"
             case PgFilterOp.IS_CONTAINED_BY_INET:
-                return f"{where.field} << %s", [where.values[0]]
+                return f"{field} << {values_as_pg_sql[0]}"
             case PgFilterOp.IS_SUBNET:
-                return f"{where.field} >>= %s", [where.values[0]]
+                return f"{field} >>= {values_as_pg_sql[0]}"
             case PgFilterOp.IS_SUPERNET:
-                return f"{where.field} <<= %s", [where.values[0]]
+                return f"{field} <<= {values_as_pg_sql[0]}"
 
-            # Full text search
+            # Single value operators - full text search
             case PgFilterOp.FULLTEXT_MATCH:
-                return f"{where.field} @@ %s", [where.values[0]]
+                return f"{field} @@ {values_as_pg_sql[0]}"
             case PgFilterOp.FULLTEXT_QUERY:
-                return f"{where.field} @@@ %s", [where.values[0]]
+                return f"{field} @@@ {values_as_pg_sql[0]}"
 
-            # Special comparison
+            # Single value operators - special comparison
             case PgFilterOp.IS_DISTINCT_FROM:
-                return f"{where.field} IS DISTINCT FROM %s", [where.values[0]]
+                return f"{field} IS DISTINCT FROM {values_as_pg_sql[0]}"
             case PgFilterOp.IS_NOT_DISTINCT_FROM:
-                return f"{where.field} IS NOT DISTINCT FROM %s", [where.values[0]]
+                return f"{field} IS NOT DISTINCT FROM {values_as_pg_sql[0]}"
 
-            # Subquery operators
+            # Single value operators - subquery
             case PgFilterOp.ANY:
-                return f"{where.field} = ANY(%s)", [where.values[0]]
+                return f"{field} = ANY({values_as_pg_sql[0]})"
             case PgFilterOp.ALL:
-                return f"{where.field} = ALL(%s)", [where.values[0]]
+                return f"{field} = ALL({values_as_pg_sql[0]})"
             case PgFilterOp.SOME:
-                return f"{where.field} = SOME(%s)", [where.values[0]]
+                return f"{field} = SOME({values_as_pg_sql[0]})"
 
-            # Exists operators
+            # Single value operators - exists
             case PgFilterOp.EXISTS:
-                return "EXISTS(%s)", [where.values[0]]
+                return f"EXISTS({values_as_pg_sql[0]})"
             case PgFilterOp.NOT_EXISTS:
-                return "NOT EXISTS(%s)", [where.values[0]]
+                return f"NOT EXISTS({values_as_pg_sql[0]})"
 
             # Default case for any unhandled operators
             case _:
-                raise ValueError(f"Unsupported operator: {where.op} for field {where.field}")
+                raise ValueError(f"Unsupported operator: {op} for field {field}")
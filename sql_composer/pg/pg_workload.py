@@ -0,0 +1,324 @@
+import hashlib
+import random
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from sql_composer.db_models import Table
+from sql_composer.db_conditions import AndGroup, Condition, FilterOp, RowIn, SortType, SqlQueryCriteria, Where
+from sql_composer.db_metadata import PostgresIndexMetadata
+from sql_composer.pg.pg_data_types import TEXT_TYPES
+from sql_composer.pg.pg_filter_op import PATTERN_OPS, PgFilterOp, index_methods
+from sql_composer.sql_observer import ComposeEvent, SqlObserver
+
+"""
+Workload recorder - proposes indexes from the queries a service actually composes.
+
+Sampled criteria are reduced to their shape per table: the AND-ed filter fields
+with their operators, and the sort order. Values are kept only to spot
+constant predicates (e.g. `status = 'active'` in every sample), which become
+partial indexes. Each shape yields candidate DDL:
+
+- btree on equality fields, then sort columns, then one range field; an
+  anchored pattern (`LIKE 'abc%'`) is the range field with text_pattern_ops,
+  as the default operator class only serves it under the C collation
+- GIN for JSON and array operators, GIN with gin_trgm_ops for unanchored patterns
+- GIN on `to_tsvector(config, field)` for full text search on text columns,
+  given the text_search_config of the translator, which filters on that expression
+- GiST for geometric and network operators
+
+Candidates are ranked by how often the shapes asking for them were seen.
+"""
+
+# Operators comparing with a single value that can be a partial index constant
+_CONSTANT_OPS = (PgFilterOp.EQUAL, PgFilterOp.IS_NULL, PgFilterOp.IS_NOT_NULL)
+_EQUALITY_OPS = (PgFilterOp.EQUAL, PgFilterOp.IN, PgFilterOp.IS_NOT_DISTINCT_FROM, PgFilterOp.ANY)
+_FULLTEXT_OPS = (PgFilterOp.FULLTEXT_MATCH, PgFilterOp.FULLTEXT_QUERY)
+# Shapes keep operator names, custom FilterOps missing here are ignored
+_OPS_BY_NAME = {op.name: op for op in vars(PgFilterOp).values() if isinstance(op, FilterOp)}
+# An index column: a field with an optional operator class or DESC, or a to_tsvector() expression over a field
+_INDEX_COLUMN_RE = re.compile(
+    r"(?:to_tsvector\('[^']*', (?P<expression_field>\w+)\)|(?P<field>\S+)(?: (?P<suffix>\S+))?)"
+)
+# PostgreSQL truncates identifiers to 63 bytes
+_MAX_IDENTIFIER_LENGTH = 63
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    table: str
+    # (field, operator name, unanchored pattern) of each AND-ed condition, sorted
+    filters: Tuple[Tuple[str, str, bool], ...]
+    # (field, ASC/DESC) in ORDER BY order
+    sort: Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class ShapeStats:
+    count: int = 0
+    # Distinct values seen per constant-candidate field, None once more than one was seen
+    constants: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class IndexCandidate:
+    table: str
+    method: str
+    columns: List[str]
+    ddl: str
+    frequency: int
+    predicate: str | None = None
+
+
+_UNSET = object()
+
+
+class PgWorkloadRecorder(SqlObserver):
+    """
+    Opt-in observer sampling composed queries. Attach it (or a CompositeObserver including it)
+    to the composers of a service and call `propose_indexes()` to get CREATE INDEX candidates.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.01,
+        partial_min_samples: int = 20,
+        rand: Callable[[], float] = random.random,
+        tables: Iterable[Table] = (),
+        text_search_config: str | None = None,
+    ):
+        self.sample_rate = sample_rate
+        # A field needs this many samples with one value before it is treated as a constant
+        self.partial_min_samples = partial_min_samples
+        self._rand = rand
+        # Shapes only name their table, these resolve the names to the column types
+        self._tables: Dict[str, Table] = {table.name: table for table in tables}
+        # Set like PgSqlTranslator(text_search_config=...), which renders full text filters on text
+        # columns as `to_tsvector(config, field) @@ ...`; without it there's no index for them to propose
+        self.text_search_config = text_search_config
+        self._shapes: Dict[QueryShape, ShapeStats] = {}
+        self._lock = threading.Lock()
+
+    def on_compose(self, event: ComposeEvent) -> None:
+        if event.kind != "criteria" and event.query_criteria is not None and self._rand() < self.sample_rate:
+            self.record(event.table, event.query_criteria)
+
+    def record(self, table: str, query_criteria: SqlQueryCriteria) -> None:
+        where_conditions = query_criteria.where.conditions if query_criteria.where else []
+        conditions = sorted(_and_conditions(where_conditions), key=lambda w: (w.field, w.op.name))
+        shape = QueryShape(
+            table=table,
+            filters=tuple((w.field, w.op.name, _unanchored(w)) for w in conditions),
+            sort=tuple((s.field, s.sort_type.value) for s in query_criteria.sort or []),
+        )
+        if not shape.filters and not shape.sort:
+            return
+
+        with self._lock:
+            stats = self._shapes.setdefault(shape, ShapeStats())
+            stats.count += 1
+            for where in conditions:
+                if where.op in _CONSTANT_OPS:
+                    self._track_constant(stats, where)
+
+    @staticmethod
+    def _track_constant(stats: ShapeStats, where: Where):
+        key = f"{where.field}:{where.op.name}"
+        value = tuple(where.values)
+        seen = stats.constants.get(key, _UNSET)
+        if seen is _UNSET:
+            stats.constants[key] = value
+        elif seen is not None and seen != value:
+            stats.constants[key] = None
+
+    def shapes(self) -> Dict[QueryShape, int]:
+        with self._lock:
+            return {shape: stats.count for shape, stats in self._shapes.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+
+    def propose_indexes(
+        self, min_frequency: int = 1, existing: Iterable[PostgresIndexMetadata] = ()
+    ) -> List[IndexCandidate]:
+        """Candidate indexes ranked by frequency, leaving out those an existing index already covers"""
+        with self._lock:
+            shapes = [(shape, ShapeStats(stats.count, dict(stats.constants))) for shape, stats in self._shapes.items()]
+
+        existing = list(existing)
+        candidates: Dict[str, IndexCandidate] = {}
+        for shape, stats in shapes:
+            for method, columns, predicate in self._candidates(shape, stats):
+                if _covered(existing, shape.table, method, columns, predicate):
+                    continue
+                ddl = _create_index_ddl(shape.table, method, columns, predicate)
+                candidate = candidates.get(ddl)
+                if candidate is None:
+                    plain_columns = [_column_field(column) for column in columns]
+                    candidate = IndexCandidate(shape.table, method, plain_columns, ddl, 0, predicate)
+                    candidates[ddl] = candidate
+                candidate.frequency += stats.count
+
+        ranked = [c for c in candidates.values() if c.frequency >= min_frequency]
+        ranked.sort(key=lambda c: (-c.frequency, c.ddl))
+        return ranked
+
+    def _candidates(self, shape: QueryShape, stats: ShapeStats) -> List[Tuple[str, List[str], str | None]]:
+        predicates: List[str] = []
+        equality: List[str] = []
+        ranges: List[str] = []
+        others: List[Tuple[str, List[str]]] = []
+
+        for field_name, op_name, unanchored in shape.filters:
+            op = _OPS_BY_NAME.get(op_name)
+            if op is None:
+                continue
+            constant = stats.constants.get(f"{field_name}:{op_name}")
+            if op in (PgFilterOp.IS_NULL, PgFilterOp.IS_NOT_NULL) or (
+                constant is not None and stats.count >= self.partial_min_samples
+            ):
+                predicates.append(_predicate_sql(field_name, op, constant))
+                continue
+
+            methods = index_methods(op)
+            if not methods:
+                continue
+            if op in PATTERN_OPS and (unanchored or "btree" not in methods):
+                others.append(("gin", [f"{field_name} gin_trgm_ops"]))
+            elif op in PATTERN_OPS:
+                ranges.append(f"{field_name} text_pattern_ops")
+            elif op in _FULLTEXT_OPS and self._is_text(shape.table, field_name):
+                # Only a translator with the same config filters on the to_tsvector() expression
+                if self.text_search_config is not None:
+                    others.append(("gin", [f"to_tsvector('{self.text_search_config}', {field_name})"]))
+            elif methods[0] in ("gin", "gist"):
+                others.append((methods[0], [field_name]))
+            elif op in _EQUALITY_OPS:
+                equality.append(field_name)
+            else:
+                ranges.append(field_name)
+
+        # Equality, then sort, then range columns
+        btree_columns = list(dict.fromkeys(equality))
+        for sort_field, sort_type in shape.sort:
+            if sort_field not in btree_columns:
+                btree_columns.append(sort_field if sort_type == SortType.ASC.value else f"{sort_field} DESC")
+        sorted_fields = {_column_field(c) for c in btree_columns}
+        btree_columns.extend(r for r in ranges[:1] if _column_field(r) not in sorted_fields)
+
+        predicate = " AND ".join(sorted(predicates)) or None
+        candidates: List[Tuple[str, List[str], str | None]] = []
+        if btree_columns:
+            candidates.append(("btree", btree_columns, predicate))
+        candidates.extend((method, columns, predicate) for method, columns in others)
+        return candidates
+
+    def _is_text(self, table_name: str, field_name: str) -> bool:
+        """Whether the field is a text column - assumed for unknown tables, as PgDataTypes has no tsvector"""
+        table = self._tables.get(table_name)
+        if table is None:
+            return True
+        return any(column.name == field_name and column.type_ in TEXT_TYPES for column in table.columns)
+
+
+def _and_conditions(conditions: List[Condition]) -> Iterable[Where]:
+    """Conditions that must all hold - OR and NOT groups can't be served by one composite index"""
+    for condition in conditions:
+        match condition:
+            case Where():
+                yield condition
+            case RowIn():
+                # Equality on every field, served by a composite index over them
+                for i, field_name in enumerate(condition.fields):
+                    yield Where(field_name, PgFilterOp.IN, [row[i] for row in condition.rows])
+            case AndGroup():
+                yield from _and_conditions(condition.conditions)
+
+
+def _unanchored(where: Where) -> bool:
+    if where.op not in PATTERN_OPS or not where.values or not isinstance(where.values[0], str):
+        return False
+    pattern = where.values[0]
+    if where.op in (PgFilterOp.REGEXP, PgFilterOp.REGEXP_CASE_INSENSITIVE):
+        return not pattern.startswith("^")
+    return pattern[:1] in ("%", "_")
+
+
+def _literal(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _predicate_sql(field_name: str, op: Any, values: Tuple | None) -> str:
+    if op == PgFilterOp.IS_NULL:
+        return f"{field_name} IS NULL"
+    if op == PgFilterOp.IS_NOT_NULL:
+        return f"{field_name} IS NOT NULL"
+    return f"{field_name} = {_literal(values[0])}" if values else f"{field_name} IS NULL"
+
+
+def _column_field(column: str) -> str:
+    match = _INDEX_COLUMN_RE.fullmatch(column)
+    if match is None:
+        raise ValueError(f"Invalid index column: {column}")
+    return match.group("expression_field") or match.group("field")
+
+
+def _column_opclass(column: str) -> str | None:
+    match = _INDEX_COLUMN_RE.fullmatch(column)
+    suffix = match.group("suffix") if match else None
+    return suffix if suffix and suffix.endswith("_ops") else None
+
+
+def _index_name(table: str, method: str, columns: List[str], predicate: str | None) -> str:
+    parts = [table, *(_column_field(c) for c in columns)]
+    if any(c.endswith("gin_trgm_ops") for c in columns):
+        parts.append("trgm")
+    elif any(c.startswith("to_tsvector(") for c in columns):
+        parts.append("fts")
+    elif any(c.endswith("_pattern_ops") for c in columns):
+        parts.append("pattern")
+    elif method != "btree":
+        parts.append(method)
+    # Partial indexes on the same columns differ by their predicate, the hash keeps their names apart
+    suffix = "_idx"
+    if predicate:
+        suffix = f"_partial_{hashlib.blake2b(predicate.encode('utf-8'), digest_size=4).hexdigest()}_idx"
+    return "_".join(parts)[: _MAX_IDENTIFIER_LENGTH - len(suffix)] + suffix
+
+
+def _create_index_ddl(table: str, method: str, columns: List[str], predicate: str | None) -> str:
+    using = "" if method == "btree" else f" USING {method}"
+    ddl = (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {_index_name(table, method, columns, predicate)} "
+        f"ON {table}{using} ({', '.join(columns)})"
+    )
+    return f"{ddl} WHERE {predicate}" if predicate else ddl
+
+
+def _covered(
+    existing: List[PostgresIndexMetadata], table: str, method: str, columns: List[str], predicate: str | None
+) -> bool:
+    # Expression keys are not in the catalog columns, an index on to_tsvector() is never matched here
+    if any(column.startswith("to_tsvector(") for column in columns):
+        return False
+    wanted = [_column_field(column) for column in columns]
+    opclasses = [_column_opclass(column) for column in columns]
+    for index in existing:
+        if not index.is_valid or index.tablename != table or index.access_method != method:
+            continue
+        if index.columns[: len(wanted)] != wanted:
+            continue
+        # Without opclasses in the metadata the index is assumed to have the requested ones
+        leading_opclasses = index.opclasses[: len(opclasses)]
+        if len(leading_opclasses) == len(opclasses) and any(
+            o is not None and o != i for o, i in zip(opclasses, leading_opclasses, strict=True)
+        ):
+            continue
+        if index.predicate is None or index.predicate == predicate:
+            return True
+    return False
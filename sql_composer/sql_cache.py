@@ -0,0 +1,161 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Set, Tuple
+from sql_composer.sql_placeholders import Params
+
+"""
+Result cache for read queries.
+
+Entries are keyed by the (SQL, parameters) of a composed SELECT and tagged with
+the tables the query reads. They expire after a TTL and the least recently used
+entries are evicted beyond a number of entries or an estimated memory size.
+SqlComposer.execute() invalidates a table's entries once a write to the table
+has run, so a process never reads its own stale writes from the cache; writes
+made elsewhere are only seen once the TTL expires.
+"""
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class _CacheEntry:
+    rows: List[tuple]
+    tables: Tuple[str, ...]
+    expires_at: float | None
+    size: int
+
+
+CacheKey = Tuple[str, Hashable]
+
+
+class QueryCache:
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: float | None = 60.0,
+        max_bytes: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        # Seconds an entry stays valid, None to rely on invalidation only
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._keys_by_table: Dict[str, Set[CacheKey]] = {}
+        self._bytes = 0
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, sql: str, params: Params | None = None) -> List[tuple] | None:
+        """A copy of the cached rows, or None when the query is not cached or has expired"""
+        key = _cache_key(sql, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= self._clock():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            # Callers may modify the list they get without affecting later hits
+            return list(entry.rows)
+
+    def put(self, sql: str, params: Params | None, rows: List[tuple], tables: Iterable[str]) -> None:
+        key = _cache_key(sql, params)
+        size = _estimate_size(rows)
+        if size > self.max_bytes:
+            return
+
+        expires_at = self._clock() + self.ttl if self.ttl is not None else None
+        entry = _CacheEntry(rows=list(rows), tables=tuple(tables), expires_at=expires_at, size=size)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            for table in entry.tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def invalidate_table(self, table: str) -> int:
+        """Drop every entry reading the table, returns the number of entries dropped"""
+        with self._lock:
+            keys = list(self._keys_by_table.get(table, ()))
+            for key in keys:
+                self._remove(key)
+            self._stats.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                invalidations=self._stats.invalidations,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    def _remove(self, key: CacheKey):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for table in entry.tables:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
+
+
+def _freeze(value: Any) -> Hashable:
+    """A hashable stand-in for a parameter value, e.g. a list or a JSON document"""
+    match value:
+        case list() | tuple():
+            return tuple(_freeze(v) for v in value)
+        case dict():
+            return tuple(sorted(((str(k), _freeze(v)) for k, v in value.items())))
+        case set() | frozenset():
+            return frozenset(_freeze(v) for v in value)
+        case _:
+            try:
+                hash(value)
+            except TypeError:
+                return repr(value)
+            # The type name keeps e.g. 1, 1.0 and True apart, which compare equal but render differently
+            return type(value).__name__, value
+
+
+def _cache_key(sql: str, params: Params | None) -> CacheKey:
+    return sql, _freeze(params or ())
+
+
+def _estimate_size(rows: List[tuple]) -> int:
+    """Approximate memory held by the rows - shallow sizes of the list, the rows and their values"""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    return size
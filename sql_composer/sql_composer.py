@@ -1,13 +1,50 @@
-from typing import List, Any, Tuple
-from sql_composer.db_models import Table, Column
-import textwrap
+import itertools
+import time
+from typing import Dict, Iterable, Iterator, List, Any, Sequence, Tuple
+from sql_composer.db_models import Table, Column, ColumnRef
 from sql_composer.sql_translator import SqlTranslator
-from sql_composer.db_conditions import SqlQueryCriteria
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_cache import QueryCache
+from sql_composer.db_conditions import (
+    Aggregate,
+    AggregateFunc,
+    AndGroup,
+    Condition,
+    Join,
+    Not,
+    OrGroup,
+    SqlQueryCriteria,
+    Where,
+    WhereClause,
+)
+from sql_composer.sql_ir import (
+    AggregateNode,
+    AndNode,
+    Assignment,
+    ColumnEqualsNode,
+    DeleteNode,
+    ExplainNode,
+    InsertManyNode,
+    InsertNode,
+    JoinNode,
+    Param,
+    PredicateNode,
+    Scope,
+    SelectNode,
+    UpdateNode,
+    is_always_false,
+    predicate_from_where_clause,
+    sort_from_query_criteria,
+    table_scope,
+)
+from sql_composer.sql_observer import SqlObserver, compose_event, observed
+from sql_composer.sql_placeholders import Params
 
 """
 SqlComposer is a class that composes SQL statements.
 It is used to compose SQL statements for a given table and a given translator.
-The translator is responsible for translating the SQL statements to the appropriate SQL dialect.
+The composer builds an intermediate representation of each statement (see sql_ir),
+and the translator renders it to the appropriate SQL dialect.
 
 Future Extension:
 For cases where the SqlComposer core logic is not re-useable, 
@@ -16,165 +53,587 @@ please extend the SqlComposer class and override the methods you need.
 
 
 class SqlComposer:
-    def __init__(self, translator: SqlTranslator, table: Table):
+    def __init__(
+        self,
+        translator: SqlTranslator,
+        table: Table,
+        observer: SqlObserver | None = None,
+        executor: SqlExecutor | None = None,
+        cache: QueryCache | None = None,
+    ):
         self.translator = translator
         self.table = table
-
-    def select(
+        self.observer = observer
+        # Only needed by methods that go to the database, e.g. explain() and fetch()
+        self.executor = executor
+        # Results of fetch(), invalidated for the table by every write composed here
+        self.cache = cache
+
+    # Statement builders - return the IR of a statement without rendering it
+    def build_select(
         self,
-        columns: List[Column],
+        columns: Sequence[Column | ColumnRef],
         alias: str | None = None,
         query_criteria: SqlQueryCriteria | None = None,
-    ) -> str:
+        joins: List[Join] | None = None,
+    ) -> SelectNode:
         if not columns:
             raise ValueError("No columns provided")
+        if joins:
+            return self._build_join_select(columns, alias, query_criteria, joins)
+
+        return SelectNode(
+            table=self.table,
+            columns=list(columns),
+            alias=alias,
+            where=self._build_where(query_criteria),
+            sort=sort_from_query_criteria(query_criteria, self.table),
+            page=query_criteria.page if query_criteria else None,
+        )
+
+    def _build_join_select(
+        self,
+        columns: Sequence[Column | ColumnRef],
+        alias: str | None,
+        query_criteria: SqlQueryCriteria | None,
+        joins: List[Join],
+    ) -> SelectNode:
+        """
+        Fields in the WHERE clause and sort may name base table columns as-is, or any joined
+        column as `alias.column`. Every reference is rendered qualified.
+        """
+        base_alias = alias or self.table.name
+        tables_by_alias: Dict[str, Table] = {base_alias: self.table}
+        scope = table_scope(self.table, base_alias)
+
+        join_nodes = []
+        for join in joins:
+            if join.alias in tables_by_alias:
+                raise ValueError(f"Duplicate table alias: {join.alias}")
+            tables_by_alias[join.alias] = join.table
+            join_nodes.append(self._build_join(join, tables_by_alias))
+            scope.update({f"{join.alias}.{c.name}": ColumnRef(join.alias, c) for c in join.table.columns})
+
+        column_refs = []
+        for column in columns:
+            if isinstance(column, Column):
+                column = ColumnRef(base_alias, column)
+            self._validate_column_ref(column, tables_by_alias)
+            column_refs.append(column)
+
+        where = predicate_from_where_clause(query_criteria.where if query_criteria else None, self.table, scope)
+        return SelectNode(
+            table=self.table,
+            columns=column_refs,
+            alias=alias,
+            where=self.translator.simplify_predicate(where),
+            sort=sort_from_query_criteria(query_criteria, self.table, scope),
+            page=query_criteria.page if query_criteria else None,
+            joins=join_nodes,
+        )
+
+    def _build_join(self, join: Join, tables_by_alias: Dict[str, Table]) -> JoinNode:
+        for left, right in join.on:
+            self._validate_column_ref(left, tables_by_alias)
+            self._validate_column_ref(right, tables_by_alias)
+
+        join_scope = table_scope(join.table, join.alias)
+        query_criteria = join.query_criteria
+        where = predicate_from_where_clause(query_criteria.where if query_criteria else None, join.table, join_scope)
+        predicates: List[PredicateNode] = [ColumnEqualsNode(left, right) for left, right in join.on]
+        if where is not None:
+            predicates.extend(where.children if isinstance(where, AndNode) else [where])
+
+        if join.lateral:
+            # The ON pairs correlate the subquery with the tables joined before it
+            subquery = SelectNode(
+                table=join.table,
+                columns=[ColumnRef(join.alias, c) for c in join.table.columns],
+                alias=join.alias,
+                where=self.translator.simplify_predicate(AndNode(predicates)) if predicates else None,
+                sort=sort_from_query_criteria(query_criteria, join.table, join_scope),
+                page=query_criteria.page if query_criteria else None,
+            )
+            return JoinNode(table=join.table, alias=join.alias, join_type=join.join_type, lateral=subquery)
+
+        if query_criteria is not None and (query_criteria.sort or query_criteria.page):
+            raise ValueError(f"Join {join.alias} can only sort or page the joined table when lateral")
+        if not predicates:
+            raise ValueError(f"Join {join.alias} requires an ON condition")
+        return JoinNode(
+            table=join.table,
+            alias=join.alias,
+            join_type=join.join_type,
+            on=self.translator.simplify_predicate(AndNode(predicates)),
+        )
+
+    @staticmethod
+    def _validate_column_ref(column_ref: ColumnRef, tables_by_alias: Dict[str, Table]):
+        table = tables_by_alias.get(column_ref.table_alias)
+        if table is None or column_ref.column not in table.columns:
+            raise ValueError(f"Unknown column reference: {column_ref.sql_name}")
+
+    def build_aggregate(
+        self,
+        aggregates: List[Aggregate],
+        group_by: List[Column] | None = None,
+        having: WhereClause | None = None,
+        query_criteria: SqlQueryCriteria | None = None,
+    ) -> SelectNode:
+        """
+        Aggregate rows of the table in the database. The select list is the group_by columns
+        followed by the aggregates. `having` and `query_criteria.sort` may refer to group_by
+        columns and to aggregates by alias; `query_criteria.where` filters rows before grouping.
+        """
+        if not aggregates:
+            raise ValueError("No aggregates provided")
+        group_by = group_by or []
+        for column in group_by:
+            if column not in self.table.columns:
+                raise ValueError(f"Unknown group by column: {column.name}")
+
+        aggregate_nodes = [self._build_aggregate(aggregate) for aggregate in aggregates]
+        output_scope: Scope = {c.name: ColumnRef("", c) for c in group_by}
+        for node in aggregate_nodes:
+            if node.alias in output_scope:
+                raise ValueError(f"Duplicate output column: {node.alias}")
+            output_scope[node.alias] = node
+
+        having_predicate = predicate_from_where_clause(having, self.table, output_scope)
+        return SelectNode(
+            table=self.table,
+            columns=[*group_by, *aggregate_nodes],
+            where=self._build_where(query_criteria),
+            sort=sort_from_query_criteria(query_criteria, self.table, output_scope),
+            page=query_criteria.page if query_criteria else None,
+            group_by=group_by,
+            having=self.translator.simplify_predicate(having_predicate),
+        )
+
+    def build_explain(
+        self,
+        columns: Sequence[Column | ColumnRef],
+        query_criteria: SqlQueryCriteria | None = None,
+        analyze: bool = False,
+        buffers: bool = True,
+        alias: str | None = None,
+        joins: List[Join] | None = None,
+    ) -> ExplainNode:
+        return ExplainNode(self.build_select(columns, alias, query_criteria, joins), analyze=analyze, buffers=buffers)
+
+    def build_count(
+        self, query_criteria: SqlQueryCriteria | None = None, alias: str | None = None, joins: List[Join] | None = None
+    ) -> SelectNode:
+        """Count the rows matching the criteria, over the same joins as the SELECT. Sort and page are ignored."""
+        where = query_criteria.where if query_criteria else None
+        if not joins:
+            return self.build_aggregate([Aggregate(AggregateFunc.COUNT)], query_criteria=SqlQueryCriteria(where=where))
+
+        # Joins can drop or repeat rows of the table, so the joined rows are counted
+        node = self.build_select(self.table.columns[:1], alias, SqlQueryCriteria(where=where), joins)
+        node.columns = [self._build_aggregate(Aggregate(AggregateFunc.COUNT))]
+        return node
+
+    def build_select_with_total(
+        self,
+        columns: Sequence[Column | ColumnRef],
+        alias: str | None = None,
+        query_criteria: SqlQueryCriteria | None = None,
+        joins: List[Join] | None = None,
+        total_alias: str = "total_count",
+    ) -> SelectNode:
+        """
+        A page of rows with `COUNT(*) OVER ()` as the last column, the number of rows matching
+        the criteria before LIMIT/OFFSET. Pages past the end return no rows and so no total.
+        """
+        node = self.build_select(columns, alias, query_criteria, joins)
+        # build_select copies the columns, the caller's list (e.g. table.columns) is left as is
+        node.columns.append(AggregateNode(func=AggregateFunc.COUNT, column=None, alias=total_alias, window=True))
+        return node
+
+    def _build_aggregate(self, aggregate: Aggregate) -> AggregateNode:
+        if aggregate.column is None and aggregate.func != AggregateFunc.COUNT:
+            raise ValueError(f"{aggregate.func.value} requires a column")
+        if aggregate.column is not None and aggregate.column not in self.table.columns:
+            raise ValueError(f"Unknown aggregate column: {aggregate.column.name}")
+
+        return AggregateNode(
+            func=aggregate.func,
+            column=aggregate.column,
+            alias=aggregate.name,
+            distinct=aggregate.distinct,
+            filter=self.translator.simplify_predicate(predicate_from_where_clause(aggregate.filter, self.table)),
+        )
+
+    def build_insert(self, key_values: dict[str, Any], returning: List[Column] | None = None) -> InsertNode:
+        column_map = {c.name: c for c in self.table.columns}
+
+        valid_columns = [column_map[k] for k in key_values.keys() if column_map.get(k, None) is not None]
+        if not valid_columns:
+            raise ValueError("No valid columns to insert")
+
+        return InsertNode(
+            table=self.table,
+            columns=valid_columns,
+            values=[Param(key_values[c.name], c) for c in valid_columns],
+            returning=self._returning(returning),
+        )
+
+    def build_insert_many(
+        self, rows: Iterable[dict[str, Any]], returning: List[Column] | None = None
+    ) -> InsertManyNode:
+        """
+        A multi-row INSERT of the columns of the first row. The rows are read lazily while rendering,
+        so a generator is never materialized; every row must set the same columns.
+        """
+        column_map = {c.name: c for c in self.table.columns}
+        row_iterator = iter(rows)
+        first = next(row_iterator, None)
+        if first is None:
+            raise ValueError("No rows to insert")
 
-        col_names = [c.name for c in columns]
-        if alias is None:
-            table_name = self.table.name
-            col_names_fmted = ", ".join(col_names)
-        else:
-            table_name = f"{self.table.name} AS {alias}"
-            col_names_fmted = ", ".join([f"{alias}.{c_name}" for c_name in col_names])
+        valid_columns = [column_map[k] for k in first.keys() if column_map.get(k, None) is not None]
+        if not valid_columns:
+            raise ValueError("No valid columns to insert")
+        column_names = {c.name for c in valid_columns}
+
+        def row_params() -> Iterator[List[Param]]:
+            for row in itertools.chain([first], row_iterator):
+                if {k for k in row.keys() if k in column_map} != column_names:
+                    raise ValueError(f"Row does not set the columns of the first row: {sorted(row.keys())}")
+                yield [Param(row[c.name], c) for c in valid_columns]
+
+        return InsertManyNode(
+            table=self.table,
+            columns=valid_columns,
+            rows=row_params(),
+            returning=self._returning(returning),
+        )
+
+    def build_update(
+        self, key_values: dict[str, Any], where: WhereClause | None = None, returning: List[Column] | None = None
+    ) -> UpdateNode:
+        column_map = {c.name: c for c in self.table.columns}
+
+        assignments = [
+            Assignment(column_map[k], Param(value, column_map[k]))
+            for k, value in key_values.items()
+            if column_map.get(k, None) is not None
+        ]
+        if not assignments:
+            raise ValueError("No valid columns to update")
 
-        stmt = f"""
-        SELECT
-            {col_names_fmted}
-        FROM {table_name}
-        {self.translator.query_criteria_to_sql(query_criteria, self.table)}
+        return UpdateNode(
+            table=self.table,
+            assignments=assignments,
+            where=self.build_write_where(where),
+            returning=self._returning(returning),
+        )
+
+    def build_delete(self, where: WhereClause | None = None, returning: List[Column] | None = None) -> DeleteNode:
+        return DeleteNode(table=self.table, where=self.build_write_where(where), returning=self._returning(returning))
+
+    def build_write_where(self, where: WhereClause | None) -> PredicateNode | None:
+        """
+        The predicate of an UPDATE or DELETE. Unlike SELECT, a write must not silently drop a condition
+        on an unknown field - it would widen the statement to rows the caller never meant to touch.
+        Unknown fields raise ValueError wherever they are nested, and an empty OrGroup renders WHERE FALSE.
+        """
+        column_names = {c.name for c in self.table.columns}
+        pending: List[Condition] = list(where.conditions) if where else []
+        while pending:
+            condition = pending.pop()
+            match condition:
+                case Where():
+                    if condition.field not in column_names:
+                        raise ValueError(f"Unknown column in WHERE clause: {condition.field}")
+                case AndGroup() | OrGroup():
+                    pending.extend(condition.conditions)
+                case Not():
+                    pending.append(condition.condition)
+        return self._build_where(SqlQueryCriteria(where=where))
+
+    def _returning(self, returning: List[Column] | None) -> List[Column]:
+        for column in returning or []:
+            if column not in self.table.columns:
+                raise ValueError(f"Unknown returning column: {column.name}")
+        return list(returning or [])
+
+    def decode_rows(self, rows: List[Sequence[Any]], columns: List[Column]) -> List[Dict[str, Any]]:
         """
+        Decode rows returned by a statement (e.g. RETURNING columns) into dictionaries by column
+        name, converting each value with the translator according to the column's type.
+        """
+        return [
+            {column.name: self.translator.sql_to_val(column, value) for column, value in zip(columns, row, strict=True)}
+            for row in rows
+        ]
 
-        return textwrap.dedent(stmt)
+    def _build_where(self, query_criteria: SqlQueryCriteria | None) -> PredicateNode | None:
+        where = predicate_from_where_clause(query_criteria.where if query_criteria else None, self.table)
+        return self.translator.simplify_predicate(where)
 
+    def never_matches(self, query_criteria: SqlQueryCriteria | None) -> bool:
+        """
+        True when the criteria can never match a row (e.g. an empty IN or conflicting equalities),
+        so the query can be answered with no rows without going to the database.
+        Requires a translator that simplifies predicates.
+        """
+        return is_always_false(self._build_where(query_criteria))
+
+    # Statements
+    @observed("select")
+    def select(
+        self,
+        columns: Sequence[Column | ColumnRef],
+        alias: str | None = None,
+        query_criteria: SqlQueryCriteria | None = None,
+        joins: List[Join] | None = None,
+    ) -> str:
+        stmt, _ = self.translator.render(self.build_select(columns, alias, query_criteria, joins))
+        return stmt
+
+    @observed("select")
     def select_with_params(
         self,
-        columns: List[Column],
+        columns: Sequence[Column | ColumnRef],
         alias: str | None = None,
         query_criteria: SqlQueryCriteria | None = None,
-    ) -> Tuple[str, List[Any]]:
-        if not columns:
-            raise ValueError("No columns provided")
-        col_names = [c.name for c in columns]
-        if alias is None:
-            table_name = self.table.name
-            col_names_fmted = ", ".join(col_names)
-        else:
-            table_name = f"{self.table.name} AS {alias}"
-            col_names_fmted = ", ".join([f"{alias}.{c_name}" for c_name in col_names])
+        joins: List[Join] | None = None,
+    ) -> Tuple[str, Params]:
+        return self.translator.render(self.build_select(columns, alias, query_criteria, joins), parameterized=True)
 
-        # Generate parameterized SQL and extract parameters
-        sql, params = self.translator.query_criteria_to_sql_with_params(query_criteria, self.table)
+    @observed("aggregate")
+    def aggregate(
+        self,
+        aggregates: List[Aggregate],
+        group_by: List[Column] | None = None,
+        having: WhereClause | None = None,
+        query_criteria: SqlQueryCriteria | None = None,
+    ) -> str:
+        stmt, _ = self.translator.render(self.build_aggregate(aggregates, group_by, having, query_criteria))
+        return stmt
 
-        stmt = f"""
-        SELECT
-            {col_names_fmted}
-        FROM {table_name}
-        {sql}
+    @observed("aggregate")
+    def aggregate_with_params(
+        self,
+        aggregates: List[Aggregate],
+        group_by: List[Column] | None = None,
+        having: WhereClause | None = None,
+        query_criteria: SqlQueryCriteria | None = None,
+    ) -> Tuple[str, Params]:
+        """
+        Generate a parameterized aggregate query (GROUP BY / HAVING).
+        Returns a tuple of (SQL, parameters) for safe execution.
         """
+        node = self.build_aggregate(aggregates, group_by, having, query_criteria)
+        return self.translator.render(node, parameterized=True)
 
-        return textwrap.dedent(stmt), params
+    @observed("count")
+    def count(
+        self, query_criteria: SqlQueryCriteria | None = None, alias: str | None = None, joins: List[Join] | None = None
+    ) -> str:
+        stmt, _ = self.translator.render(self.build_count(query_criteria, alias, joins))
+        return stmt
 
-    def insert(self, key_values: dict[str, Any]):
-        column_map = {c.name: c for c in self.table.columns}
+    @observed("count")
+    def count_with_params(
+        self, query_criteria: SqlQueryCriteria | None = None, alias: str | None = None, joins: List[Join] | None = None
+    ) -> Tuple[str, Params]:
+        return self.translator.render(self.build_count(query_criteria, alias, joins), parameterized=True)
 
-        col_names = [k for k in key_values.keys() if column_map.get(k, None) is not None]
-        valid_col_values = [
-            self.translator.val_to_sql(column_map[col_name], value)
-            for col_name, value in key_values.items()
-            if column_map.get(col_name, None) is not None
-        ]
-        if not valid_col_values:
-            raise ValueError("No valid columns to insert")
+    @observed("select")
+    def select_with_total_with_params(
+        self,
+        columns: Sequence[Column | ColumnRef],
+        alias: str | None = None,
+        query_criteria: SqlQueryCriteria | None = None,
+        joins: List[Join] | None = None,
+        total_alias: str = "total_count",
+    ) -> Tuple[str, Params]:
+        """
+        Generate a parameterized page query that also returns the total row count.
+        Returns a tuple of (SQL, parameters) for safe execution.
+        """
+        node = self.build_select_with_total(columns, alias, query_criteria, joins, total_alias)
+        return self.translator.render(node, parameterized=True)
 
-        stmt = f"""
-        INSERT INTO {self.table.name}
-        ({",".join(col_names)})
-        VALUES
-        ({",".join(valid_col_values)})
-        ;
+    @observed("explain")
+    def explain_with_params(
+        self,
+        columns: Sequence[Column | ColumnRef],
+        query_criteria: SqlQueryCriteria | None = None,
+        analyze: bool = False,
+        buffers: bool = True,
+        alias: str | None = None,
+        joins: List[Join] | None = None,
+    ) -> Tuple[str, Params]:
         """
-        return textwrap.dedent(stmt)
+        Generate a parameterized EXPLAIN of the SELECT. With `analyze` the query is executed.
+        Returns a tuple of (SQL, parameters) for safe execution.
+        """
+        node = self.build_explain(columns, query_criteria, analyze, buffers, alias, joins)
+        return self.translator.render(node, parameterized=True)
 
-    def insert_with_params(self, key_values: dict[str, Any]) -> Tuple[str, List[Any]]:
+    def explain(
+        self,
+        columns: Sequence[Column | ColumnRef],
+        query_criteria: SqlQueryCriteria | None = None,
+        analyze: bool = False,
+        buffers: bool = True,
+        alias: str | None = None,
+        joins: List[Join] | None = None,
+    ) -> Any:
+        """Run EXPLAIN of the SELECT with the composer's executor and return the plan parsed by the translator"""
+        if self.executor is None:
+            raise ValueError("explain() requires a SqlComposer with an executor")
+        sql, params = self.explain_with_params(columns, query_criteria, analyze, buffers, alias, joins)
+        return self.translator.parse_plan(self.executor.fetch_all(sql, params))
+
+    def fetch(
+        self,
+        columns: Sequence[Column | ColumnRef],
+        alias: str | None = None,
+        query_criteria: SqlQueryCriteria | None = None,
+        joins: List[Join] | None = None,
+    ) -> List[tuple]:
+        """
+        Run the SELECT with the composer's executor, through the cache when there is one.
+        With a cache the observer's select event reports whether it was a hit.
+        """
+        if self.executor is None:
+            raise ValueError("fetch() requires a SqlComposer with an executor")
+        if self.cache is None:
+            return self.executor.fetch_all(*self.select_with_params(columns, alias, query_criteria, joins))
+
+        start = time.perf_counter()
+        node = self.build_select(columns, alias, query_criteria, joins)
+        sql, params = self.translator.render(node, parameterized=True)
+        duration = time.perf_counter() - start
+        rows = self.cache.get(sql, params)
+        if self.observer is not None:
+            # Reported before running the query, so e.g. a strict index advisor still stops it
+            event = compose_event("select", self.table.name, duration, (sql, params), query_criteria, rows is not None)
+            self.observer.on_compose(event)
+
+        if rows is None:
+            rows = self.executor.fetch_all(sql, params)
+            tables = [self.table.name, *(join.table.name for join in joins or [])]
+            self.cache.put(sql, params, rows, tables)
+        return rows
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
         """
-        Generate a parameterized INSERT query.
+        Run a composed write with the composer's executor and return the number of affected rows.
+        The cached reads of the table are dropped once it has run; a read cached between composing
+        and running the write would otherwise outlive it.
+        """
+        if self.executor is None:
+            raise ValueError("execute() requires a SqlComposer with an executor")
+        try:
+            return self.executor.execute(sql, params)
+        finally:
+            self.invalidate_cache()
+
+    def invalidate_cache(self):
+        """Drop the cached results reading this composer's table, e.g. after running a write elsewhere"""
+        if self.cache is not None:
+            self.cache.invalidate_table(self.table.name)
+
+    @observed("insert")
+    def insert(self, key_values: dict[str, Any], returning: List[Column] | None = None) -> str:
+        stmt, _ = self.translator.render(self.build_insert(key_values, returning))
+        return stmt
+
+    @observed("insert")
+    def insert_with_params(
+        self, key_values: dict[str, Any], returning: List[Column] | None = None
+    ) -> Tuple[str, Params]:
+        """
+        Generate a parameterized INSERT query, with an optional RETURNING clause.
         Returns a tuple of (SQL, parameters) for safe execution.
         """
-        column_map = {c.name: c for c in self.table.columns}
+        return self.translator.render(self.build_insert(key_values, returning), parameterized=True)
 
-        # Filter to only include valid columns
-        valid_key_values = {k: v for k, v in key_values.items() if column_map.get(k, None) is not None}
-        if not valid_key_values:
-            raise ValueError("No valid columns to insert")
+    @observed("insert")
+    def insert_many(self, rows: Iterable[dict[str, Any]], returning: List[Column] | None = None) -> str:
+        stmt, _ = self.translator.render(self.build_insert_many(rows, returning))
+        return stmt
 
-        col_names = list(valid_key_values.keys())
-        col_values = list(valid_key_values.values())
+    @observed("insert")
+    def insert_many_with_params(
+        self, rows: Iterable[dict[str, Any]], returning: List[Column] | None = None
+    ) -> Tuple[str, Params]:
+        """
+        Generate a parameterized multi-row INSERT query, with an optional RETURNING clause.
+        Returns a tuple of (SQL, parameters) for safe execution.
+        """
+        return self.translator.render(self.build_insert_many(rows, returning), parameterized=True)
 
-        # Create parameter placeholders
-        placeholders = ", ".join(["%s"] * len(col_values))
+    @observed("insert")
+    def insert_to(self, sink: Any, key_values: dict[str, Any], returning: List[Column] | None = None) -> None:
+        """Write the INSERT query into a writable, e.g. a file, io.BytesIO or `socket.makefile("wb")`"""
+        self.translator.render_to(self.build_insert(key_values, returning), sink)
 
-        stmt = f"""
-        INSERT INTO {self.table.name}
-        ({",".join(col_names)})
-        VALUES
-        ({placeholders})
-        ;
+    @observed("insert")
+    def insert_many_to(self, sink: Any, rows: Iterable[dict[str, Any]], returning: List[Column] | None = None) -> None:
         """
+        Stream a multi-row INSERT query into a writable row by row. Memory is bounded by one row however
+        many there are, e.g. for seed scripts generated from a lazy iterable.
 
-        return textwrap.dedent(stmt), col_values
+        The rows before it are already written when a row is rejected (e.g. a missing column): the
+        ValueError leaves a truncated INSERT in the sink, which the caller must discard.
+        """
+        self.translator.render_to(self.build_insert_many(rows, returning), sink)
 
-    def update(self, key_values: dict[str, Any]) -> str:
+    @observed("update")
+    def update_to(
+        self,
+        sink: Any,
+        key_values: dict[str, Any],
+        where: WhereClause | None = None,
+        returning: List[Column] | None = None,
+    ) -> None:
+        """Write the UPDATE query into a writable; nothing is written when there is nothing to update"""
         if not key_values:
-            return ""
+            return
 
-        column_map = {c.name: c for c in self.table.columns}
-        new_valid_key_values = [
-            f"{k} = {self.translator.val_to_sql(column_map[k], value)}"
-            for k, value in key_values.items()
-            if column_map.get(k, None) is not None
-        ]
+        self.translator.render_to(self.build_update(key_values, where, returning), sink)
 
-        if not new_valid_key_values:
-            raise ValueError("No valid columns to update")
+    @observed("update")
+    def update(
+        self, key_values: dict[str, Any], where: WhereClause | None = None, returning: List[Column] | None = None
+    ) -> str:
+        if not key_values:
+            return ""
 
-        stmt = f"""
-            UPDATE {self.table.name}
-            SET {", ".join(new_valid_key_values)}
-            ;
-        """
-        return textwrap.dedent(stmt)
+        stmt, _ = self.translator.render(self.build_update(key_values, where, returning))
+        return stmt
 
-    def update_with_params(self, key_values: dict[str, Any]) -> Tuple[str, List[Any]]:
+    @observed("update")
+    def update_with_params(
+        self, key_values: dict[str, Any], where: WhereClause | None = None, returning: List[Column] | None = None
+    ) -> Tuple[str, Params]:
         """
-        Generate a parameterized UPDATE query.
+        Generate a parameterized UPDATE query, with an optional WHERE and RETURNING clause.
         Returns a tuple of (SQL, parameters) for safe execution.
         """
         if not key_values:
             return "", []
 
-        column_map = {c.name: c for c in self.table.columns}
+        return self.translator.render(self.build_update(key_values, where, returning), parameterized=True)
 
-        # Filter to only include valid columns
-        valid_key_values = {k: v for k, v in key_values.items() if column_map.get(k, None) is not None}
+    @observed("delete")
+    def delete(self, where: WhereClause | None = None, returning: List[Column] | None = None) -> str:
+        stmt, _ = self.translator.render(self.build_delete(where, returning))
+        return stmt
 
-        if not valid_key_values:
-            raise ValueError("No valid columns to update")
-
-        # Create SET clause with parameter placeholders
-        set_clauses = [f"{k} = %s" for k in valid_key_values.keys()]
-        values = list(valid_key_values.values())
-
-        stmt = f"""
-            UPDATE {self.table.name}
-            SET {", ".join(set_clauses)}
-            ;
+    @observed("delete")
+    def delete_with_params(
+        self, where: WhereClause | None = None, returning: List[Column] | None = None
+    ) -> Tuple[str, Params]:
         """
-
-        return textwrap.dedent(stmt), values
-
-    def delete(self):
-        stmt = f"""
-            DELETE FROM {self.table.name}
-            ;
+        Generate a parameterized DELETE query, with an optional WHERE and RETURNING clause.
+        Returns a tuple of (SQL, parameters) for safe execution.
         """
-        return textwrap.dedent(stmt)
+        return self.translator.render(self.build_delete(where, returning), parameterized=True)
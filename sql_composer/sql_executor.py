@@ -0,0 +1,23 @@
+from abc import ABC, abstractmethod
+from typing import List
+from sql_composer.sql_placeholders import Params
+
+"""
+SqlExecutor runs composed statements.
+
+The composer itself never talks to a database. Features that need a round trip
+(e.g. count estimates) take an executor, so applications can plug in their
+driver or connection pool and tests can use canned results.
+"""
+
+
+class SqlExecutor(ABC):
+    @abstractmethod
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        """Run a query and return all rows as tuples"""
+        pass
+
+    @abstractmethod
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        """Run a statement and return the number of affected rows"""
+        pass
@@ -0,0 +1,324 @@
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterable, List, Union
+from sql_composer.db_models import Column, ColumnRef, Table
+from sql_composer.db_conditions import (
+    AggregateFunc,
+    AndGroup,
+    Condition,
+    FilterOp,
+    JoinType,
+    Not,
+    OrGroup,
+    RowIn,
+    Sort,
+    Page,
+    Where,
+    WhereClause,
+    SqlQueryCriteria,
+)
+
+"""
+Intermediate representation (IR) of SQL statements.
+
+SqlComposer lowers Table, Column and SqlQueryCriteria into these nodes and a
+SqlTranslator renders them to SQL in a single pass. Keeping the statement as
+data between the two steps lets callers cache, rewrite or analyse a query
+before any SQL text exists, and reuse fragments (e.g. a predicate tree) across
+statements.
+"""
+
+
+# Typed parameter slot
+@dataclass
+class Param:
+    """A value bound to the column it is compared with or assigned to"""
+
+    value: Any
+    column: Column | None = None
+
+
+# Predicate tree
+@dataclass
+class ComparisonNode:
+    field: str
+    op: FilterOp
+    params: List[Param]
+
+
+@dataclass
+class ColumnEqualsNode:
+    """Column to column equality, e.g. a join condition"""
+
+    left: ColumnRef
+    right: ColumnRef
+
+
+@dataclass
+class AndNode:
+    children: List["PredicateNode"]
+
+
+@dataclass
+class OrNode:
+    children: List["PredicateNode"]
+
+
+@dataclass
+class NotNode:
+    child: "PredicateNode"
+
+
+@dataclass
+class InSubqueryNode:
+    """`field IN (subquery)`, e.g. to address a batch of rows by key, or with `array` `field = ANY(ARRAY(subquery))`"""
+
+    field: str
+    subquery: "SelectNode"
+    array: bool = False
+
+
+@dataclass
+class InUnnestNode:
+    """`field IN (SELECT unnest(array))` - a large value list bound as one array, planned as a hashed semi-join"""
+
+    field: str
+    # The list of values, typed by the column compared
+    param: Param
+
+
+@dataclass
+class RowInNode:
+    """`(field, ...) IN ((value, ...), ...)`, the params of each row in the order of the fields"""
+
+    fields: List[str]
+    rows: List[List[Param]]
+
+
+PredicateNode = Union[
+    ComparisonNode, ColumnEqualsNode, InSubqueryNode, InUnnestNode, RowInNode, AndNode, OrNode, NotNode
+]
+
+
+# An empty AND is always true and an empty OR is always false
+def always_true() -> AndNode:
+    return AndNode([])
+
+
+def always_false() -> OrNode:
+    return OrNode([])
+
+
+def is_always_true(node: PredicateNode | None) -> bool:
+    return node is None or (isinstance(node, AndNode) and not node.children)
+
+
+def is_always_false(node: PredicateNode | None) -> bool:
+    return isinstance(node, OrNode) and not node.children
+
+
+# Select list
+@dataclass
+class AggregateNode:
+    """
+    An aggregate function call, optionally restricted by a FILTER (WHERE ...) predicate.
+    With `window` it is computed OVER () the whole result instead of grouping the rows.
+    """
+
+    func: AggregateFunc
+    column: Column | None
+    alias: str
+    distinct: bool = False
+    filter: PredicateNode | None = None
+    window: bool = False
+
+    @property
+    def sql_name(self) -> str:
+        return self.alias
+
+
+# Statements
+@dataclass
+class JoinNode:
+    """A joined table, or with `lateral` a correlated subquery joined ON TRUE"""
+
+    table: Table
+    alias: str
+    join_type: JoinType
+    on: PredicateNode | None = None
+    lateral: "SelectNode | None" = None
+
+
+@dataclass
+class SelectNode:
+    table: Table
+    columns: List[Column | ColumnRef | AggregateNode]
+    alias: str | None = None
+    where: PredicateNode | None = None
+    sort: List[Sort] = field(default_factory=list)
+    page: Page | None = None
+    joins: List[JoinNode] = field(default_factory=list)
+    group_by: List[Column] = field(default_factory=list)
+    # HAVING compares aggregates by alias, the translator renders their expressions
+    having: PredicateNode | None = None
+
+
+@dataclass
+class InsertNode:
+    table: Table
+    columns: List[Column]
+    values: List[Param]
+    returning: List[Column] = field(default_factory=list)
+
+
+@dataclass
+class InsertManyNode:
+    """A multi-row INSERT. The rows may be a lazy iterable, they are read once while rendering."""
+
+    table: Table
+    columns: List[Column]
+    rows: Iterable[List[Param]]
+    returning: List[Column] = field(default_factory=list)
+
+
+@dataclass
+class Assignment:
+    column: Column
+    param: Param
+
+
+@dataclass
+class UpdateNode:
+    table: Table
+    assignments: List[Assignment]
+    where: PredicateNode | None = None
+    returning: List[Column] = field(default_factory=list)
+
+
+@dataclass
+class DeleteNode:
+    table: Table
+    where: PredicateNode | None = None
+    returning: List[Column] = field(default_factory=list)
+
+
+@dataclass
+class ExplainNode:
+    """EXPLAIN of a statement, with the plan as JSON"""
+
+    statement: SelectNode
+    analyze: bool = False
+    buffers: bool = True
+
+
+StatementNode = Union[SelectNode, InsertNode, InsertManyNode, UpdateNode, DeleteNode, ExplainNode]
+
+
+def never_matches(node: StatementNode) -> bool:
+    """True when the statement's WHERE can never match a row, so it need not be sent to the database"""
+    if isinstance(node, ExplainNode):
+        return never_matches(node.statement)
+    return not isinstance(node, (InsertNode, InsertManyNode)) and is_always_false(node.where)
+
+
+# Lowering from query criteria
+def comparison_from_where(where: Where, column: Column | None = None) -> ComparisonNode:
+    return ComparisonNode(field=where.field, op=where.op, params=[Param(value, column) for value in where.values])
+
+
+Scope = Dict[str, ColumnRef | AggregateNode]
+
+
+def table_scope(table: Table, alias: str | None = None) -> Scope:
+    """
+    Map the field names a WhereClause or Sort may use to the columns they refer to.
+    With an alias, fields may also be qualified (`alias.column`) and render qualified.
+    """
+    if alias is None:
+        return {c.name: ColumnRef("", c) for c in table.columns}
+
+    scope: Scope = {}
+    for c in table.columns:
+        scope[c.name] = ColumnRef(alias, c)
+        scope[f"{alias}.{c.name}"] = ColumnRef(alias, c)
+    return scope
+
+
+def predicate_from_where_clause(
+    where_clause: WhereClause | None, table: Table, scope: Scope | None = None
+) -> PredicateNode | None:
+    """
+    Lower a WhereClause to a predicate tree.
+    Conditions on fields that are not in scope (by default the columns of the table) are dropped,
+    and so are groups left empty by that. A group that was empty to begin with is a constant:
+    an empty AndGroup is always true and an empty OrGroup always false.
+    """
+    if where_clause is None or not where_clause.conditions:
+        return None
+
+    return predicate_from_condition(AndGroup(where_clause.conditions), scope or table_scope(table))
+
+
+def predicate_from_condition(condition: Condition, scope: Scope) -> PredicateNode | None:
+    match condition:
+        case Where():
+            if condition.field not in scope:
+                return None
+            ref = scope[condition.field]
+            # Only MIN and MAX have the type of their column: COUNT is a bigint, and AVG and SUM widen it
+            # (AVG(int) is numeric), so their comparands are left uncast for the server to coerce
+            column = ref.column
+            if isinstance(ref, AggregateNode) and ref.func not in (AggregateFunc.MIN, AggregateFunc.MAX):
+                column = None
+            return ComparisonNode(
+                field=ref.sql_name, op=condition.op, params=[Param(value, column) for value in condition.values]
+            )
+        case RowIn():
+            return row_in_from_condition(condition, scope)
+        case AndGroup() | OrGroup():
+            if not condition.conditions:
+                return always_true() if isinstance(condition, AndGroup) else always_false()
+            children = [
+                child
+                for child in (predicate_from_condition(c, scope) for c in condition.conditions)
+                if child is not None
+            ]
+            if not children:
+                # Every condition was on an unknown field
+                return None
+            return AndNode(children) if isinstance(condition, AndGroup) else OrNode(children)
+        case Not():
+            child = predicate_from_condition(condition.condition, scope)
+            return NotNode(child) if child is not None else None
+        case _:
+            raise ValueError(f"Unsupported condition: {type(condition).__name__}")
+
+
+def row_in_from_condition(condition: RowIn, scope: Scope) -> RowInNode:
+    """Unlike a Where, a RowIn on an unknown field raises - dropping it would match rows of any key"""
+    if not condition.fields:
+        raise ValueError("RowIn requires at least one field")
+    if len(set(condition.fields)) != len(condition.fields):
+        raise ValueError(f"Duplicate RowIn fields: {condition.fields}")
+    refs = []
+    for field_name in condition.fields:
+        ref = scope.get(field_name)
+        if ref is None or isinstance(ref, AggregateNode):
+            raise ValueError(f"Unknown column in RowIn: {field_name}")
+        refs.append(ref)
+
+    rows = []
+    for row in condition.rows:
+        if len(row) != len(refs):
+            raise ValueError(f"RowIn row has {len(row)} values for {len(refs)} fields")
+        rows.append([Param(value, ref.column) for value, ref in zip(row, refs, strict=True)])
+    return RowInNode(fields=[ref.sql_name for ref in refs], rows=rows)
+
+
+def sort_from_query_criteria(
+    query_criteria: SqlQueryCriteria | None, table: Table, scope: Scope | None = None
+) -> List[Sort]:
+    """Sorts on fields that are not in scope (by default the columns of the table) are dropped"""
+    if query_criteria is None or not query_criteria.sort:
+        return []
+    scope = scope or table_scope(table)
+    return [replace(sort, field=scope[sort.field].sql_name) for sort in query_criteria.sort if sort.field in scope]
@@ -0,0 +1,65 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any
+
+"""
+JSON codecs for JSON/JSONB values.
+
+The translator encodes dicts and lists bound to JSON columns, validates JSON
+strings it inlines into literal SQL and decodes JSON read back. StdlibJsonCodec
+is the default; OrjsonCodec uses orjson, which is several times faster on large
+documents, and fastest_json_codec() picks it when it is installed.
+
+Codecs accept `bytes` as well as `str` wherever they read JSON, so documents
+that arrive already encoded are never decoded to text just to be parsed.
+"""
+
+JsonText = str | bytes | bytearray | memoryview
+
+
+class JsonCodec(ABC):
+    @abstractmethod
+    def dumps(self, value: Any) -> str:
+        pass
+
+    @abstractmethod
+    def loads(self, text: JsonText) -> Any:
+        pass
+
+    def validate(self, text: JsonText) -> None:
+        """Raise ValueError when the text is not valid JSON"""
+        self.loads(text)
+
+
+class StdlibJsonCodec(JsonCodec):
+    def dumps(self, value: Any) -> str:
+        return json.dumps(value)
+
+    def loads(self, text: JsonText) -> Any:
+        # json.loads takes bytes and bytearray, but not memoryview
+        return json.loads(bytes(text) if isinstance(text, memoryview) else text)
+
+
+class OrjsonCodec(JsonCodec):
+    def __init__(self):
+        try:
+            import orjson
+        except ImportError as e:
+            raise ValueError("OrjsonCodec requires the orjson package") from e
+        self._orjson = orjson
+
+    def dumps(self, value: Any) -> str:
+        # Non-str keys are converted like json.dumps does
+        return self._orjson.dumps(value, option=self._orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    def loads(self, text: JsonText) -> Any:
+        # orjson.JSONDecodeError is a ValueError
+        return self._orjson.loads(text)
+
+
+def fastest_json_codec() -> JsonCodec:
+    """OrjsonCodec when orjson is installed, StdlibJsonCodec otherwise"""
+    try:
+        return OrjsonCodec()
+    except ValueError:
+        return StdlibJsonCodec()
@@ -0,0 +1,248 @@
+import functools
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple, TypeVar, cast
+from sql_composer.db_models import Table
+from sql_composer.db_conditions import SqlQueryCriteria
+
+"""
+Instrumentation hooks for SqlComposer and SqlTranslator.
+
+Both classes accept an optional SqlObserver. When no observer is attached the
+instrumented methods call straight through without timing anything, so the
+disabled path costs one attribute lookup per compose operation.
+"""
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class ComposeEvent:
+    """A single compose operation as reported to a SqlObserver"""
+
+    kind: str
+    table: str
+    duration: float
+    param_count: int
+    sql_bytes: int
+    parameterized: bool
+    cache_hit: bool | None = None
+    sql: str = ""
+    query_criteria: SqlQueryCriteria | None = None
+
+
+class SqlObserver(ABC):
+    @abstractmethod
+    def on_compose(self, event: ComposeEvent) -> None:
+        pass
+
+
+def _observed_table_name(instance: Any, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+    table = kwargs.get("table")
+    if table is None:
+        table = next((arg for arg in args if isinstance(arg, Table)), None)
+    if table is None:
+        table = getattr(instance, "table", None)
+    return table.name if table is not None else ""
+
+
+def _observed_query_criteria(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> SqlQueryCriteria | None:
+    query_criteria = kwargs.get("query_criteria")
+    if query_criteria is None:
+        query_criteria = next((arg for arg in args if isinstance(arg, SqlQueryCriteria)), None)
+    return query_criteria
+
+
+def compose_event(
+    kind: str,
+    table: str,
+    duration: float,
+    result: str | Tuple[str, Any] | None,
+    query_criteria: SqlQueryCriteria | None = None,
+    cache_hit: bool | None = None,
+) -> ComposeEvent:
+    """The event of a composed SQL string or (SQL, parameters) tuple, or of SQL written to a sink (None)"""
+    parameterized = isinstance(result, tuple)
+    sql, params = result if isinstance(result, tuple) else (result or "", [])
+    return ComposeEvent(
+        kind=kind,
+        table=table,
+        duration=duration,
+        param_count=len(params),
+        sql_bytes=len(sql.encode("utf-8")),
+        parameterized=parameterized,
+        cache_hit=cache_hit,
+        sql=sql,
+        query_criteria=query_criteria,
+    )
+
+
+def observed(kind: str) -> Callable[[F], F]:
+    """
+    Decorate a compose method so it reports a ComposeEvent to `self.observer`.
+    The method may return either a SQL string or a (SQL, parameters) tuple, or None when it
+    writes the SQL into a sink - the event then has empty SQL and the duration includes the writes.
+    """
+
+    def decorator(method: F) -> F:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            observer = self.observer
+            if observer is None:
+                return method(self, *args, **kwargs)
+
+            start = time.perf_counter()
+            result = method(self, *args, **kwargs)
+            duration = time.perf_counter() - start
+
+            table = _observed_table_name(self, args, kwargs)
+            observer.on_compose(compose_event(kind, table, duration, result, _observed_query_criteria(args, kwargs)))
+            return result
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+class CompositeObserver(SqlObserver):
+    """Fan a ComposeEvent out to several observers"""
+
+    def __init__(self, observers: List[SqlObserver]):
+        self.observers = observers
+
+    def on_compose(self, event: ComposeEvent) -> None:
+        for observer in self.observers:
+            observer.on_compose(event)
+
+
+# Latency buckets in seconds - composition is usually measured in microseconds
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+)
+
+
+@dataclass
+class ComposeStats:
+    """Aggregated metrics for one (kind, table) series"""
+
+    count: int = 0
+    duration_sum: float = 0.0
+    bucket_counts: List[int] = field(default_factory=list)
+    param_count: int = 0
+    sql_bytes: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsAggregator(SqlObserver):
+    """
+    In-process SqlObserver keeping counters and latency histograms per statement kind and table.
+    Use `to_prometheus()` to export the metrics in the Prometheus text exposition format.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS, prefix: str = "sql_composer"):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._series: Dict[Tuple[str, str], ComposeStats] = {}
+        self._lock = threading.Lock()
+
+    def on_compose(self, event: ComposeEvent) -> None:
+        key = (event.kind, event.table)
+        with self._lock:
+            stats = self._series.get(key)
+            if stats is None:
+                stats = ComposeStats(bucket_counts=[0] * (len(self.buckets) + 1))
+                self._series[key] = stats
+
+            stats.count += 1
+            stats.duration_sum += event.duration
+            stats.bucket_counts[bisect_left(self.buckets, event.duration)] += 1
+            stats.param_count += event.param_count
+            stats.sql_bytes += event.sql_bytes
+            if event.cache_hit is True:
+                stats.cache_hits += 1
+            elif event.cache_hit is False:
+                stats.cache_misses += 1
+
+    def get(self, kind: str, table: str) -> ComposeStats | None:
+        """Return a copy of the aggregated metrics for a (kind, table) series"""
+        with self._lock:
+            stats = self._series.get((kind, table))
+            if stats is None:
+                return None
+            return ComposeStats(
+                count=stats.count,
+                duration_sum=stats.duration_sum,
+                bucket_counts=list(stats.bucket_counts),
+                param_count=stats.param_count,
+                sql_bytes=stats.sql_bytes,
+                cache_hits=stats.cache_hits,
+                cache_misses=stats.cache_misses,
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            series = sorted(self._series.items())
+            lines: List[str] = []
+
+            def header(name: str, metric_type: str, help_text: str):
+                lines.append(f"# HELP {self.prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {self.prefix}_{name} {metric_type}")
+
+            header("compose_total", "counter", "Number of composed statements.")
+            for (kind, table), stats in series:
+                lines.append(f"{self.prefix}_compose_total{{{self._labels(kind, table)}}} {stats.count}")
+
+            header("compose_seconds", "histogram", "Time spent composing statements.")
+            for (kind, table), stats in series:
+                labels = self._labels(kind, table)
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, stats.bucket_counts[: len(self.buckets)], strict=True):
+                    cumulative += bucket_count
+                    lines.append(f'{self.prefix}_compose_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{self.prefix}_compose_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+                lines.append(f"{self.prefix}_compose_seconds_sum{{{labels}}} {stats.duration_sum}")
+                lines.append(f"{self.prefix}_compose_seconds_count{{{labels}}} {stats.count}")
+
+            header("params_total", "counter", "Number of bound parameters in composed statements.")
+            for (kind, table), stats in series:
+                lines.append(f"{self.prefix}_params_total{{{self._labels(kind, table)}}} {stats.param_count}")
+
+            header("sql_bytes_total", "counter", "Bytes of SQL text composed.")
+            for (kind, table), stats in series:
+                lines.append(f"{self.prefix}_sql_bytes_total{{{self._labels(kind, table)}}} {stats.sql_bytes}")
+
+            header("cache_requests_total", "counter", "Cache lookups by result.")
+            for (kind, table), stats in series:
+                labels = self._labels(kind, table)
+                lines.append(f'{self.prefix}_cache_requests_total{{{labels},result="hit"}} {stats.cache_hits}')
+                lines.append(f'{self.prefix}_cache_requests_total{{{labels},result="miss"}} {stats.cache_misses}')
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _labels(kind: str, table: str) -> str:
+        return f'kind="{_escape_label(kind)}",table="{_escape_label(table)}"'
@@ -0,0 +1,58 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Tuple
+
+"""
+Placeholder styles for parameterized SQL.
+
+The translator asks its Placeholders for the marker of each parameter as it
+renders, so the SQL comes out in the driver's style without post-processing:
+
+- PercentPlaceholders: `%s`, the default (psycopg2, psycopg)
+- NumberedPlaceholders: `$1, $2, ...` (asyncpg, PostgreSQL PREPARE)
+- NamedPlaceholders: `%(p1)s, %(p2)s, ...` with the parameters as a dict
+- QmarkPlaceholders: `?` (SQLite, DuckDB)
+"""
+
+# Parameters as passed to the driver - positional, or by name for NamedPlaceholders
+Params = List[Any] | Dict[str, Any]
+
+
+class Placeholders(ABC):
+    @abstractmethod
+    def placeholder(self, position: int) -> str:
+        """The marker of the parameter at `position`, counting from 1 across the whole statement"""
+        pass
+
+    def bind(self, values: List[Any]) -> Params:
+        """The parameters in the form the driver expects, given the values in placeholder order"""
+        return values
+
+    def format(self, sql: str, values: List[Any]) -> Tuple[str, Params]:
+        """A hand-written statement with a `{}` field per value, its fields replaced by the markers"""
+        return sql.format(*(self.placeholder(p) for p in range(1, len(values) + 1))), self.bind(values)
+
+
+class PercentPlaceholders(Placeholders):
+    def placeholder(self, position: int) -> str:
+        return "%s"
+
+
+class NumberedPlaceholders(Placeholders):
+    def placeholder(self, position: int) -> str:
+        return f"${position}"
+
+
+class NamedPlaceholders(Placeholders):
+    def __init__(self, prefix: str = "p"):
+        self.prefix = prefix
+
+    def placeholder(self, position: int) -> str:
+        return f"%({self.prefix}{position})s"
+
+    def bind(self, values: List[Any]) -> Params:
+        return {f"{self.prefix}{position}": value for position, value in enumerate(values, start=1)}
+
+
+class QmarkPlaceholders(Placeholders):
+    def placeholder(self, position: int) -> str:
+        return "?"
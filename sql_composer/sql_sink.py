@@ -0,0 +1,38 @@
+import io
+from typing import Any
+
+"""
+Writable targets of streamed SQL.
+
+render_to() writes a statement piece by piece instead of returning it as one
+string, so scripts of any size can be generated in bounded memory. SqlSink
+accepts any object with a `write()` method: text files and io.StringIO are
+written str, binary files, io.BytesIO and `socket.makefile("wb")` are written
+the text encoded.
+"""
+
+
+class SqlSink:
+    def __init__(self, target: Any, encoding: str = "utf-8"):
+        if not callable(getattr(target, "write", None)):
+            raise ValueError(f"Cannot write SQL to {type(target).__name__}, it has no write()")
+        self.target = target
+        self.encoding = encoding
+        # None until the first write tells whether the target takes str or bytes
+        self._binary: bool | None = None
+        if isinstance(target, io.TextIOBase):
+            self._binary = False
+        elif isinstance(target, (io.RawIOBase, io.BufferedIOBase)):
+            self._binary = True
+
+    def write(self, text: str) -> None:
+        if not text:
+            return
+        if self._binary is None:
+            try:
+                self.target.write(text)
+                self._binary = False
+                return
+            except TypeError:
+                self._binary = True
+        self.target.write(text.encode(self.encoding) if self._binary else text)
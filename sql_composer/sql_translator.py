@@ -2,13 +2,38 @@ from abc import ABC, abstractmethod
 from typing import Any, List, Tuple
 from sql_composer.db_models import Column, Table
 from sql_composer.db_conditions import Where, Sort, Page, SqlQueryCriteria
+from sql_composer.sql_ir import PredicateNode, StatementNode
+from sql_composer.sql_observer import SqlObserver
+from sql_composer.sql_placeholders import Params, PercentPlaceholders, Placeholders
+from sql_composer.sql_sink import SqlSink
 
 
 class SqlTranslator(ABC):
+    # Class defaults for subclasses with their own __init__ that don't call super().__init__()
+    observer: SqlObserver | None = None
+    placeholders: Placeholders = PercentPlaceholders()
+
+    def __init__(self, observer: SqlObserver | None = None, placeholders: Placeholders | None = None):
+        self.observer = observer
+        # Parameter markers of parameterized SQL, `%s` by default
+        self.placeholders = placeholders or PercentPlaceholders()
+
+    def simplify_predicate(self, node: PredicateNode | None) -> PredicateNode | None:
+        """Optimization pass over a predicate tree before rendering. Translators may override it."""
+        return node
+
     @abstractmethod
     def val_to_sql(self, column: Column, value: Any) -> str:
         pass
 
+    def sql_to_val(self, column: Column, value: Any) -> Any:
+        """Decode a value read from the database for the column's type. Translators may override it."""
+        return value
+
+    def parse_plan(self, rows: List[tuple]) -> Any:
+        """Parse the rows returned by an EXPLAIN rendered by this translator"""
+        raise NotImplementedError(f"{type(self).__name__} does not support EXPLAIN")
+
     @abstractmethod
     def where_to_sql(self, where: Where, column: Column) -> str:
         pass
@@ -28,5 +53,14 @@ class SqlTranslator(ABC):
     @abstractmethod
     def query_criteria_to_sql_with_params(
         self, query_criteria: SqlQueryCriteria | None, table: Table
-    ) -> Tuple[str, List[Any]]:
+    ) -> Tuple[str, Params]:
         pass
+
+    def render(self, node: StatementNode, parameterized: bool = False) -> Tuple[str, Params]:
+        """Render a statement node to SQL and its parameters. Translators override it to support the IR statements."""
+        raise NotImplementedError(f"{type(self).__name__} does not render statement nodes, override render()")
+
+    def render_to(self, node: StatementNode, sink: Any) -> None:
+        """Render a statement node to literal SQL into a writable. Translators may override it to stream the SQL."""
+        sql, _ = self.render(node)
+        (sink if isinstance(sink, SqlSink) else SqlSink(sink)).write(sql)
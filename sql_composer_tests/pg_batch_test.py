@@ -0,0 +1,133 @@
+import unittest
+from typing import Any, List
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import AndGroup, Not, OrGroup, Where, WhereClause
+from sql_composer.pg.pg_batch import PgBatchWriter
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_placeholders import Params
+
+
+class EventTable(Table):
+    id = Column("id", PgDataTypes.BIGINT)
+    status = Column("status", PgDataTypes.TEXT)
+    expires_at = Column("expires_at", PgDataTypes.TIMESTAMPTZ)
+
+
+class FakeExecutor(SqlExecutor):
+    """Returns the queued results in order and records the statements"""
+
+    def __init__(self, results: List[Any]):
+        self.results = results
+        self.statements: List[tuple] = []
+
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        self.statements.append((sql, params))
+        return self.results.pop(0)
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        self.statements.append((sql, params))
+        return self.results.pop(0)
+
+
+class TestFilteredWrites(unittest.TestCase):
+    def setUp(self):
+        self.table = EventTable("events")
+        self.composer = SqlComposer(PgSqlTranslator(), self.table)
+        self.expired = WhereClause([Where("expires_at", PgFilterOp.LESS_THAN, ["2024-01-01"])])
+
+    def test_update_and_delete_where(self):
+        """Test UPDATE and DELETE accept a WhereClause"""
+        sql, params = self.composer.update_with_params({"status": "expired"}, where=self.expired)
+        self.assertEqual(sql, "\nUPDATE events\nSET status = %s\nWHERE expires_at < %s\n;\n")
+        self.assertEqual(params, ["expired", "2024-01-01"])
+
+        where = WhereClause([OrGroup([Where("status", PgFilterOp.EQUAL, ["a"]), Where("id", PgFilterOp.EQUAL, [1])])])
+        self.assertEqual(self.composer.delete(where=where), "\nDELETE FROM events\nWHERE status = 'a'\nOR id = 1\n;\n")
+
+    def test_unknown_field_raises(self):
+        """Test a write never drops a condition on an unknown field"""
+        where = WhereClause([OrGroup([Where("statsu", PgFilterOp.EQUAL, ["a"])])])
+        with self.assertRaises(ValueError):
+            self.composer.delete_with_params(where=where)
+        with self.assertRaises(ValueError):
+            self.composer.update_with_params({"status": "b"}, where=where)
+
+        unknown_group = WhereClause([AndGroup([Not(Where("statsu", PgFilterOp.EQUAL, ["a"]))])])
+        with self.assertRaises(ValueError):
+            self.composer.delete(where=unknown_group)
+        with self.assertRaises(ValueError):
+            self.composer.update({"status": "b"}, where=unknown_group)
+
+    def test_empty_or_group_writes_nothing(self):
+        """Test a write filtered by an empty OR group addresses no rows instead of the whole table"""
+        nothing = WhereClause([OrGroup([])])
+        self.assertEqual(
+            self.composer.delete_with_params(where=nothing), ("\nDELETE FROM events\nWHERE FALSE\n;\n", [])
+        )
+        sql, params = self.composer.update_with_params({"status": "b"}, where=nothing)
+        self.assertEqual(sql, "\nUPDATE events\nSET status = %s\nWHERE FALSE\n;\n")
+        self.assertEqual(params, ["b"])
+
+
+class TestPgBatchWriter(unittest.TestCase):
+    def setUp(self):
+        self.table = EventTable("events")
+        self.composer = SqlComposer(PgSqlTranslator(), self.table)
+        self.expired = WhereClause([Where("expires_at", PgFilterOp.LESS_THAN, ["2024-01-01"])])
+
+    def test_delete_batch_sql(self):
+        """Test a ctid batch uses = ANY(ARRAY(...)) and a key batch uses IN"""
+        writer = PgBatchWriter(self.composer, FakeExecutor([]), batch_size=500)
+
+        sql, params = writer.delete_batch_with_params(self.expired)
+        self.assertEqual(
+            sql,
+            "\nDELETE FROM events\nWHERE ctid = ANY(ARRAY(\nSELECT\n    ctid\nFROM events\nWHERE expires_at < %s"
+            "\nORDER BY ctid ASC\nLIMIT 500\n))\n;\n",
+        )
+        self.assertEqual(params, ["2024-01-01"])
+
+        sql, _ = writer.delete_batch_with_params(self.expired, key=self.table.id)
+        self.assertIn("WHERE id IN (\nSELECT\n    id\nFROM events", sql)
+
+    def test_delete_loops_until_short_batch(self):
+        """Test the delete loop stops after a short batch and pauses between batches"""
+        pauses = []
+        executor = FakeExecutor([100, 100, 40])
+        writer = PgBatchWriter(self.composer, executor, batch_size=100, pause=0.5, sleep=pauses.append)
+
+        result = writer.delete(self.expired)
+
+        self.assertEqual((result.rows, result.batches), (240, 3))
+        self.assertEqual(pauses, [0.5, 0.5])
+
+    def test_update_walks_the_key(self):
+        """Test the update loop continues after the largest key of the previous batch"""
+        executor = FakeExecutor([[(1,), (3,)], [(7,), (5,)], []])
+        writer = PgBatchWriter(self.composer, executor, batch_size=2)
+
+        result = writer.update({"status": "expired"}, self.expired, key=self.table.id)
+
+        self.assertEqual((result.rows, result.batches), (4, 3))
+        first_sql, first_params = executor.statements[0]
+        self.assertIn("WHERE id IN (\nSELECT\n    id\nFROM events\nWHERE expires_at < %s\nORDER BY id ASC", first_sql)
+        self.assertIn("RETURNING id", first_sql)
+        self.assertEqual(first_params, ["expired", "2024-01-01"])
+        last_sql, last_params = executor.statements[-1]
+        self.assertIn("WHERE expires_at < %s\nAND id > %s", last_sql)
+        self.assertEqual(last_params, ["expired", "2024-01-01", 7])
+
+    def test_never_matches(self):
+        """Test unsatisfiable criteria don't reach the database"""
+        composer = SqlComposer(PgSqlTranslator(simplify_predicates=True), self.table)
+        executor = FakeExecutor([])
+        result = PgBatchWriter(composer, executor).delete(WhereClause([Where("id", PgFilterOp.IN, [])]))
+        self.assertEqual((result.rows, executor.statements), (0, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
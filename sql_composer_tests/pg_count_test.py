@@ -0,0 +1,143 @@
+import unittest
+from typing import List
+from sql_composer.db_models import Column, ColumnRef, Table
+from sql_composer.db_conditions import Join, Page, SqlQueryCriteria, Where, WhereClause
+from sql_composer.pg.pg_count import CountStrategy, PgRowCounter
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_placeholders import Params
+
+
+class MockTable(Table):
+    id = Column("id", PgDataTypes.INT)
+    status = Column("status", PgDataTypes.TEXT)
+
+
+class TagTable(Table):
+    event_id = Column("event_id", PgDataTypes.INT)
+    tag = Column("tag", PgDataTypes.TEXT)
+
+
+class FakeExecutor(SqlExecutor):
+    """Returns canned rows for the first response whose key occurs in the SQL"""
+
+    def __init__(self, responses: dict):
+        self.responses = responses
+        self.queries: List[str] = []
+
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        self.queries.append(sql)
+        return next(rows for key, rows in self.responses.items() if key in sql)
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        raise NotImplementedError
+
+
+class TestPgRowCounter(unittest.TestCase):
+    def setUp(self):
+        self.table = MockTable("events")
+        self.composer = SqlComposer(PgSqlTranslator(simplify_predicates=True), self.table)
+        self.criteria = SqlQueryCriteria(
+            where=WhereClause([Where("status", PgFilterOp.EQUAL, ["open"])]), page=Page(limit=2, offset=4)
+        )
+
+    def test_count_sql(self):
+        """Test the exact count reuses the WHERE clause without sort and page"""
+        sql, params = self.composer.count_with_params(self.criteria)
+        self.assertEqual(sql, "\nSELECT\n    COUNT(*) AS count\nFROM events\nWHERE status = %s\n")
+        self.assertEqual(params, ["open"])
+
+        sql, params = self.composer.select_with_total_with_params([self.table.id], query_criteria=self.criteria)
+        self.assertIn("SELECT\n    id, COUNT(*) OVER () AS total_count\nFROM events", sql)
+        self.assertIn("LIMIT 2 OFFSET 4", sql)
+
+    def test_select_with_total_keeps_columns(self):
+        """Test the window column is not appended to the caller's column list"""
+        columns = list(self.table.columns)
+        self.composer.select_with_total_with_params(self.table.columns, query_criteria=self.criteria)
+        self.assertEqual(self.table.columns, columns)
+        sql, _ = self.composer.select_with_params(self.table.columns)
+        self.assertNotIn("OVER ()", sql)
+
+    def test_exact_and_estimate(self):
+        """Test the exact count, the reltuples estimate and the EXPLAIN estimate"""
+        executor = FakeExecutor(
+            {
+                "COUNT(*)": [(7,)],
+                "pg_class": [(1_000_000,)],
+                "EXPLAIN": [([{"Plan": {"Plan Rows": 420}}],)],
+            }
+        )
+        counter = PgRowCounter(self.composer, executor)
+
+        exact = counter.count(self.criteria, CountStrategy.EXACT)
+        self.assertEqual((exact.count, exact.exact), (7, True))
+
+        table_estimate = counter.count(None, CountStrategy.ESTIMATE)
+        self.assertEqual((table_estimate.count, table_estimate.exact), (1_000_000, False))
+
+        filtered_estimate = counter.count(self.criteria, CountStrategy.ESTIMATE)
+        self.assertEqual(filtered_estimate.count, 420)
+        # The composer's EXPLAIN, planned only
+        self.assertTrue(executor.queries[-1].startswith("\nEXPLAIN (FORMAT JSON)\nSELECT"))
+
+    def test_auto(self):
+        """Test auto counts exactly below the threshold and keeps the estimate above it"""
+        executor = FakeExecutor({"COUNT(*)": [(7,)], "EXPLAIN": [('[{"Plan": {"Plan Rows": 9}}]',)]})
+        small = PgRowCounter(self.composer, executor, auto_threshold=10).count(self.criteria)
+        self.assertEqual((small.count, small.strategy), (7, CountStrategy.EXACT))
+
+        large = PgRowCounter(self.composer, executor, auto_threshold=5).count(self.criteria)
+        self.assertEqual((large.count, large.strategy), (9, CountStrategy.ESTIMATE))
+
+    def test_window_page(self):
+        """Test the window strategy splits the total off the rows and falls back past the last page"""
+        executor = FakeExecutor({"OVER ()": [(1, 12), (2, 12)], "COUNT(*)": [(12,)]})
+        page = PgRowCounter(self.composer, executor).select_page(
+            [self.table.id], query_criteria=self.criteria, strategy=CountStrategy.WINDOW
+        )
+        self.assertEqual(page.rows, [(1,), (2,)])
+        self.assertEqual(page.total.count, 12)
+        self.assertEqual(len(executor.queries), 1)
+
+        executor = FakeExecutor({"OVER ()": [], "COUNT(*)": [(3,)]})
+        page = PgRowCounter(self.composer, executor).select_page(
+            [self.table.id], query_criteria=self.criteria, strategy=CountStrategy.WINDOW
+        )
+        self.assertEqual((page.rows, page.total.count), ([], 3))
+
+    def test_joined_page(self):
+        """Test a joined page is counted over the same joins and filters, whatever the strategy"""
+        tags = TagTable("tags")
+        joins = [Join(tags, "t", on=[(ColumnRef("e", self.table.id), ColumnRef("t", tags.event_id))])]
+        criteria = SqlQueryCriteria(where=WhereClause([Where("t.tag", PgFilterOp.EQUAL, ["urgent"])]))
+        for strategy in (CountStrategy.EXACT, CountStrategy.ESTIMATE):
+            executor = FakeExecutor(
+                {"COUNT(*)": [(5,)], "EXPLAIN": [([{"Plan": {"Plan Rows": 6}}],)], "SELECT": [(1,), (2,)]}
+            )
+            page = PgRowCounter(self.composer, executor).select_page(
+                [self.table.id], "e", criteria, joins, strategy=strategy
+            )
+            self.assertEqual(
+                (page.rows, page.total.count), ([(1,), (2,)], 6 if strategy == CountStrategy.ESTIMATE else 5)
+            )
+            count_sql = executor.queries[-1]
+            self.assertIn("FROM events AS e\nINNER JOIN tags AS t ON e.id = t.event_id\nWHERE t.tag = %s", count_sql)
+
+        # The literal count takes the same joins
+        count_sql = self.composer.count(criteria, "e", joins)
+        self.assertIn("FROM events AS e\nINNER JOIN tags AS t ON e.id = t.event_id\nWHERE t.tag = 'urgent'", count_sql)
+
+    def test_never_matches(self):
+        """Test unsatisfiable criteria are counted without a round trip"""
+        executor = FakeExecutor({})
+        criteria = SqlQueryCriteria(where=WhereClause([Where("status", PgFilterOp.IN, [])]))
+        self.assertEqual(PgRowCounter(self.composer, executor).count(criteria).count, 0)
+        self.assertEqual(executor.queries, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import json
+import os
+import tempfile
+import unittest
+from typing import List
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import Sort, SortType, SqlQueryCriteria, Where, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_explain import (
+    PlanRegressionError,
+    analyze_plan,
+    check_plan_fixture,
+    parse_explain,
+    plan_shape,
+)
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_placeholders import Params
+
+
+class OrderTable(Table):
+    id = Column("id", PgDataTypes.INT)
+    status = Column("status", PgDataTypes.TEXT)
+    created_at = Column("created_at", PgDataTypes.TIMESTAMPTZ)
+
+
+# Canned EXPLAIN (FORMAT JSON, ANALYZE, BUFFERS) output
+ANALYZED_PLAN = [
+    {
+        "Plan": {
+            "Node Type": "Sort",
+            "Startup Cost": 1200.5,
+            "Total Cost": 1250.0,
+            "Plan Rows": 20,
+            "Plan Width": 16,
+            "Actual Rows": 48000,
+            "Actual Loops": 1,
+            "Sort Method": "external merge",
+            "Sort Space Used": 2048,
+            "Sort Space Type": "Disk",
+            "Plans": [
+                {
+                    "Node Type": "Seq Scan",
+                    "Relation Name": "orders",
+                    "Alias": "orders",
+                    "Startup Cost": 0.0,
+                    "Total Cost": 1100.0,
+                    "Plan Rows": 20,
+                    "Plan Width": 16,
+                    "Actual Rows": 48000,
+                    "Actual Loops": 1,
+                    "Filter": "(status = 'open'::text)",
+                    "Rows Removed by Filter": 2000,
+                    "Shared Hit Blocks": 10,
+                    "Shared Read Blocks": 500,
+                }
+            ],
+        },
+        "Planning Time": 0.2,
+        "Execution Time": 85.1,
+    }
+]
+
+INDEX_PLAN = {
+    "Plan": {
+        "Node Type": "Index Scan",
+        "Relation Name": "orders",
+        "Index Name": "orders_status_created_at_idx",
+        "Startup Cost": 0.4,
+        "Total Cost": 8.4,
+        "Plan Rows": 20,
+    }
+}
+
+
+class FakeExecutor(SqlExecutor):
+    def __init__(self, rows: List[tuple]):
+        self.rows = rows
+        self.sql = ""
+
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        self.sql = sql
+        return self.rows
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        raise NotImplementedError
+
+
+class TestPgExplain(unittest.TestCase):
+    def setUp(self):
+        self.table = OrderTable("orders")
+        self.criteria = SqlQueryCriteria(
+            where=WhereClause([Where("status", PgFilterOp.EQUAL, ["open"])]), sort=[Sort("created_at", SortType.DESC)]
+        )
+
+    def test_explain_sql(self):
+        """Test EXPLAIN options wrap the composed SELECT"""
+        composer = SqlComposer(PgSqlTranslator(), self.table)
+        sql, params = composer.explain_with_params([self.table.id], self.criteria, analyze=True)
+        self.assertTrue(sql.startswith("\nEXPLAIN (FORMAT JSON, ANALYZE, BUFFERS)\nSELECT\n    id\nFROM orders"))
+        self.assertEqual(params, ["open"])
+
+        sql, _ = composer.explain_with_params([self.table.id], buffers=False)
+        self.assertTrue(sql.startswith("\nEXPLAIN (FORMAT JSON)\nSELECT"))
+
+    def test_explain_parses_plan(self):
+        """Test explain() runs through the executor and returns a typed plan tree"""
+        executor = FakeExecutor([(ANALYZED_PLAN,)])
+        composer = SqlComposer(PgSqlTranslator(), self.table, executor=executor)
+
+        plan = composer.explain([self.table.id], self.criteria, analyze=True)
+
+        self.assertIn("EXPLAIN", executor.sql)
+        self.assertEqual(plan.execution_time, 85.1)
+        self.assertEqual([node.node_type for node in plan.walk()], ["Sort", "Seq Scan"])
+        self.assertEqual(plan.root.children[0].shared_read_blocks, 500)
+
+        with self.assertRaises(ValueError):
+            SqlComposer(PgSqlTranslator(), self.table).explain([self.table.id])
+
+    def test_analyze_plan(self):
+        """Test seq scans, estimate errors, disk sorts and the costliest nodes are reported"""
+        analysis = analyze_plan(parse_explain(json.dumps(ANALYZED_PLAN)))
+
+        self.assertEqual(
+            [(issue.kind, issue.node.node_type) for issue in analysis.issues],
+            [
+                ("estimate_error", "Sort"),
+                ("disk_sort", "Sort"),
+                ("seq_scan", "Seq Scan"),
+                ("estimate_error", "Seq Scan"),
+            ],
+        )
+        self.assertIn("2400x off", analysis.of_kind("estimate_error")[1].message)
+        self.assertEqual(analysis.costliest[0].node_type, "Seq Scan")
+
+    def test_plan_fixture(self):
+        """Test the plan regression check records, passes and then fails on a changed plan"""
+        with tempfile.TemporaryDirectory() as directory:
+            fixture = os.path.join(directory, "orders_by_status.json")
+            check_plan_fixture(parse_explain(INDEX_PLAN), fixture)
+            check_plan_fixture(parse_explain(INDEX_PLAN), fixture)
+
+            with self.assertRaises(PlanRegressionError) as context:
+                check_plan_fixture(parse_explain(ANALYZED_PLAN), fixture)
+            self.assertIn(
+                "Plan: expected Index Scan using orders_status_created_at_idx on orders, got Sort",
+                str(context.exception),
+            )
+
+            check_plan_fixture(parse_explain(ANALYZED_PLAN), fixture, update=True)
+            with open(fixture) as f:
+                self.assertEqual(json.load(f), plan_shape(parse_explain(ANALYZED_PLAN)))
+
+
+if __name__ == "__main__":
+    unittest.main()
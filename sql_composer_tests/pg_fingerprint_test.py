@@ -0,0 +1,125 @@
+import unittest
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import Where, WhereClause, Sort, SortType, Page, SqlQueryCriteria
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_fingerprint import (
+    FingerprintRegistry,
+    criteria_shape,
+    fingerprint,
+    join_pg_stat_statements,
+    normalize_sql,
+)
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+
+
+class MockTable(Table):
+    id = Column("id", PgDataTypes.INT)
+    username = Column("name", PgDataTypes.TEXT)
+
+
+def stat_row(query: str, total_exec_time: float) -> dict:
+    """Canned pg_stat_statements row"""
+    return {
+        "userid": 10,
+        "dbid": 5,
+        "queryid": -4123412341234,
+        "query": query,
+        "calls": 100,
+        "total_exec_time": total_exec_time,
+        "mean_exec_time": total_exec_time / 100,
+        "rows": 250,
+        "toplevel": True,
+    }
+
+
+class TestPgFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.table = MockTable("users")
+
+    def test_normalize_sql(self):
+        """Test literals, placeholders and formatting are normalized"""
+        self.assertEqual(
+            normalize_sql("SELECT id\n  FROM users WHERE name = 'O''Brien' AND age > -5 LIMIT 10;"),
+            "select id from users where name = ? and age > ? limit ?",
+        )
+
+    def test_fingerprint_groups_in_lists(self):
+        """Test IN lists of any length share a fingerprint"""
+        self.assertEqual(
+            fingerprint("SELECT id FROM users WHERE id IN (%s, %s, %s)"),
+            fingerprint("SELECT id FROM users WHERE id IN (%s)"),
+        )
+        self.assertNotEqual(
+            fingerprint("SELECT id FROM users WHERE id IN (%s)"),
+            fingerprint("SELECT id FROM users WHERE name IN (%s)"),
+        )
+
+    def test_fingerprint_matches_pg_stat_statements_text(self):
+        """Test composed SQL and pg_stat_statements query text share a fingerprint"""
+        composer = SqlComposer(PgSqlTranslator(), self.table)
+        criteria = SqlQueryCriteria(where=WhereClause([Where("id", PgFilterOp.IN, [1, 2, 3])]), page=Page(limit=10))
+        sql, _ = composer.select_with_params([self.table.id], query_criteria=criteria)
+
+        self.assertEqual(fingerprint(sql), fingerprint("SELECT id FROM users WHERE id IN ($1, $2) LIMIT $3"))
+
+    def test_one_value_in_lists_share_the_fingerprint(self):
+        """Test a composed IN with one value fingerprints like longer lists, simplified or not"""
+        for translator in (PgSqlTranslator(), PgSqlTranslator(simplify_predicates=True)):
+            composer = SqlComposer(translator, self.table)
+            fingerprints = set()
+            for values in ([1], [1, 1], [1, 2, 3]):
+                criteria = SqlQueryCriteria(where=WhereClause([Where("id", PgFilterOp.IN, values)]))
+                sql, _ = composer.select_with_params([self.table.id], query_criteria=criteria)
+                fingerprints.add(fingerprint(sql))
+            self.assertEqual(fingerprints, {fingerprint("SELECT id FROM users WHERE id IN ($1, $2)")})
+
+        not_in = fingerprint("SELECT id FROM users WHERE id NOT IN (%s, %s)")
+        self.assertEqual(fingerprint("SELECT id FROM users WHERE id != %s"), not_in)
+        self.assertEqual(fingerprint("SELECT id FROM users WHERE id <> 3"), not_in)
+        # Other comparisons and assignments keep their fingerprint
+        self.assertNotEqual(
+            fingerprint("SELECT id FROM users WHERE id >= %s"), fingerprint("SELECT id FROM users WHERE id > %s")
+        )
+        self.assertNotEqual(
+            fingerprint("UPDATE users SET name = %s WHERE id = %s"),
+            fingerprint("UPDATE users SET name IN (%s) WHERE id = %s"),
+        )
+        self.assertEqual(normalize_sql("SELECT id FROM users WHERE id = %s"), "select id from users where id = ?")
+
+    def test_criteria_shape(self):
+        """Test criteria shape lists fields and operators without values"""
+        criteria = SqlQueryCriteria(
+            where=WhereClause([Where("name", PgFilterOp.EQUAL, ["John"])]),
+            sort=[Sort("id", SortType.DESC)],
+            page=Page(limit=10),
+        )
+        self.assertEqual(criteria_shape(criteria), "where=[name:EQUAL];sort=[id:DESC];page=[limit]")
+
+    def test_join_pg_stat_statements(self):
+        """Test joining recorded fingerprints with canned pg_stat_statements rows"""
+        registry = FingerprintRegistry()
+        composer = SqlComposer(PgSqlTranslator(), self.table, observer=registry)
+        criteria = SqlQueryCriteria(where=WhereClause([Where("name", PgFilterOp.EQUAL, ["John"])]))
+        composer.select_with_params(self.table.columns, query_criteria=criteria)
+        composer.delete()
+
+        rows = [
+            stat_row("DELETE FROM users", 5.0),
+            stat_row("SELECT id, name FROM users WHERE name = $1", 900.0),
+            stat_row("SELECT 1", 1.0),
+        ]
+        matches = join_pg_stat_statements(registry, rows)
+
+        self.assertEqual([m.entry.kind for m in matches], ["select", "delete"])
+        select_entry = matches[0].entry
+        self.assertEqual(matches[0].stat.calls, 100)
+        self.assertEqual(select_entry.criteria_shapes, {"where=[name:EQUAL]": 1})
+        call_site = next(iter(select_entry.call_sites))
+        self.assertTrue(call_site.filename.endswith("pg_fingerprint_test.py"))
+        self.assertEqual(call_site.function, "test_join_pg_stat_statements")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import unittest
+from typing import Any, List, Sequence
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import Condition, SqlQueryCriteria, Where, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_executor import PgExecutor, copy_field
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_in_list import InListStrategy, PgInListFilter
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+
+
+class MemberTable(Table):
+    id = Column("id", PgDataTypes.BIGINT)
+    cohort = Column("cohort", PgDataTypes.CHAR)
+    active = Column("active", PgDataTypes.BOOLEAN)
+
+
+class FakeCursor:
+    def __init__(self, connection: "FakeConnection"):
+        self.connection = connection
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql: str, params: Sequence[Any] | None = None):
+        if self.connection.aborted:
+            raise RuntimeError("current transaction is aborted")
+        if self.connection.fail_on and self.connection.fail_on in sql:
+            self.connection.aborted = True
+            raise RuntimeError("statement failed")
+        self.connection.statements.append((sql, params))
+
+    def copy_expert(self, sql: str, file: Any):
+        # Read in small chunks like a driver streaming the input
+        data = "".join(iter(lambda: file.read(7), ""))
+        self.connection.copies.append((sql, data))
+        self.rowcount = data.count("\n")
+
+    def fetchall(self) -> List[tuple]:
+        return [(1,)]
+
+
+class FakeConnection:
+    def __init__(self, fail_on: str | None = None):
+        self.statements: List[tuple] = []
+        self.copies: List[tuple] = []
+        self.fail_on = fail_on
+        # Like PostgreSQL, a failed statement rejects every other one until the rollback
+        self.aborted = False
+        self.rollbacks = 0
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self.aborted = False
+        self.rollbacks += 1
+
+
+class RecordingExecutor(SqlExecutor):
+    def __init__(self):
+        self.statements: List[tuple] = []
+
+    def fetch_all(self, sql: str, params=None) -> List[tuple]:
+        self.statements.append((sql, params))
+        return []
+
+    def execute(self, sql: str, params=None) -> int:
+        self.statements.append((sql, params))
+        return 0
+
+
+class TestCopyRows(unittest.TestCase):
+    def test_copy_rows_streams_text_format(self):
+        """Test rows are COPYed in text format with NULLs, booleans and special characters escaped"""
+        self.assertEqual([copy_field(v) for v in (None, True, 12, "a\tb\\c\nd")], ["\\N", "t", "12", "a\\tb\\\\c\\nd"])
+
+        connection = FakeConnection()
+        count = PgExecutor(connection).copy_rows("t", ["a", "b"], ([i, f"v{i}"] for i in range(3)))
+        self.assertEqual(count, 3)
+        self.assertEqual(connection.copies, [("COPY t (a, b) FROM STDIN", "0\tv0\n1\tv1\n2\tv2\n")])
+
+
+class TestInListFilter(unittest.TestCase):
+    def setUp(self):
+        self.members = MemberTable("members")
+        self.composer = SqlComposer(PgSqlTranslator(), self.members)
+        self.conditions: List[Condition] = [
+            Where("active", PgFilterOp.EQUAL, [True]),
+            Where("id", PgFilterOp.IN, [3, 1, 2, 3, None]),
+        ]
+        self.criteria = SqlQueryCriteria(where=WhereClause(self.conditions))
+
+    def test_small_lists_are_unchanged(self):
+        """Test IN lists up to the threshold render as plain IN"""
+        in_list = PgInListFilter(self.composer, RecordingExecutor(), threshold=5, strategy=InListStrategy.UNNEST)
+        self.assertEqual(
+            in_list.select_with_params([self.members.id], self.criteria),
+            self.composer.select_with_params([self.members.id], query_criteria=self.criteria),
+        )
+
+    def test_unnest(self):
+        """Test a large IN list is bound as one distinct, typed array in an unnest() semi-join"""
+        executor = RecordingExecutor()
+        in_list = PgInListFilter(self.composer, executor, threshold=2, strategy=InListStrategy.UNNEST)
+        in_list.select([self.members.id], self.criteria)
+        [(sql, params)] = executor.statements
+        self.assertIn("WHERE active = %s\nAND id IN (SELECT unnest(%s::bigint[]))", sql)
+        self.assertEqual(params, [True, [3, 1, 2]])
+
+        # Literal SQL inlines the array
+        sql, _ = self.composer.translator.render(in_list._build_select([self.members.id], self.criteria, None, []))
+        self.assertIn("id IN (SELECT unnest(ARRAY[3, 1, 2]::bigint[]))", sql)
+
+    def test_temp_table(self):
+        """Test a large IN list is COPYed into an analyzed temp table, joined and dropped afterwards"""
+        connection = FakeConnection()
+        in_list = PgInListFilter(self.composer, PgExecutor(connection), threshold=2)
+        criteria = SqlQueryCriteria(where=WhereClause([Where("cohort", PgFilterOp.IN, ["a", "b", "a"])]))
+        self.assertEqual(in_list.select([self.members.id], criteria), [(1,)])
+
+        [(copy_sql, data)] = connection.copies
+        table = copy_sql.split()[1]
+        self.assertEqual(data, "a\nb\n")
+        statements = [sql for sql, _ in connection.statements]
+        self.assertEqual(statements[0], f"CREATE TEMP TABLE {table} (value bpchar)")
+        self.assertEqual(statements[1], f"ANALYZE {table}")
+        self.assertIn(f"WHERE cohort IN (\nSELECT\n    value\nFROM {table}\n)", statements[2])
+        self.assertEqual(statements[3], f"DROP TABLE IF EXISTS {table}")
+
+    def test_temp_table_dropped_on_failure(self):
+        """Test the temp table is dropped when the SELECT fails, and never created when no row can match"""
+        connection = FakeConnection(fail_on="SELECT")
+        in_list = PgInListFilter(self.composer, PgExecutor(connection), threshold=2)
+        with self.assertRaisesRegex(RuntimeError, "statement failed"):
+            in_list.select([self.members.id], self.criteria)
+        self.assertEqual(connection.rollbacks, 1)
+        self.assertTrue(connection.statements[-1][0].startswith("DROP TABLE IF EXISTS sc_in_"))
+
+        # Without autocommit the caller's rollback drops the table, and the SELECT's error is raised
+        connection = FakeConnection(fail_on="SELECT")
+        in_list = PgInListFilter(self.composer, PgExecutor(connection, autocommit=False), threshold=2)
+        with self.assertRaisesRegex(RuntimeError, "statement failed"):
+            in_list.select([self.members.id], self.criteria)
+        self.assertEqual(connection.rollbacks, 0)
+        self.assertTrue(connection.statements[-1][0].startswith("ANALYZE sc_in_"))
+
+        connection = FakeConnection()
+        composer = SqlComposer(PgSqlTranslator(simplify_predicates=True), self.members)
+        in_list = PgInListFilter(composer, PgExecutor(connection), threshold=2)
+        never = SqlQueryCriteria(where=WhereClause(self.conditions + [Where("id", PgFilterOp.IN, [])]))
+        self.assertEqual(in_list.select([self.members.id], never), [])
+        self.assertEqual(connection.statements, [])
+
+    def test_validation(self):
+        """Test the temp table strategy needs a PgExecutor and large IN fields must be table columns"""
+        with self.assertRaises(ValueError):
+            PgInListFilter(self.composer, RecordingExecutor())
+        in_list = PgInListFilter(self.composer, RecordingExecutor(), threshold=1, strategy=InListStrategy.UNNEST)
+        with self.assertRaises(ValueError):
+            in_list.select_with_params(
+                [self.members.id], SqlQueryCriteria(where=WhereClause([Where("missing", PgFilterOp.IN, [1, 2])]))
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
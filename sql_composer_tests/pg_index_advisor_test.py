@@ -0,0 +1,167 @@
+import unittest
+import warnings
+from typing import List
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import OrGroup, Page, Sort, SortType, SqlQueryCriteria, Where, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_index_advisor import AdvisorMode, PgIndexAdvisor, QueryAdviceError, QueryAdviceWarning
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_placeholders import Params
+
+
+class UserTable(Table):
+    id = Column("id", PgDataTypes.INT)
+    email = Column("email", PgDataTypes.TEXT)
+    full_name = Column("full_name", PgDataTypes.TEXT)
+    tags = Column("tags", PgDataTypes.JSONB)
+    created_at = Column("created_at", PgDataTypes.TIMESTAMPTZ)
+
+
+def index_row(name: str, columns: List[str], access_method: str = "btree", opclasses=None, **kwargs) -> dict:
+    """Canned pg_indexes/pg_index row"""
+    return {
+        "schemaname": "public",
+        "tablename": "users",
+        "indexname": name,
+        "indexdef": f"CREATE INDEX {name} ON public.users USING {access_method} ({', '.join(columns)})",
+        "access_method": access_method,
+        "columns": columns,
+        "opclasses": opclasses or [],
+        **kwargs,
+    }
+
+
+INDEX_ROWS = [
+    index_row("users_pkey", ["id"], is_unique=True, is_primary=True),
+    index_row("users_email_created_at_idx", ["email", "created_at"]),
+    index_row("users_full_name_trgm_idx", ["full_name"], "gin", ["gin_trgm_ops"]),
+    index_row("users_created_at_idx", ["created_at"], is_valid=False),
+]
+
+
+class FakeExecutor(SqlExecutor):
+    def __init__(self, rows: List[tuple]):
+        self.rows = rows
+        self.params: Params | None = None
+
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        self.params = params
+        return self.rows
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        raise NotImplementedError
+
+
+class TestPgIndexAdvisor(unittest.TestCase):
+    def setUp(self):
+        self.table = UserTable("users")
+        self.advisor = PgIndexAdvisor(INDEX_ROWS)
+
+    def kinds(self, query_criteria: SqlQueryCriteria) -> List[tuple]:
+        return [(a.kind, a.field) for a in self.advisor.advise(self.table, query_criteria)]
+
+    def test_indexed_criteria(self):
+        """Test criteria served by indexes get no advice"""
+        criteria = SqlQueryCriteria(
+            where=WhereClause(
+                [
+                    Where("email", PgFilterOp.EQUAL, ["a@example.com"]),
+                    Where("full_name", PgFilterOp.ILIKE, ["%jane%"]),
+                    Where("id", PgFilterOp.NOT_EQUAL, [3]),
+                ]
+            ),
+            sort=[Sort("id", SortType.ASC)],
+            page=Page(limit=10, offset=100),
+        )
+        self.assertEqual(self.kinds(criteria), [])
+
+    def test_unindexed_criteria(self):
+        """Test unindexed filters and sorts, non-leading and invalid index columns, GIN operators"""
+        criteria = SqlQueryCriteria(
+            where=WhereClause(
+                [
+                    OrGroup(
+                        [
+                            Where("created_at", PgFilterOp.GREATER_THAN, ["2024-01-01"]),
+                            Where("tags", PgFilterOp.JSON_HAS_KEY, ["vip"]),
+                        ]
+                    ),
+                    Where("email", PgFilterOp.LIKE, ["%@example.com"]),
+                ]
+            ),
+            sort=[Sort("created_at", SortType.DESC)],
+            page=Page(limit=10, offset=5000),
+        )
+        self.assertEqual(
+            self.kinds(criteria),
+            [
+                ("unindexed_filter", "created_at"),
+                ("unindexed_filter", "tags"),
+                ("leading_wildcard", "email"),
+                ("unindexed_sort", "created_at"),
+                ("large_offset", ""),
+            ],
+        )
+
+    def test_anchored_patterns(self):
+        """Test an anchored pattern needs a text_pattern_ops btree, a default opclass or plain GIN doesn't serve it"""
+        criteria = SqlQueryCriteria(where=WhereClause([Where("email", PgFilterOp.LIKE, ["jane%"])]))
+        self.assertEqual(self.kinds(criteria), [("unindexed_filter", "email")])
+
+        advisor = PgIndexAdvisor(
+            [
+                index_row("users_email_idx", ["email"], opclasses=["text_ops"]),
+                index_row("users_email_gin_idx", ["email"], "gin", ["btree_gin_ops"]),
+            ]
+        )
+        self.assertEqual([a.kind for a in advisor.advise(self.table, criteria)], ["unindexed_filter"])
+        advisor = PgIndexAdvisor([index_row("users_email_pattern_idx", ["email"], opclasses=["text_pattern_ops"])])
+        self.assertEqual(advisor.advise(self.table, criteria), [])
+
+    def test_unknown_and_joined_fields(self):
+        """Test fields the composer drops or resolves to a joined table get no advice for the base table"""
+        criteria = SqlQueryCriteria(
+            where=WhereClause(
+                [Where("missing", PgFilterOp.EQUAL, [1]), Where("o.total", PgFilterOp.GREATER_THAN, [9])]
+            ),
+            sort=[Sort("o.created_at", SortType.DESC), Sort("missing", SortType.ASC)],
+        )
+        self.assertEqual(self.kinds(criteria), [])
+        self.assertEqual(PgIndexAdvisor(INDEX_ROWS, tables=[self.table]).advise("users", criteria), [])
+        # Without the table's columns only the qualified fields are known not to be the table's
+        self.assertEqual(
+            [(a.kind, a.field) for a in self.advisor.advise("users", criteria)],
+            [("unindexed_filter", "missing"), ("unindexed_sort", "missing")],
+        )
+
+    def test_modes(self):
+        """Test warn mode warns and strict mode raises, both from composed statements"""
+        criteria = SqlQueryCriteria(where=WhereClause([Where("created_at", PgFilterOp.LESS_THAN, ["2024-01-01"])]))
+        composer = SqlComposer(PgSqlTranslator(), self.table, observer=self.advisor)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            composer.select_with_params([self.table.id], query_criteria=criteria)
+        self.assertEqual([w.category for w in caught], [QueryAdviceWarning])
+
+        composer.observer = PgIndexAdvisor(INDEX_ROWS, mode=AdvisorMode.STRICT)
+        with self.assertRaises(QueryAdviceError) as context:
+            composer.select_with_params([self.table.id], query_criteria=criteria)
+        self.assertEqual(context.exception.advice[0].field, "created_at")
+
+    def test_load(self):
+        """Test loading the indexes of tables from catalog rows"""
+        row = ("public", "users", "users_pkey", "CREATE ...", "btree", ["id"], ["int4_ops"], True, True, True, None)
+        executor = FakeExecutor([row])
+
+        advisor = PgIndexAdvisor.load(executor, [self.table])
+
+        self.assertEqual(executor.params, [["users"]])
+        criteria = SqlQueryCriteria(where=WhereClause([Where("id", PgFilterOp.IN, [1, 2])]))
+        self.assertEqual(advisor.advise("users", criteria), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
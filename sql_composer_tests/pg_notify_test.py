@@ -0,0 +1,161 @@
+import queue
+import threading
+import time
+import unittest
+from typing import Any, Dict, List
+from sql_composer.db_models import Column, Table
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_notify import (
+    INVALIDATION_CHANNEL,
+    Notification,
+    NotificationBus,
+    PgCacheInvalidationListener,
+    PgCacheNotifier,
+)
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_cache import QueryCache
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_placeholders import NumberedPlaceholders, Params
+
+
+class ProductTable(Table):
+    id = Column("id", PgDataTypes.BIGINT)
+    price = Column("price", PgDataTypes.NUMERIC)
+
+
+class FakeHub:
+    """In-process stand-in for the PostgreSQL notification queue"""
+
+    def __init__(self):
+        self.buses: List["FakeBus"] = []
+        self.lock = threading.Lock()
+
+    def publish(self, channel: str, payload: str):
+        with self.lock:
+            for bus in self.buses:
+                if channel in bus.channels:
+                    bus.queue.put(Notification(channel, payload))
+
+
+class FakeBus(NotificationBus):
+    def __init__(self, hub: FakeHub):
+        self.hub = hub
+        self.channels: set = set()
+        self.queue: "queue.Queue[Notification]" = queue.Queue()
+        self.listens = 0
+        self.fail_next_poll = False
+
+    def listen(self, channel: str) -> None:
+        self.listens += 1
+        self.channels.add(channel)
+        with self.hub.lock:
+            if self not in self.hub.buses:
+                self.hub.buses.append(self)
+
+    def poll(self, timeout: float) -> List[Notification]:
+        if self.fail_next_poll:
+            self.fail_next_poll = False
+            raise ConnectionError("connection lost")
+        try:
+            notifications = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while not self.queue.empty():
+            notifications.append(self.queue.get_nowait())
+        return notifications
+
+    def close(self) -> None:
+        with self.hub.lock:
+            if self in self.hub.buses:
+                self.hub.buses.remove(self)
+
+
+class FakeExecutor(SqlExecutor):
+    """Applies writes to nothing and routes pg_notify to the hub"""
+
+    def __init__(self, hub: FakeHub):
+        self.hub = hub
+        self.statements: List[str] = []
+
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        self.statements.append(sql)
+        if sql.startswith("SELECT pg_notify("):
+            assert isinstance(params, list)
+            channel, tables = params
+            for table in tables:
+                self.hub.publish(channel, table)
+            return [("",) for _ in tables]
+        return [(1, 10)]
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        self.statements.append(sql)
+        return 1
+
+
+def wait_until(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+class TestCacheInvalidation(unittest.TestCase):
+    def setUp(self):
+        self.hub = FakeHub()
+        self.products = ProductTable("products")
+        self.workers: List[Dict[str, Any]] = []
+        for _ in range(3):
+            cache = QueryCache()
+            executor = FakeExecutor(self.hub)
+            listener = PgCacheInvalidationListener(cache, FakeBus(self.hub), poll_timeout=0.01, retry_interval=0.01)
+            listener.start()
+            self.addCleanup(listener.stop)
+            composer = SqlComposer(PgSqlTranslator(), self.products, executor=executor, cache=cache)
+            self.workers.append({"cache": cache, "composer": composer, "listener": listener, "executor": executor})
+
+    def test_write_evicts_every_worker(self):
+        """Test a write in one worker evicts the table's cached reads in all workers"""
+        for worker in self.workers:
+            worker["composer"].fetch(self.products.columns)
+            worker["cache"].put("SELECT 1", None, [(1,)], ["other"])
+
+        writer = self.workers[0]
+        notifier = PgCacheNotifier(writer["executor"])
+        sql, params = writer["composer"].update_with_params({"price": 12})
+        self.assertEqual(notifier.execute(sql, params, [self.products.name]), 1)
+        self.assertEqual(writer["executor"].statements[-1], "SELECT pg_notify(%s, t) FROM unnest(%s::text[]) AS t")
+
+        for worker in self.workers:
+            self.assertTrue(wait_until(lambda worker=worker: worker["cache"].stats().entries == 1))
+            self.assertIsNotNone(worker["cache"].get("SELECT 1"))
+
+    def test_reconnect_clears_cache(self):
+        """Test a lost connection clears the cache, since notifications may have been missed"""
+        worker = self.workers[1]
+        bus = worker["listener"].bus
+        worker["cache"].put("SELECT 1", None, [(1,)], ["other"])
+        bus.fail_next_poll = True
+
+        self.assertTrue(wait_until(lambda: bus.listens == 2))
+        self.assertIsInstance(worker["listener"].last_error, ConnectionError)
+        self.assertEqual(worker["cache"].stats().entries, 0)
+
+    def test_notify_params(self):
+        """Test tables are deduplicated into one pg_notify round trip"""
+        notifier = PgCacheNotifier(FakeExecutor(self.hub), channel="custom")
+        self.assertEqual(
+            notifier.notify_with_params(["orders", "products", "orders"]),
+            ("SELECT pg_notify(%s, t) FROM unnest(%s::text[]) AS t", ["custom", ["orders", "products"]]),
+        )
+        notifier = PgCacheNotifier(FakeExecutor(self.hub), placeholders=NumberedPlaceholders())
+        self.assertEqual(
+            notifier.notify_with_params(["orders"])[0], "SELECT pg_notify($1, t) FROM unnest($2::text[]) AS t"
+        )
+        self.assertEqual(PgCacheNotifier(FakeExecutor(self.hub)).channel, INVALIDATION_CHANNEL)
+
+
+if __name__ == "__main__":
+    unittest.main()
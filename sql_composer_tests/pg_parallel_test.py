@@ -0,0 +1,112 @@
+import re
+import threading
+import unittest
+from typing import List
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import Page, Sort, SortType, SqlQueryCriteria
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_parallel import PgParallelScanner
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_placeholders import Params
+
+
+class EventTable(Table):
+    id = Column("id", PgDataTypes.BIGINT)
+    kind = Column("kind", PgDataTypes.TEXT)
+
+
+class FakeEventsExecutor(SqlExecutor):
+    """Answers pg_stats, MIN/MAX and key range SELECTs over in-memory rows"""
+
+    def __init__(self, rows: List[tuple], histogram: List[str] | None = None):
+        self.rows = rows
+        self.histogram = histogram
+        self.selects: List[tuple] = []
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        if "FROM pg_stats" in sql:
+            return [(self.histogram,)] if self.histogram else []
+        keys = [row[0] for row in self.rows if row[0] is not None]
+        if "MIN(id)" in sql:
+            return [(min(keys), max(keys))]
+
+        with self.lock:
+            self.selects.append((sql, params))
+            self.threads.add(threading.get_ident())
+        ranges = list(zip(re.findall(r"id (>=|<) %s", sql), params or [], strict=True))
+
+        def matches(key):
+            if key is None:
+                return "IS NULL" in sql
+            return all(key >= bound if op == ">=" else key < bound for op, bound in ranges)
+
+        rows = [row for row in self.rows if matches(row[0])]
+        if "ORDER BY id DESC" in sql:
+            rows = sorted(rows, key=lambda row: (row[0] is None, row[0] or 0), reverse=True)
+        return rows
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        raise NotImplementedError
+
+
+class TestParallelSelect(unittest.TestCase):
+    def setUp(self):
+        self.events = EventTable("events")
+        self.composer = SqlComposer(PgSqlTranslator(), self.events)
+        self.rows = [(i, "click") for i in range(1, 101)] + [(None, "orphan")]
+
+    def test_min_max_partitions(self):
+        """Test an even min/max split covers every row once, NULL keys included, across threads"""
+        executor = FakeEventsExecutor(self.rows)
+        scanner = PgParallelScanner(self.composer, executor, max_workers=4)
+        self.addCleanup(scanner.close)
+
+        self.assertEqual(scanner.partition_bounds(self.events.id, 4), [25, 50, 75])
+        rows = list(scanner.parallel_select(self.events.columns, partitions=4, key=self.events.id))
+        self.assertEqual(sorted(rows, key=lambda row: row[0] or 0), sorted(self.rows, key=lambda row: row[0] or 0))
+        self.assertEqual(len(executor.selects), 4)
+        self.assertIn("WHERE id >= %s\nAND id < %s", executor.selects[1][0])
+
+    def test_histogram_partitions_and_sort(self):
+        """Test histogram bounds are preferred and sorted criteria stream in order"""
+        histogram = [str(i) for i in range(0, 101, 10)]
+        executor = FakeEventsExecutor(self.rows, histogram)
+        scanner = PgParallelScanner(self.composer, executor)
+        self.addCleanup(scanner.close)
+
+        self.assertEqual(scanner.partition_bounds(self.events.id, 3), [30, 70])
+        criteria = SqlQueryCriteria(sort=[Sort("id", SortType.DESC)])
+        rows = list(scanner.parallel_select(self.events.columns, criteria, partitions=3, key=self.events.id))
+        self.assertEqual([row[0] for row in rows], [None] + list(range(100, 0, -1)))
+
+        # Text sort keys are sorted in the byte order the merge compares them in
+        criteria = SqlQueryCriteria(sort=[Sort("kind", SortType.ASC), Sort("id", SortType.DESC)])
+        list(scanner.parallel_select(self.events.columns, criteria, partitions=3, key=self.events.id))
+        self.assertIn('ORDER BY kind COLLATE "C" ASC, id DESC', executor.selects[-1][0])
+
+    def test_histogram_order_is_kept(self):
+        """Test text bounds keep the server's collation order and repeated bounds of skewed keys are dropped"""
+        scanner = PgParallelScanner(self.composer, FakeEventsExecutor(self.rows, ["a", "B", "c", "D", "e"]))
+        self.addCleanup(scanner.close)
+        self.assertEqual(scanner.partition_bounds(self.events.kind, 4), ["B", "c", "D"])
+
+        scanner.executor = FakeEventsExecutor(self.rows, ["a", "a", "a", "b", "c"])
+        self.assertEqual(scanner.partition_bounds(self.events.kind, 4), ["a", "b"])
+
+    def test_invalid_arguments(self):
+        """Test the key must be a column of the table and the criteria must not be paged"""
+        scanner = PgParallelScanner(self.composer, FakeEventsExecutor(self.rows))
+        self.addCleanup(scanner.close)
+        with self.assertRaises(ValueError):
+            scanner.parallel_select(self.events.columns, key=Column("id", PgDataTypes.TEXT))
+        with self.assertRaises(ValueError):
+            scanner.parallel_select(self.events.columns, SqlQueryCriteria(page=Page(limit=10)), key=self.events.id)
+        self.assertEqual(scanner.partition_bounds(self.events.kind, 1), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
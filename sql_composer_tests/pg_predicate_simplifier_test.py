@@ -0,0 +1,100 @@
+import unittest
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import Where, WhereClause, SqlQueryCriteria
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_predicate_simplifier import simplify_predicate
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_ir import ComparisonNode, OrNode, Param, is_always_false, predicate_from_where_clause
+
+
+class MockTable(Table):
+    id = Column("id", PgDataTypes.INT)
+    status = Column("status", PgDataTypes.TEXT)
+    age = Column("age", PgDataTypes.INT)
+
+
+class TestPgPredicateSimplifier(unittest.TestCase):
+    def setUp(self):
+        self.table = MockTable("users")
+        self.composer = SqlComposer(PgSqlTranslator(simplify_predicates=True), self.table)
+
+    def simplify(self, *conditions: Where):
+        return simplify_predicate(predicate_from_where_clause(WhereClause(list(conditions)), self.table))
+
+    def test_dedupe_and_sort_in_values(self):
+        """Test duplicate conditions are removed and IN values are deduplicated and sorted"""
+        node = self.simplify(
+            Where("id", PgFilterOp.IN, [3, 1, 3, 2]),
+            Where("id", PgFilterOp.IN, [3, 1, 3, 2]),
+        )
+        self.assertEqual(node, ComparisonNode("id", PgFilterOp.IN, [Param(v, self.table.id) for v in (1, 2, 3)]))
+
+    def test_intersect_equalities(self):
+        """Test EQUAL and IN on one field are intersected under AND"""
+        node = self.simplify(Where("id", PgFilterOp.IN, [1, 2, 3]), Where("id", PgFilterOp.EQUAL, [2]))
+        self.assertEqual(node, ComparisonNode("id", PgFilterOp.EQUAL, [Param(2, self.table.id)]))
+
+    def test_merge_equalities_under_or(self):
+        """Test EQUALs on one field are merged into IN under OR"""
+        where = OrNode(
+            [
+                ComparisonNode("status", PgFilterOp.EQUAL, [Param("b", self.table.status)]),
+                ComparisonNode("status", PgFilterOp.EQUAL, [Param("a", self.table.status)]),
+            ]
+        )
+        node = simplify_predicate(where)
+        params = [Param("a", self.table.status), Param("b", self.table.status)]
+        self.assertEqual(node, ComparisonNode("status", PgFilterOp.IN, params))
+
+    def test_intersect_between_ranges(self):
+        """Test overlapping BETWEEN ranges are narrowed"""
+        node = self.simplify(Where("age", PgFilterOp.BETWEEN, [10, 50]), Where("age", PgFilterOp.BETWEEN, [30, 80]))
+        params = [Param(30, self.table.age), Param(50, self.table.age)]
+        self.assertEqual(node, ComparisonNode("age", PgFilterOp.BETWEEN, params))
+
+    def test_never_matches(self):
+        """Test conditions that can never match collapse to always false"""
+        self.assertTrue(is_always_false(self.simplify(Where("id", PgFilterOp.IN, []))))
+        self.assertTrue(
+            is_always_false(self.simplify(Where("id", PgFilterOp.EQUAL, [1]), Where("id", PgFilterOp.EQUAL, [2])))
+        )
+        self.assertTrue(
+            is_always_false(
+                self.simplify(Where("age", PgFilterOp.BETWEEN, [10, 20]), Where("age", PgFilterOp.BETWEEN, [30, 40]))
+            )
+        )
+        self.assertIsNone(self.simplify(Where("id", PgFilterOp.NOT_IN, [])))
+
+    def test_composer_short_circuit(self):
+        """Test the composer reports and renders criteria that can never match"""
+        criteria = SqlQueryCriteria(
+            where=WhereClause([Where("status", PgFilterOp.EQUAL, ["a"]), Where("status", PgFilterOp.IN, ["b", "c"])])
+        )
+        self.assertTrue(self.composer.never_matches(criteria))
+
+        sql, params = self.composer.select_with_params(self.table.columns, query_criteria=criteria)
+        self.assertIn("WHERE FALSE", sql)
+        self.assertEqual(params, [])
+
+    def test_composer_canonical_shape(self):
+        """Test redundant UI filters render to one canonical condition"""
+        criteria = SqlQueryCriteria(
+            where=WhereClause(
+                [
+                    Where("status", PgFilterOp.IN, ["b", "a", "b"]),
+                    Where("age", PgFilterOp.GREATER_THAN, [18]),
+                    Where("age", PgFilterOp.GREATER_THAN, [18]),
+                ]
+            )
+        )
+        self.assertFalse(self.composer.never_matches(criteria))
+
+        sql, params = self.composer.select_with_params(self.table.columns, query_criteria=criteria)
+        self.assertIn("WHERE status IN (%s, %s)\nAND age > %s\n", sql)
+        self.assertEqual(params, ["a", "b", 18])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from typing import Any, List, Sequence
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import SqlQueryCriteria, Where, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_prepared import PgPreparedExecutor, statement_name, to_numbered_params
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+
+
+class SessionTable(Table):
+    id = Column("id", PgDataTypes.BIGINT)
+    token = Column("token", PgDataTypes.TEXT)
+
+
+class FakeCursor:
+    def __init__(self, connection: "FakeConnection"):
+        self.connection = connection
+        self.rowcount = 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql: str, params: Sequence[Any] | None = None):
+        self.connection.statements.append((sql, params))
+
+    def fetchall(self) -> List[tuple]:
+        return [(1, "abc")]
+
+
+class FakeConnection:
+    def __init__(self):
+        self.statements: List[tuple] = []
+        self.commits = 0
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+class TestNumberedParams(unittest.TestCase):
+    def test_to_numbered_params(self):
+        """Test placeholders are numbered outside literals, identifiers and comments"""
+        sql = "SELECT '%s', \"a%s\" /* %s */ FROM t WHERE a = %s AND b LIKE 'x%%' || %s AND c % 2 = 0 -- %s\n"
+        self.assertEqual(
+            to_numbered_params(sql),
+            ("SELECT '%s', \"a%s\" /* %s */ FROM t WHERE a = $1 AND b LIKE 'x%%' || $2 AND c % 2 = 0 -- %s\n", 2),
+        )
+        self.assertEqual(to_numbered_params("SELECT 10 %% 3"), ("SELECT 10 % 3", 0))
+        with self.assertRaises(ValueError):
+            to_numbered_params("SELECT %(id)s")
+
+
+class TestPreparedExecutor(unittest.TestCase):
+    def setUp(self):
+        self.sessions = SessionTable("sessions")
+        self.composer = SqlComposer(PgSqlTranslator(), self.sessions)
+        self.connection = FakeConnection()
+
+    def select(self, op):
+        criteria = SqlQueryCriteria(where=WhereClause([Where("token", op, ["abc"])]))
+        return self.composer.select_with_params(self.sessions.columns, query_criteria=criteria)
+
+    def test_prepare_once_then_execute(self):
+        """Test a statement is prepared on first use and executed by name afterwards"""
+        executor = PgPreparedExecutor(self.connection)
+        sql, params = self.select(PgFilterOp.EQUAL)
+        name = statement_name(sql)
+
+        self.assertEqual(executor.fetch_all(sql, params), [(1, "abc")])
+        self.assertEqual(executor.fetch_all(sql, ["def"]), [(1, "abc")])
+        self.assertEqual(
+            self.connection.statements,
+            [
+                (f"PREPARE {name} AS \nSELECT\n    id, token\nFROM sessions\nWHERE token = $1\n", None),
+                (f"EXECUTE {name}(%s)", ["abc"]),
+                (f"EXECUTE {name}(%s)", ["def"]),
+            ],
+        )
+        self.assertEqual(self.connection.commits, 2)
+
+        insert_sql, insert_params = self.composer.insert_with_params({"id": 2, "token": "x"})
+        self.assertEqual(executor.execute(insert_sql, insert_params), 1)
+        self.assertEqual(self.connection.statements[-1], (f"EXECUTE {statement_name(insert_sql)}(%s, %s)", [2, "x"]))
+
+        explain_sql, explain_params = self.composer.explain_with_params(self.sessions.columns)
+        executor.fetch_all(explain_sql, explain_params)
+        self.assertEqual(self.connection.statements[-1], (explain_sql, explain_params))
+
+    def test_lru_deallocate(self):
+        """Test the least recently used statement is deallocated beyond max_prepared"""
+        executor = PgPreparedExecutor(self.connection, max_prepared=2)
+        equal, like, ilike = self.select(PgFilterOp.EQUAL), self.select(PgFilterOp.LIKE), self.select(PgFilterOp.ILIKE)
+
+        executor.fetch_all(*equal)
+        executor.fetch_all(*like)
+        executor.fetch_all(*equal)
+        executor.fetch_all(*ilike)
+
+        self.assertIn((f"DEALLOCATE {statement_name(like[0])}", None), self.connection.statements)
+        self.assertEqual(executor.prepared, [statement_name(equal[0]), statement_name(ilike[0])])
+
+        executor.reset()
+        executor.fetch_all(*equal)
+        self.assertTrue(self.connection.statements[-2][0].startswith(f"PREPARE {statement_name(equal[0])}"))
+
+        with self.assertRaises(ValueError):
+            executor.fetch_all(equal[0], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
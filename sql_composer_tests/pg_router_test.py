@@ -0,0 +1,123 @@
+import random
+import unittest
+from collections import Counter
+from typing import List
+from sql_composer.db_models import Column, Table
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_router import (
+    CURRENT_LSN_SQL,
+    REPLAY_LSN_SQL,
+    PgReplicaRouter,
+    Replica,
+    is_read,
+    parse_lsn,
+)
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_placeholders import Params
+
+
+class AccountTable(Table):
+    id = Column("id", PgDataTypes.BIGINT)
+    balance = Column("balance", PgDataTypes.NUMERIC)
+
+
+def format_lsn(lsn: int) -> str:
+    return f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}"
+
+
+class FakeNode(SqlExecutor):
+    """
+    A node of a fake cluster. The primary advances its WAL position on every write,
+    a replica replays up to wherever `replay()` moves it. Reads return the node's name.
+    """
+
+    def __init__(self, name: str, primary: "FakeNode | None" = None):
+        self.name = name
+        self.primary = primary
+        self.lsn = 0x1_0000_0000
+        self.statements: List[str] = []
+
+    def replay(self):
+        assert self.primary is not None, "Only replicas replay"
+        self.lsn = self.primary.lsn
+
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        if sql == CURRENT_LSN_SQL:
+            return [(format_lsn(self.lsn),)]
+        if sql == REPLAY_LSN_SQL:
+            return [(None if self.primary is None else format_lsn(self.lsn),)]
+        self.execute(sql, params)
+        return [(self.name,)]
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        if not is_read(sql):
+            if self.primary is not None:
+                raise ValueError("cannot execute a write in a read-only transaction")
+            self.lsn += 0x100
+        self.statements.append(sql)
+        return 1
+
+
+class TestReplicaRouter(unittest.TestCase):
+    def setUp(self):
+        self.primary = FakeNode("primary")
+        self.replica_a = FakeNode("a", self.primary)
+        self.replica_b = FakeNode("b", self.primary)
+        self.router = PgReplicaRouter(
+            self.primary,
+            [Replica(self.replica_a, weight=3, name="a"), Replica(self.replica_b, weight=1, name="b")],
+            rand=random.Random(7),
+        )
+        self.accounts = AccountTable("accounts")
+        self.composer = SqlComposer(PgSqlTranslator(), self.accounts)
+
+    def test_is_read(self):
+        """Test reads are told apart from writes and locking reads"""
+        self.assertTrue(is_read(self.composer.select_with_params(self.accounts.columns)[0]))
+        self.assertTrue(is_read("/* report */ explain SELECT 1"))
+        self.assertFalse(is_read(self.composer.insert_with_params({"id": 1})[0]))
+        self.assertFalse(is_read("SELECT * FROM accounts FOR UPDATE"))
+        self.assertFalse(is_read("SELECT pg_notify('c', 'accounts')"))
+        self.assertEqual(parse_lsn("16/B374D848"), 0x16_B374_D848)
+        with self.assertRaises(ValueError):
+            parse_lsn("B374D848")
+
+    def test_weighted_routing(self):
+        """Test reads are spread by weight and writes go to the primary"""
+        select_sql, params = self.composer.select_with_params(self.accounts.columns)
+        served = Counter(self.router.fetch_all(select_sql, params)[0][0] for _ in range(2000))
+        self.assertEqual(set(served), {"a", "b"})
+        self.assertAlmostEqual(served["a"] / 2000, 0.75, delta=0.05)
+
+        update_sql, params = self.composer.update_with_params({"balance": 0})
+        self.assertEqual(self.router.execute(update_sql, params), 1)
+        self.assertEqual(self.primary.statements, [update_sql])
+
+        self.router.replicas[0].weight = 0
+        self.assertEqual(self.router.fetch_all(select_sql, params), [("b",)])
+
+    def test_read_your_writes(self):
+        """Test a session reads from the primary until a replica has replayed its write"""
+        select_sql, _ = self.composer.select_with_params(self.accounts.columns)
+        session = self.router.session()
+        self.assertEqual(session.fetch_all(select_sql)[0][0] in ("a", "b"), True)
+        self.assertIsNone(session.lsn)
+
+        insert_sql, params = self.composer.insert_with_params({"id": 1, "balance": 10}, returning=[self.accounts.id])
+        self.assertEqual(session.fetch_all(insert_sql, params), [("primary",)])
+        self.assertEqual(session.lsn, "1/100")
+
+        self.assertEqual(session.fetch_all(select_sql), [("primary",)])
+        self.replica_b.replay()
+        self.assertEqual({session.fetch_all(select_sql)[0][0] for _ in range(20)}, {"b"})
+
+        # Other sessions never wrote, and a session restored from its LSN keeps waiting for it
+        self.assertEqual({self.router.session().fetch_all(select_sql)[0][0] for _ in range(50)}, {"a", "b"})
+        restored = self.router.session(session.lsn)
+        self.assertEqual({restored.fetch_all(select_sql)[0][0] for _ in range(20)}, {"b"})
+
+
+if __name__ == "__main__":
+    unittest.main()
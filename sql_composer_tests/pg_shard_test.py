@@ -0,0 +1,152 @@
+import unittest
+from typing import List
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import OrGroup, Page, Sort, SortType, SqlQueryCriteria, Where, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_shard import PgShardedComposer, ShardMap, merge_sorted
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_placeholders import Params
+
+
+class OrderTable(Table):
+    shard_key = "customer_id"
+    id = Column("id", PgDataTypes.BIGINT)
+    customer_id = Column("customer_id", PgDataTypes.BIGINT)
+    total = Column("total", PgDataTypes.NUMERIC)
+
+
+class CustomerTable(Table):
+    shard_key = "id"
+    id = Column("id", PgDataTypes.BIGINT)
+    full_name = Column("full_name", PgDataTypes.TEXT)
+
+
+class FakeShard(SqlExecutor):
+    """Returns its canned rows and records the statements it receives"""
+
+    def __init__(self, rows: List[tuple] | None = None):
+        self.rows = rows or []
+        self.calls: List[tuple] = []
+
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        self.calls.append((sql, params))
+        return self.rows
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        self.calls.append((sql, params))
+        return 1
+
+
+class TestShardedComposer(unittest.TestCase):
+    def setUp(self):
+        self.orders = OrderTable("orders")
+        self.shards = [FakeShard(), FakeShard(), FakeShard()]
+        self.shard_map = ShardMap(self.shards)
+        self.sharded = PgShardedComposer(SqlComposer(PgSqlTranslator(), self.orders), self.shard_map)
+        self.addCleanup(self.sharded.close)
+
+    def wheres(self, criteria: SqlQueryCriteria | None) -> List[Where]:
+        """The conditions of routed criteria, which are all plain Wheres in these tests"""
+        assert criteria is not None and criteria.where is not None
+        wheres = [c for c in criteria.where.conditions if isinstance(c, Where)]
+        self.assertEqual(len(wheres), len(criteria.where.conditions))
+        return wheres
+
+    def test_shard_key_required(self):
+        """Test a table without a shard key is rejected"""
+
+        class PlainTable(Table):
+            id = Column("id", PgDataTypes.BIGINT)
+
+        with self.assertRaises(ValueError):
+            PgShardedComposer(SqlComposer(PgSqlTranslator(), PlainTable("plain")), self.shard_map)
+        self.assertEqual(len(self.orders.columns), 3)
+
+    def test_pinned_criteria_are_routed(self):
+        """Test EQUAL and IN on the shard key only reach the owning shards, with their own values"""
+        customers = list(range(1, 31))
+        criteria = SqlQueryCriteria(
+            where=WhereClause(
+                [Where("customer_id", PgFilterOp.IN, customers), Where("total", PgFilterOp.GREATER_THAN, [5])]
+            )
+        )
+        routed = self.sharded.route(criteria)
+        self.assertEqual(set(routed), {0, 1, 2})
+        for shard, shard_criteria in routed.items():
+            total, customer = self.wheres(shard_criteria)
+            self.assertEqual(total, Where("total", PgFilterOp.GREATER_THAN, [5]))
+            self.assertTrue(all(self.shard_map.shard_for(value) == shard for value in customer.values))
+        self.assertEqual(sorted(v for c in routed.values() for v in self.wheres(c)[1].values), customers)
+
+        pinned = SqlQueryCriteria(where=WhereClause([Where("customer_id", PgFilterOp.EQUAL, [7])]))
+        self.assertEqual(list(self.sharded.route(pinned)), [self.shard_map.shard_for(7)])
+
+        disjoint = SqlQueryCriteria(
+            where=WhereClause([Where("customer_id", PgFilterOp.EQUAL, [7]), Where("customer_id", PgFilterOp.IN, [8])])
+        )
+        self.assertEqual(self.sharded.route(disjoint), {})
+        self.assertEqual(self.sharded.select(self.orders.columns, disjoint), [])
+
+        unpinned = SqlQueryCriteria(
+            where=WhereClause(
+                [OrGroup([Where("customer_id", PgFilterOp.EQUAL, [7]), Where("id", PgFilterOp.EQUAL, [1])])]
+            )
+        )
+        self.assertEqual(set(self.sharded.route(unpinned)), {0, 1, 2})
+
+    def test_scatter_gather_merge(self):
+        """Test scattered results are heap-merged by the sort and paged after the merge"""
+        # Each shard returns rows sorted by total DESC NULLS FIRST, then id ASC
+        self.shards[0].rows = [(4, 1, None), (1, 1, 30), (7, 1, 10)]
+        self.shards[1].rows = [(2, 2, 25), (3, 2, 10)]
+        self.shards[2].rows = [(6, 3, 40), (5, 3, 10)]
+        criteria = SqlQueryCriteria(
+            sort=[Sort("total", SortType.DESC), Sort("id", SortType.ASC)], page=Page(limit=4, offset=2)
+        )
+
+        rows = self.sharded.select(self.orders.columns, criteria)
+        self.assertEqual([row[0] for row in rows], [1, 2, 3, 5])
+        for shard in self.shards:
+            sql, _ = shard.calls[0]
+            self.assertIn("ORDER BY total DESC, id ASC", sql)
+            self.assertNotIn("OFFSET", sql)
+            self.assertIn("LIMIT 6", sql)
+
+        unsorted = self.sharded.select(self.orders.columns)
+        self.assertEqual(len(unsorted), 7)
+
+        with self.assertRaises(ValueError):
+            self.sharded.select([self.orders.id], SqlQueryCriteria(sort=[Sort("total", SortType.ASC)]))
+
+    def test_text_sort_keys_merge_in_byte_order(self):
+        """Test text sort keys are sorted COLLATE "C" on the shards, the order the merge compares them in"""
+        customers = CustomerTable("customers")
+        shards = [FakeShard([(1, "B"), (3, "a")]), FakeShard([(2, "C"), (4, "b")])]
+        sharded = PgShardedComposer(SqlComposer(PgSqlTranslator(), customers), ShardMap(shards))
+        self.addCleanup(sharded.close)
+
+        sorts = [Sort("full_name", SortType.ASC)]
+        criteria = SqlQueryCriteria(sort=sorts)
+        rows = sharded.select(customers.columns, criteria)
+        self.assertEqual([row[1] for row in rows], ["B", "C", "a", "b"])
+        for shard in shards:
+            self.assertIn('ORDER BY full_name COLLATE "C" ASC', shard.calls[0][0])
+
+        # Streams sorted by a linguistic collation ("a" < "B") would be interleaved out of order
+        with self.assertRaises(ValueError):
+            list(merge_sorted([[(3, "a"), (1, "B")], [(4, "b"), (2, "C")]], customers.columns, sorts))
+
+    def test_insert_routing(self):
+        """Test an insert goes to the shard owning its key"""
+        self.assertEqual(self.sharded.insert({"id": 1, "customer_id": 42, "total": 5}), 1)
+        shard = self.shards[self.shard_map.shard_for(42)]
+        self.assertEqual(len(shard.calls), 1)
+        with self.assertRaises(ValueError):
+            self.sharded.insert({"id": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
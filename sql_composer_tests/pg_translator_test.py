@@ -1,7 +1,17 @@
 import unittest
 from sql_composer.pg.pg_translator import PgSqlTranslator
 from sql_composer.db_models import Column, Table
-from sql_composer.db_conditions import Where, WhereClause, Sort, Page, SqlQueryCriteria, SortType
+from sql_composer.db_conditions import (
+    AndGroup,
+    Not,
+    OrGroup,
+    Where,
+    WhereClause,
+    Sort,
+    Page,
+    SqlQueryCriteria,
+    SortType,
+)
 from sql_composer.pg.pg_data_types import PgDataTypes
 from sql_composer.pg.pg_filter_op import PgFilterOp
 
@@ -243,6 +253,62 @@ class TestPgSqlTranslator(unittest.TestCase):
         self.assertIn("name = 'John'", result)
         self.assertNotIn("unknown_field", result)
 
+    def test_query_criteria_to_sql_boolean_groups(self):
+        """Test query_criteria_to_sql with nested AND/OR/NOT groups"""
+        where_clause = WhereClause(
+            [
+                Where("age", PgFilterOp.GREATER_THAN, [18]),
+                OrGroup(
+                    [
+                        Where("name", PgFilterOp.EQUAL, ["John"]),
+                        AndGroup(
+                            [
+                                Where("name", PgFilterOp.LIKE, ["J%"]),
+                                Not(Where("created_at", PgFilterOp.IS_NULL, [])),
+                            ]
+                        ),
+                    ]
+                ),
+            ]
+        )
+
+        query_criteria = SqlQueryCriteria(where=where_clause)
+        result = self.translator.query_criteria_to_sql(query_criteria, self.test_table)
+
+        self.assertEqual(
+            result, "\nWHERE age > 18\nAND (name = 'John' OR (name LIKE 'J%' AND NOT (created_at IS NULL)))"
+        )
+
+    def test_query_criteria_to_sql_with_params_boolean_groups(self):
+        """Test parameter order follows the rendered order of nested groups"""
+        where_clause = WhereClause(
+            [
+                OrGroup([Where("name", PgFilterOp.EQUAL, ["John"]), Where("name", PgFilterOp.EQUAL, ["Jane"])]),
+                Not(OrGroup([Where("age", PgFilterOp.BETWEEN, [1, 10]), Where("age", PgFilterOp.IN, [50, 60])])),
+            ]
+        )
+
+        query_criteria = SqlQueryCriteria(where=where_clause)
+        sql, params = self.translator.query_criteria_to_sql_with_params(query_criteria, self.test_table)
+
+        self.assertEqual(sql, "\nWHERE (name = %s OR name = %s)\nAND NOT (age BETWEEN %s AND %s OR age IN (%s, %s))")
+        self.assertEqual(params, ["John", "Jane", 1, 10, 50, 60])
+
+    def test_query_criteria_to_sql_group_unknown_field(self):
+        """Test unknown fields are dropped inside groups and empty groups disappear"""
+        where_clause = WhereClause(
+            [
+                Where("name", PgFilterOp.EQUAL, ["John"]),
+                OrGroup([Where("unknown_field", PgFilterOp.EQUAL, ["value"])]),
+                Not(Where("unknown_field", PgFilterOp.EQUAL, ["value"])),
+            ]
+        )
+
+        query_criteria = SqlQueryCriteria(where=where_clause)
+        result = self.translator.query_criteria_to_sql(query_criteria, self.test_table)
+
+        self.assertEqual(result, "\nWHERE name = 'John'")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import uuid
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import Aggregate, AggregateFunc, SqlQueryCriteria, Where, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_placeholders import NumberedPlaceholders
+
+
+class DocumentTable(Table):
+    id = Column("id", PgDataTypes.BIGINT)
+    owner = Column("owner", PgDataTypes.UUID)
+    code = Column("code", PgDataTypes.CHAR)
+    title = Column("title", PgDataTypes.TEXT)
+    tags = Column("tags", PgDataTypes.TEXT_ARRAY)
+    meta = Column("meta", PgDataTypes.JSONB)
+    published_at = Column("published_at", PgDataTypes.TIMESTAMPTZ)
+
+
+class TestTypedParams(unittest.TestCase):
+    def setUp(self):
+        self.documents = DocumentTable("documents")
+        self.composer = SqlComposer(PgSqlTranslator(typed_params=True), self.documents)
+
+    def where(self, *conditions: Where) -> SqlQueryCriteria:
+        return SqlQueryCriteria(where=WhereClause(list(conditions)))
+
+    def test_comparison_casts(self):
+        """Test parameters are cast to their column type, arrays and patterns by operator"""
+        owner = uuid.uuid4()
+        sql, params = self.composer.select_with_params(
+            [self.documents.id],
+            query_criteria=self.where(
+                Where("owner", PgFilterOp.EQUAL, [owner]),
+                Where("id", PgFilterOp.IN, [1, 2]),
+                Where("id", PgFilterOp.ANY, [[3, 4]]),
+                Where("tags", PgFilterOp.CONTAINS, [["a"]]),
+                Where("title", PgFilterOp.ILIKE, ["%x%"]),
+                Where("meta", PgFilterOp.JSON_HAS_ANY_KEY, [["k"]]),
+                Where("code", PgFilterOp.EQUAL, ["ab"]),
+                Where("published_at", PgFilterOp.BETWEEN, ["2024-01-01", "2024-02-01"]),
+            ),
+        )
+        self.assertEqual(
+            sql,
+            "\nSELECT\n    id\nFROM documents\nWHERE owner = %s::uuid"
+            "\nAND id IN (%s::bigint, %s::bigint)"
+            "\nAND id = ANY(%s::bigint[])"
+            "\nAND tags @> %s::text[]"
+            "\nAND title ILIKE %s::text"
+            "\nAND meta ?| %s::text[]"
+            "\nAND code = %s::bpchar"
+            "\nAND published_at BETWEEN %s::timestamptz AND %s::timestamptz\n",
+        )
+        assert isinstance(params, list)
+        self.assertEqual(params[0], owner)
+
+    def test_write_casts(self):
+        """Test inserted and assigned values are cast, with any placeholder style"""
+        sql, _ = self.composer.insert_with_params({"id": 1, "meta": {"a": 1}})
+        self.assertIn("(%s::bigint, %s::jsonb)", sql)
+
+        composer = SqlComposer(PgSqlTranslator(placeholders=NumberedPlaceholders(), typed_params=True), self.documents)
+        sql, params = composer.update_with_params({"title": "t"}, WhereClause([Where("id", PgFilterOp.EQUAL, [9])]))
+        self.assertEqual(sql, "\nUPDATE documents\nSET title = $1::text\nWHERE id = $2::bigint\n;\n")
+        self.assertEqual(params, ["t", 9])
+
+    def test_having_casts(self):
+        """Test HAVING comparands are cast only for MIN and MAX, whose result has the column's type"""
+        sql, _ = self.composer.aggregate_with_params(
+            [
+                Aggregate(AggregateFunc.AVG, self.documents.id, alias="avg_id"),
+                Aggregate(AggregateFunc.SUM, self.documents.id, alias="sum_id"),
+                Aggregate(AggregateFunc.MAX, self.documents.published_at, alias="latest"),
+            ],
+            group_by=[self.documents.owner],
+            having=WhereClause(
+                [
+                    Where("avg_id", PgFilterOp.GREATER_THAN, [1.5]),
+                    Where("sum_id", PgFilterOp.GREATER_THAN, [2**63]),
+                    Where("latest", PgFilterOp.GREATER_THAN, ["2024-01-01"]),
+                ]
+            ),
+        )
+        self.assertIn(
+            "HAVING AVG(id) > %s\nAND SUM(id) > %s\nAND MAX(published_at) > %s::timestamptz\n",
+            sql,
+        )
+
+    def test_untyped_by_default(self):
+        """Test literal SQL and the default translator are unchanged"""
+        criteria = self.where(Where("id", PgFilterOp.EQUAL, [1]))
+        sql, _ = SqlComposer(PgSqlTranslator(), self.documents).select_with_params([self.documents.id], None, criteria)
+        self.assertIn("WHERE id = %s\n", sql)
+        self.assertIn("WHERE id = 1\n", self.composer.select([self.documents.id], query_criteria=criteria))
+
+
+if __name__ == "__main__":
+    unittest.main()
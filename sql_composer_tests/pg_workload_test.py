@@ -0,0 +1,204 @@
+import unittest
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import FilterOp, OrGroup, Sort, SortType, SqlQueryCriteria, Where, WhereClause
+from sql_composer.db_metadata import PostgresIndexMetadata
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.pg.pg_workload import PgWorkloadRecorder
+from sql_composer.sql_composer import SqlComposer
+
+
+class OrderTable(Table):
+    id = Column("id", PgDataTypes.INT)
+    customer_id = Column("customer_id", PgDataTypes.INT)
+    status = Column("status", PgDataTypes.TEXT)
+    note = Column("note", PgDataTypes.TEXT)
+    tags = Column("tags", PgDataTypes.JSONB)
+    deleted_at = Column("deleted_at", PgDataTypes.TIMESTAMPTZ)
+    created_at = Column("created_at", PgDataTypes.TIMESTAMPTZ)
+
+
+def criteria(*conditions, sort=None) -> SqlQueryCriteria:
+    return SqlQueryCriteria(where=WhereClause(list(conditions)), sort=sort)
+
+
+class TestPgWorkloadRecorder(unittest.TestCase):
+    def setUp(self):
+        self.table = OrderTable("orders")
+        self.recorder = PgWorkloadRecorder(sample_rate=1.0, partial_min_samples=3)
+
+    def test_btree_equality_sort_range(self):
+        """Test composite btree columns follow equality, sort, range order and rank by frequency"""
+        for customer_id in (1, 2, 3):
+            self.recorder.record(
+                "orders",
+                criteria(
+                    Where("created_at", PgFilterOp.GREATER_THAN, ["2024-01-01"]),
+                    Where("customer_id", PgFilterOp.EQUAL, [customer_id]),
+                    sort=[Sort("id", SortType.DESC)],
+                ),
+            )
+        self.recorder.record("orders", criteria(Where("tags", PgFilterOp.JSON_CONTAINS, ['{"vip": true}'])))
+
+        candidates = self.recorder.propose_indexes()
+
+        self.assertEqual(
+            [c.ddl for c in candidates],
+            [
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS orders_customer_id_id_created_at_idx "
+                "ON orders (customer_id, id DESC, created_at)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS orders_tags_gin_idx ON orders USING gin (tags)",
+            ],
+        )
+        self.assertEqual([c.frequency for c in candidates], [3, 1])
+        self.assertEqual(candidates[0].columns, ["customer_id", "id", "created_at"])
+
+    def test_partial_and_trigram(self):
+        """Test constant predicates become partial indexes and unanchored patterns get trigram GIN"""
+        for customer_id in (1, 2, 3):
+            self.recorder.record(
+                "orders",
+                criteria(
+                    Where("status", PgFilterOp.EQUAL, ["open"]),
+                    Where("deleted_at", PgFilterOp.IS_NULL, []),
+                    Where("customer_id", PgFilterOp.EQUAL, [customer_id]),
+                    Where("note", PgFilterOp.ILIKE, ["%rush%"]),
+                ),
+            )
+
+        ddl = [c.ddl for c in self.recorder.propose_indexes()]
+
+        self.assertEqual(
+            ddl,
+            [
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS orders_customer_id_partial_e7fa9e17_idx "
+                "ON orders (customer_id) WHERE deleted_at IS NULL AND status = 'open'",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS orders_note_trgm_partial_e7fa9e17_idx "
+                "ON orders USING gin (note gin_trgm_ops) WHERE deleted_at IS NULL AND status = 'open'",
+            ],
+        )
+
+    def test_anchored_patterns_and_full_text(self):
+        """Test anchored patterns get a text_pattern_ops btree and full text search on text a to_tsvector() GIN"""
+        recorder = PgWorkloadRecorder(sample_rate=1.0, tables=[self.table], text_search_config="english")
+        recorder.record(
+            "orders",
+            criteria(Where("customer_id", PgFilterOp.EQUAL, [1]), Where("status", PgFilterOp.LIKE, ["open%"])),
+        )
+        recorder.record("orders", criteria(Where("note", PgFilterOp.FULLTEXT_MATCH, ["rush"])))
+        recorder.record("orders", criteria(Where("tags", PgFilterOp.FULLTEXT_MATCH, ["vip"])))
+
+        candidates = recorder.propose_indexes()
+
+        self.assertEqual(
+            [c.ddl for c in candidates],
+            [
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS orders_customer_id_status_pattern_idx "
+                "ON orders (customer_id, status text_pattern_ops)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS orders_note_fts_idx "
+                "ON orders USING gin (to_tsvector('english', note))",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS orders_tags_gin_idx ON orders USING gin (tags)",
+            ],
+        )
+        self.assertEqual(candidates[1].columns, ["note"])
+
+        # A btree with the default operator class doesn't serve LIKE outside the C collation
+        plain = PostgresIndexMetadata(
+            "public",
+            "orders",
+            "orders_customer_id_status_idx",
+            "",
+            columns=["customer_id", "status"],
+            opclasses=["int4_ops", "text_ops"],
+        )
+        pattern = PostgresIndexMetadata(
+            "public",
+            "orders",
+            "orders_customer_id_status_pattern_idx",
+            "",
+            columns=["customer_id", "status"],
+            opclasses=["int4_ops", "text_pattern_ops"],
+        )
+        self.assertEqual(len(recorder.propose_indexes(existing=[plain])), 3)
+        self.assertEqual(len(recorder.propose_indexes(existing=[pattern])), 2)
+
+    def test_full_text_index_matches_rendered_filter(self):
+        """Test the to_tsvector() index is proposed only with the translator's config, and its filter uses it"""
+        text_search = criteria(Where("note", PgFilterOp.FULLTEXT_MATCH, ["rush"]))
+        recorder = PgWorkloadRecorder(sample_rate=1.0, tables=[self.table])
+        recorder.record("orders", text_search)
+        self.assertEqual(recorder.propose_indexes(), [])
+
+        recorder = PgWorkloadRecorder(sample_rate=1.0, tables=[self.table], text_search_config="english")
+        composer = SqlComposer(PgSqlTranslator(text_search_config="english"), self.table, observer=recorder)
+        sql, params = composer.select_with_params([self.table.id], query_criteria=text_search)
+        [candidate] = recorder.propose_indexes()
+        expression = candidate.ddl.split("USING gin (")[1][:-1]
+        self.assertEqual(expression, "to_tsvector('english', note)")
+        self.assertIn(f"WHERE {expression} @@ %s", sql)
+        self.assertEqual(params, ["rush"])
+
+        # Columns that aren't text, e.g. tsvector ones, are filtered and indexed as they are
+        sql, _ = composer.select_with_params(
+            [self.table.id], query_criteria=criteria(Where("tags", PgFilterOp.FULLTEXT_MATCH, ["vip"]))
+        )
+        self.assertIn("WHERE tags @@ %s", sql)
+
+    def test_partial_names_differ_by_predicate(self):
+        """Test partial indexes on the same columns get names told apart by their predicate, even when truncated"""
+        names = set()
+        for table in ("orders", "order_line_items_with_a_name_long_enough_to_be_truncated"):
+            for status in ("open", "closed"):
+                recorder = PgWorkloadRecorder(sample_rate=1.0, partial_min_samples=1)
+                recorder.record(
+                    table,
+                    criteria(Where("status", PgFilterOp.EQUAL, [status]), Where("customer_id", PgFilterOp.IN, [1])),
+                )
+                [candidate] = recorder.propose_indexes()
+                name = candidate.ddl.split()[6]
+                self.assertLessEqual(len(name), 63)
+                self.assertTrue(name.endswith("_idx"))
+                names.add(name)
+        self.assertEqual(len(names), 4)
+
+    def test_existing_and_or_groups(self):
+        """Test covered candidates are skipped and OR groups don't shape composite indexes"""
+        self.recorder.record(
+            "orders",
+            criteria(
+                Where("customer_id", PgFilterOp.IN, [1, 2]),
+                OrGroup([Where("status", PgFilterOp.EQUAL, ["a"]), Where("note", PgFilterOp.EQUAL, ["b"])]),
+            ),
+        )
+        existing = PostgresIndexMetadata(
+            "public", "orders", "orders_customer_id_created_at_idx", "", columns=["customer_id", "created_at"]
+        )
+        self.assertEqual(self.recorder.propose_indexes(existing=[existing]), [])
+        self.assertEqual(len(self.recorder.propose_indexes()), 1)
+
+    def test_custom_operators_are_skipped(self):
+        """Test a shape with an operator PgFilterOp doesn't define proposes indexes for the other fields"""
+        self.recorder.record(
+            "orders",
+            criteria(
+                Where("note", FilterOp("SOUNDS_LIKE", "%"), ["rush"]), Where("customer_id", PgFilterOp.EQUAL, [1])
+            ),
+        )
+        self.assertEqual([c.columns for c in self.recorder.propose_indexes()], [["customer_id"]])
+
+    def test_sampling_observer(self):
+        """Test the recorder samples composed statements"""
+        samples = iter([0.5, 0.001])
+        recorder = PgWorkloadRecorder(sample_rate=0.01, rand=lambda: next(samples))
+        composer = SqlComposer(PgSqlTranslator(), self.table, observer=recorder)
+        query_criteria = criteria(Where("customer_id", PgFilterOp.EQUAL, [1]))
+
+        composer.select_with_params([self.table.id], query_criteria=query_criteria)
+        composer.select_with_params([self.table.id], query_criteria=query_criteria)
+
+        self.assertEqual(list(recorder.shapes().values()), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+from typing import List
+from sql_composer.db_models import Column, ColumnRef, Table
+from sql_composer.db_conditions import Join, SqlQueryCriteria, Where, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_cache import QueryCache
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_executor import SqlExecutor
+from sql_composer.sql_observer import MetricsAggregator
+from sql_composer.sql_placeholders import Params
+
+
+class CountryTable(Table):
+    code = Column("code", PgDataTypes.TEXT)
+    label = Column("label", PgDataTypes.TEXT)
+
+
+class CurrencyTable(Table):
+    country_code = Column("country_code", PgDataTypes.TEXT)
+    currency = Column("currency", PgDataTypes.TEXT)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingExecutor(SqlExecutor):
+    def __init__(self, rows: List[tuple]):
+        self.rows = rows
+        self.calls = 0
+
+    def fetch_all(self, sql: str, params: Params | None = None) -> List[tuple]:
+        self.calls += 1
+        return self.rows
+
+    def execute(self, sql: str, params: Params | None = None) -> int:
+        return 1
+
+
+class TestQueryCache(unittest.TestCase):
+    def test_ttl(self):
+        """Test entries expire after the TTL and empty results are cached too"""
+        clock = FakeClock()
+        cache = QueryCache(ttl=10, clock=clock)
+        cache.put("SELECT 1", [1], [], ["t"])
+
+        self.assertEqual(cache.get("SELECT 1", [1]), [])
+        self.assertIsNone(cache.get("SELECT 1", [2]))
+        clock.now = 10
+        self.assertIsNone(cache.get("SELECT 1", [1]))
+        self.assertEqual(cache.stats().entries, 0)
+
+    def test_lru_and_memory_bound(self):
+        """Test the least recently used entries are evicted by count and by size"""
+        cache = QueryCache(max_entries=2)
+        cache.put("a", None, [(1,)], ["t"])
+        cache.put("b", None, [(2,)], ["t"])
+        cache.get("a")
+        cache.put("c", None, [(3,)], ["t"])
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+
+        small = QueryCache(max_bytes=1000)
+        small.put("big", None, [(i,) for i in range(100)], ["t"])
+        self.assertIsNone(small.get("big"))
+        small.put("x", None, [("x" * 400,)], ["t"])
+        small.put("y", None, [("y" * 400,)], ["t"])
+        self.assertIsNone(small.get("x"))
+        self.assertEqual(small.stats().evictions, 1)
+
+    def test_unhashable_params(self):
+        """Test list and JSON params are part of the key"""
+        cache = QueryCache()
+        cache.put("q", [[1, 2], {"a": 1}], [(1,)], ["t"])
+        self.assertEqual(cache.get("q", [[1, 2], {"a": 1}]), [(1,)])
+
+    def test_rows_are_copied(self):
+        """Test modifying the rows put or got leaves the cached rows as they were"""
+        cache = QueryCache()
+        rows = [(1,)]
+        cache.put("q", None, rows, ["t"])
+        rows.append((2,))
+        got = cache.get("q")
+        assert got is not None
+        got.clear()
+        self.assertEqual(cache.get("q"), [(1,)])
+        self.assertIsNone(cache.get("q", [[1, 3], {"a": 1}]))
+        self.assertIsNone(cache.get("q", [[True, 2], {"a": 1}]))
+
+
+class TestComposerCache(unittest.TestCase):
+    def setUp(self):
+        self.countries = CountryTable("countries")
+        self.currencies = CurrencyTable("currencies")
+        self.cache = QueryCache()
+        self.executor = CountingExecutor([("NZ", "New Zealand")])
+        self.composer = SqlComposer(PgSqlTranslator(), self.countries, executor=self.executor, cache=self.cache)
+        self.criteria = SqlQueryCriteria(where=WhereClause([Where("code", PgFilterOp.EQUAL, ["NZ"])]))
+
+    def test_fetch_is_cached(self):
+        """Test repeated reads hit the cache"""
+        results = [self.composer.fetch(self.countries.columns, query_criteria=self.criteria) for _ in range(3)]
+        self.assertEqual(results[-1], [("NZ", "New Zealand")])
+        self.assertEqual(self.executor.calls, 1)
+        self.assertEqual((self.cache.stats().hits, self.cache.stats().misses), (2, 1))
+
+    def test_fetch_reports_cache_hits(self):
+        """Test the select event of a fetch tells the observer whether the cache served it"""
+        metrics = MetricsAggregator()
+        self.composer.observer = metrics
+        for _ in range(3):
+            self.composer.fetch(self.countries.columns, query_criteria=self.criteria)
+        stats = metrics.get("select", "countries")
+        assert stats is not None
+        self.assertEqual((stats.count, stats.cache_hits, stats.cache_misses), (3, 2, 1))
+
+    def test_writes_invalidate_their_table(self):
+        """Test running a write drops the cached reads of the table, including joined reads"""
+        currency_composer = SqlComposer(PgSqlTranslator(), self.currencies, executor=self.executor, cache=self.cache)
+        join = Join(
+            self.currencies,
+            "c",
+            on=[(ColumnRef("countries", self.countries.code), ColumnRef("c", self.currencies.country_code))],
+        )
+        self.composer.fetch(self.countries.columns, query_criteria=self.criteria)
+        self.composer.fetch([self.countries.label], joins=[join])
+
+        self.assertEqual(currency_composer.execute(*currency_composer.update_with_params({"currency": "NZD"})), 1)
+        self.assertEqual(self.cache.stats().entries, 1)
+
+        # A read cached after composing the write but before running it is dropped too
+        sql, params = self.composer.insert_with_params({"code": "AU", "label": "Australia"})
+        self.assertEqual(self.cache.stats().entries, 1)
+        self.composer.fetch([self.countries.label])
+        self.composer.execute(sql, params)
+        self.assertEqual(self.cache.stats().entries, 0)
+
+        self.composer.fetch(self.countries.columns, query_criteria=self.criteria)
+        self.assertEqual(self.executor.calls, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import (
+    Aggregate,
+    AggregateFunc,
+    Page,
+    Sort,
+    SortType,
+    SqlQueryCriteria,
+    Where,
+    WhereClause,
+)
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+
+
+class OrderTable(Table):
+    id = Column("id", PgDataTypes.INT)
+    customer = Column("customer", PgDataTypes.TEXT)
+    status = Column("status", PgDataTypes.TEXT)
+    total = Column("total", PgDataTypes.NUMERIC)
+
+
+class TestSqlComposerAggregate(unittest.TestCase):
+    def setUp(self):
+        self.orders = OrderTable("orders")
+        self.composer = SqlComposer(PgSqlTranslator(), self.orders)
+
+    def test_group_by_having(self):
+        """Test aggregates with GROUP BY, HAVING on an alias, sort and page"""
+        sql, params = self.composer.aggregate_with_params(
+            [
+                Aggregate(AggregateFunc.COUNT),
+                Aggregate(AggregateFunc.SUM, self.orders.total, alias="revenue"),
+            ],
+            group_by=[self.orders.customer],
+            having=WhereClause([Where("count", PgFilterOp.GREATER_THAN, [5])]),
+            query_criteria=SqlQueryCriteria(
+                where=WhereClause([Where("status", PgFilterOp.NOT_EQUAL, ["cancelled"])]),
+                sort=[Sort("revenue", SortType.DESC)],
+                page=Page(limit=10),
+            ),
+        )
+
+        self.assertEqual(
+            sql,
+            "\nSELECT\n    customer, COUNT(*) AS count, SUM(total) AS revenue\nFROM orders"
+            "\nWHERE status != %s\nGROUP BY customer\nHAVING COUNT(*) > %s"
+            "\nORDER BY revenue DESC\nLIMIT 10\n",
+        )
+        self.assertEqual(params, ["cancelled", 5])
+
+    def test_filter_clause(self):
+        """Test FILTER (WHERE ...) and DISTINCT, with params in the order they are rendered"""
+        paid = WhereClause([Where("status", PgFilterOp.EQUAL, ["paid"]), Where("total", PgFilterOp.GREATER_THAN, [0])])
+        sql, params = self.composer.aggregate_with_params(
+            [
+                Aggregate(AggregateFunc.COUNT, self.orders.customer, distinct=True),
+                Aggregate(AggregateFunc.AVG, self.orders.total, alias="paid_avg", filter=paid),
+            ],
+            having=WhereClause([Where("paid_avg", PgFilterOp.GREATER_THAN_OR_EQUAL, [20])]),
+        )
+
+        self.assertEqual(
+            sql,
+            "\nSELECT\n    COUNT(DISTINCT customer) AS count_customer, "
+            "AVG(total) FILTER (WHERE status = %s AND total > %s) AS paid_avg\nFROM orders"
+            "\nHAVING AVG(total) FILTER (WHERE status = %s AND total > %s) >= %s\n",
+        )
+        self.assertEqual(params, ["paid", 0, "paid", 0, 20])
+
+    def test_literal_aggregate(self):
+        """Test literal rendering types HAVING values from the aggregated column"""
+        sql = self.composer.aggregate(
+            [Aggregate(AggregateFunc.MAX, self.orders.total), Aggregate(AggregateFunc.COUNT)],
+            group_by=[self.orders.status],
+            having=WhereClause(
+                [Where("max_total", PgFilterOp.GREATER_THAN, [100]), Where("count", PgFilterOp.LESS_THAN, [3])]
+            ),
+        )
+
+        self.assertIn("GROUP BY status\nHAVING MAX(total) > 100\nAND COUNT(*) < '3'", sql)
+
+    def test_aggregate_validation(self):
+        """Test aggregates need a column of the table and unique output names"""
+        with self.assertRaises(ValueError):
+            self.composer.aggregate([Aggregate(AggregateFunc.SUM)])
+        with self.assertRaises(ValueError):
+            self.composer.aggregate([Aggregate(AggregateFunc.MIN, Column("other", PgDataTypes.INT))])
+        with self.assertRaises(ValueError):
+            self.composer.aggregate([Aggregate(AggregateFunc.COUNT, alias="status")], group_by=[self.orders.status])
+        with self.assertRaises(ValueError):
+            self.composer.aggregate([])
+
+
+if __name__ == "__main__":
+    unittest.main()
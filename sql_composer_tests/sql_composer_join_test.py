@@ -0,0 +1,121 @@
+import unittest
+from sql_composer.db_models import Column, ColumnRef, Table
+from sql_composer.db_conditions import Join, JoinType, Page, Sort, SortType, SqlQueryCriteria, Where, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+
+
+class UserTable(Table):
+    id = Column("id", PgDataTypes.INT)
+    username = Column("name", PgDataTypes.TEXT)
+    active = Column("active", PgDataTypes.BOOLEAN)
+
+
+class OrderTable(Table):
+    id = Column("id", PgDataTypes.INT)
+    user_id = Column("user_id", PgDataTypes.INT)
+    status = Column("status", PgDataTypes.TEXT)
+    total = Column("total", PgDataTypes.NUMERIC)
+
+
+class TestSqlComposerJoin(unittest.TestCase):
+    def setUp(self):
+        self.users = UserTable("users")
+        self.orders = OrderTable("orders")
+        self.composer = SqlComposer(PgSqlTranslator(), self.users)
+
+    def test_inner_join(self):
+        """Test an inner join with projection across tables and filters on both tables"""
+        join = Join(
+            self.orders,
+            "o",
+            on=[(ColumnRef("u", self.users.id), ColumnRef("o", self.orders.user_id))],
+            query_criteria=SqlQueryCriteria(where=WhereClause([Where("status", PgFilterOp.EQUAL, ["paid"])])),
+        )
+        criteria = SqlQueryCriteria(
+            where=WhereClause(
+                [Where("active", PgFilterOp.EQUAL, [True]), Where("o.total", PgFilterOp.GREATER_THAN, [10])]
+            ),
+            sort=[Sort("o.total", SortType.DESC)],
+        )
+
+        sql, params = self.composer.select_with_params(
+            [self.users.username, ColumnRef("o", self.orders.total)], alias="u", query_criteria=criteria, joins=[join]
+        )
+
+        self.assertEqual(
+            sql,
+            "\nSELECT\n    u.name, o.total\nFROM users AS u"
+            "\nINNER JOIN orders AS o ON u.id = o.user_id\nAND o.status = %s"
+            "\nWHERE u.active = %s\nAND o.total > %s"
+            "\nORDER BY o.total DESC\n",
+        )
+        self.assertEqual(params, ["paid", True, 10])
+
+    def test_left_lateral_join(self):
+        """Test a lateral join fetching the latest orders per user in one statement"""
+        join = Join(
+            self.orders,
+            "o",
+            on=[(ColumnRef("o", self.orders.user_id), ColumnRef("u", self.users.id))],
+            join_type=JoinType.LEFT,
+            lateral=True,
+            query_criteria=SqlQueryCriteria(
+                where=WhereClause([Where("status", PgFilterOp.IN, ["paid", "shipped"])]),
+                sort=[Sort("id", SortType.DESC)],
+                page=Page(limit=3),
+            ),
+        )
+        criteria = SqlQueryCriteria(where=WhereClause([Where("name", PgFilterOp.LIKE, ["J%"])]), page=Page(limit=10))
+
+        sql, params = self.composer.select_with_params(
+            [self.users.id, ColumnRef("o", self.orders.id)], alias="u", query_criteria=criteria, joins=[join]
+        )
+
+        self.assertIn(
+            "FROM users AS u\nLEFT JOIN LATERAL (\nSELECT\n    o.id, o.user_id, o.status, o.total\nFROM orders AS o"
+            "\nWHERE o.user_id = u.id\nAND o.status IN (%s, %s)\nORDER BY o.id DESC\nLIMIT 3\n) AS o ON TRUE"
+            "\nWHERE u.name LIKE %s\nLIMIT 10\n",
+            sql,
+        )
+        self.assertEqual(params, ["paid", "shipped", "J%"])
+
+    def test_literal_join(self):
+        """Test joins in literal mode use the joined column types"""
+        join = Join(
+            self.orders,
+            "o",
+            on=[(ColumnRef("users", self.users.id), ColumnRef("o", self.orders.user_id))],
+            join_type=JoinType.LEFT,
+        )
+        criteria = SqlQueryCriteria(where=WhereClause([Where("o.status", PgFilterOp.EQUAL, ["paid"])]))
+
+        sql = self.composer.select([self.users.id], query_criteria=criteria, joins=[join])
+
+        self.assertIn("FROM users\nLEFT JOIN orders AS o ON users.id = o.user_id\nWHERE o.status = 'paid'", sql)
+
+    def test_join_validation(self):
+        """Test unknown aliases, duplicate aliases and paging a non-lateral join are rejected"""
+        unknown = Join(self.orders, "o", on=[(ColumnRef("x", self.users.id), ColumnRef("o", self.orders.user_id))])
+        with self.assertRaises(ValueError) as context:
+            self.composer.select_with_params([self.users.id], alias="u", joins=[unknown])
+        self.assertIn("Unknown column reference: x.id", str(context.exception))
+
+        duplicate = Join(self.orders, "u", on=[(ColumnRef("u", self.users.id), ColumnRef("u", self.orders.user_id))])
+        with self.assertRaises(ValueError):
+            self.composer.select_with_params([self.users.id], alias="u", joins=[duplicate])
+
+        paged = Join(
+            self.orders,
+            "o",
+            on=[(ColumnRef("u", self.users.id), ColumnRef("o", self.orders.user_id))],
+            query_criteria=SqlQueryCriteria(page=Page(limit=1)),
+        )
+        with self.assertRaises(ValueError):
+            self.composer.select_with_params([self.users.id], alias="u", joins=[paged])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from sql_composer.db_models import Column, Table
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+
+
+class AccountTable(Table):
+    id = Column("id", PgDataTypes.UUID)
+    holder = Column("holder", PgDataTypes.TEXT)
+    balance = Column("balance", PgDataTypes.NUMERIC)
+    settings = Column("settings", PgDataTypes.JSONB)
+    created_at = Column("created_at", PgDataTypes.TIMESTAMPTZ)
+
+
+class TestSqlComposerReturning(unittest.TestCase):
+    def setUp(self):
+        self.table = AccountTable("accounts")
+        self.composer = SqlComposer(PgSqlTranslator(), self.table)
+
+    def test_insert_returning(self):
+        """Test INSERT ... RETURNING generated columns"""
+        returning = [self.table.id, self.table.created_at]
+        sql, params = self.composer.insert_with_params({"holder": "Jane"}, returning=returning)
+        self.assertEqual(sql, "\nINSERT INTO accounts\n(holder)\nVALUES\n(%s)\nRETURNING id, created_at\n;\n")
+        self.assertEqual(params, ["Jane"])
+
+    def test_update_and_delete_returning(self):
+        """Test UPDATE and DELETE with RETURNING"""
+        sql, params = self.composer.update_with_params({"balance": 10}, returning=[self.table.balance])
+        self.assertEqual(sql, "\nUPDATE accounts\nSET balance = %s\nRETURNING balance\n;\n")
+        self.assertEqual(params, [10])
+
+        self.assertEqual(self.composer.delete(returning=[self.table.id]), "\nDELETE FROM accounts\nRETURNING id\n;\n")
+        self.assertEqual(self.composer.delete(), "\nDELETE FROM accounts\n;\n")
+
+    def test_unknown_returning_column(self):
+        """Test RETURNING only accepts columns of the table"""
+        with self.assertRaises(ValueError):
+            self.composer.insert_with_params({"holder": "Jane"}, returning=[Column("other", PgDataTypes.INT)])
+
+    def test_decode_rows(self):
+        """Test returned rows are decoded by column type, leaving driver-decoded values untouched"""
+        account_id = uuid.uuid4()
+        columns = [self.table.id, self.table.balance, self.table.settings, self.table.created_at]
+        rows = [
+            (str(account_id), "12.50", '{"theme": "dark"}', "2024-01-15T10:30:00+00:00"),
+            (account_id, Decimal("1"), {"theme": "light"}, None),
+        ]
+
+        decoded = self.composer.decode_rows(rows, columns)
+
+        self.assertEqual(
+            decoded[0],
+            {
+                "id": account_id,
+                "balance": Decimal("12.50"),
+                "settings": {"theme": "dark"},
+                "created_at": datetime.fromisoformat("2024-01-15T10:30:00+00:00"),
+            },
+        )
+        self.assertEqual(
+            decoded[1], {"id": account_id, "balance": Decimal("1"), "settings": {"theme": "light"}, "created_at": None}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import OrGroup, RowIn, SqlQueryCriteria, Where, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_fingerprint import criteria_shape
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+
+
+class AccountTable(Table):
+    tenant_id = Column("tenant_id", PgDataTypes.BIGINT)
+    external_id = Column("external_id", PgDataTypes.TEXT)
+    balance = Column("balance", PgDataTypes.NUMERIC)
+
+
+class TestRowIn(unittest.TestCase):
+    def setUp(self):
+        self.accounts = AccountTable("accounts")
+        self.composer = SqlComposer(PgSqlTranslator(), self.accounts)
+        self.keys = RowIn(["tenant_id", "external_id"], [(1, "a"), (2, "b'c")])
+
+    def criteria(self, *conditions) -> SqlQueryCriteria:
+        return SqlQueryCriteria(where=WhereClause(list(conditions)))
+
+    def test_row_values(self):
+        """Test a RowIn renders a parameterized row-value IN list, and literal SQL escapes the values"""
+        positive = Where("balance", PgFilterOp.GREATER_THAN, [0])
+        sql, params = self.composer.select_with_params(
+            [self.accounts.balance], query_criteria=self.criteria(positive, self.keys)
+        )
+        self.assertIn("WHERE balance > %s\nAND (tenant_id, external_id) IN ((%s, %s), (%s, %s))", sql)
+        self.assertEqual(params, [0, 1, "a", 2, "b'c"])
+
+        sql = self.composer.select([self.accounts.balance], query_criteria=self.criteria(self.keys))
+        self.assertIn("WHERE (tenant_id, external_id) IN ((1, 'a'), (2, 'b''c'))", sql)
+
+    def test_nested_and_typed(self):
+        """Test a RowIn nests inside groups and casts each value to its column type in typed-params mode"""
+        composer = SqlComposer(PgSqlTranslator(typed_params=True), self.accounts)
+        either = OrGroup([RowIn(["tenant_id", "external_id"], [(1, "a")]), Where("balance", PgFilterOp.IS_NULL, [])])
+        sql, params = composer.select_with_params(
+            [self.accounts.balance],
+            query_criteria=self.criteria(Where("tenant_id", PgFilterOp.GREATER_THAN, [0]), either),
+        )
+        self.assertIn("AND ((tenant_id, external_id) IN ((%s::bigint, %s::text)) OR balance IS NULL)", sql)
+        self.assertEqual(params, [0, 1, "a"])
+
+    def test_unnest_above_threshold(self):
+        """Test large batches bind one typed array per field, zipped back into rows by unnest()"""
+        composer = SqlComposer(PgSqlTranslator(row_in_unnest_threshold=1), self.accounts)
+        sql, params = composer.select_with_params([self.accounts.balance], query_criteria=self.criteria(self.keys))
+        self.assertIn("WHERE (tenant_id, external_id) IN (SELECT * FROM unnest(%s::bigint[], %s::text[]))", sql)
+        self.assertEqual(params, [[1, 2], ["a", "b'c"]])
+
+    def test_writes(self):
+        """Test updates and deletes address rows by composite key"""
+        where = WhereClause([self.keys])
+        sql, params = self.composer.delete_with_params(where)
+        self.assertEqual(sql, "\nDELETE FROM accounts\nWHERE (tenant_id, external_id) IN ((%s, %s), (%s, %s))\n;\n")
+        self.assertEqual(params, [1, "a", 2, "b'c"])
+        sql, params = self.composer.update_with_params({"balance": 0}, where)
+        self.assertEqual(params, [0, 1, "a", 2, "b'c"])
+
+    def test_validation(self):
+        """Test unknown or duplicate fields and rows of the wrong length raise instead of being dropped"""
+        invalid = [
+            RowIn(["tenant_id", "missing"], [(1, 2)]),
+            RowIn(["tenant_id", "tenant_id"], [(1, 2)]),
+            RowIn([], []),
+            RowIn(["tenant_id", "external_id"], [(1,)]),
+        ]
+        for row_in in invalid:
+            with self.assertRaises(ValueError):
+                self.composer.select_with_params([self.accounts.balance], query_criteria=self.criteria(row_in))
+
+    def test_empty_never_matches(self):
+        """Test a RowIn without rows renders FALSE or, simplified, always false, and its shape names the fields"""
+        sql, params = self.composer.select_with_params(
+            [self.accounts.balance], query_criteria=self.criteria(RowIn(["tenant_id"], []))
+        )
+        self.assertIn("WHERE FALSE", sql)
+        self.assertEqual(params, [])
+        composer = SqlComposer(PgSqlTranslator(simplify_predicates=True), self.accounts)
+        self.assertTrue(composer.never_matches(self.criteria(RowIn(["tenant_id", "external_id"], []))))
+        self.assertEqual(criteria_shape(self.criteria(self.keys)), "where=[(tenant_id,external_id):ROW_IN]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import AndGroup, OrGroup, Where, WhereClause, Sort, SortType, Page, SqlQueryCriteria
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_ir import AndNode, ComparisonNode, NotNode, OrNode, Param, SelectNode, UpdateNode
+
+
+class MockTable(Table):
+    id = Column("id", PgDataTypes.INT)
+    username = Column("name", PgDataTypes.TEXT)
+    age = Column("age", PgDataTypes.INT)
+
+
+class TestSqlIr(unittest.TestCase):
+    def setUp(self):
+        self.table = MockTable("users")
+        self.translator = PgSqlTranslator()
+        self.composer = SqlComposer(self.translator, self.table)
+
+    def test_build_select(self):
+        """Test build_select lowers criteria and drops unknown fields"""
+        criteria = SqlQueryCriteria(
+            where=WhereClause([Where("name", PgFilterOp.EQUAL, ["John"]), Where("unknown", PgFilterOp.EQUAL, [1])]),
+            sort=[Sort("age", SortType.DESC), Sort("unknown", SortType.ASC)],
+            page=Page(limit=5),
+        )
+        node = self.composer.build_select([self.table.id], query_criteria=criteria)
+
+        self.assertIsInstance(node, SelectNode)
+        expected_where = AndNode([ComparisonNode("name", PgFilterOp.EQUAL, [Param("John", self.table.username)])])
+        self.assertEqual(node.where, expected_where)
+        self.assertEqual(node.sort, [Sort("age", SortType.DESC)])
+        self.assertEqual(node.page, Page(limit=5))
+
+    def test_render_select(self):
+        """Test rendering a select node in literal and parameterized mode"""
+        criteria = SqlQueryCriteria(
+            where=WhereClause([Where("name", PgFilterOp.EQUAL, ["John"]), Where("age", PgFilterOp.IN, [1, 2])]),
+            sort=[Sort("name", SortType.ASC), Sort("age", SortType.DESC)],
+            page=Page(limit=10, offset=20),
+        )
+        node = self.composer.build_select([self.table.id, self.table.username], query_criteria=criteria)
+
+        sql, params = self.translator.render(node)
+        self.assertEqual(
+            sql,
+            "\nSELECT\n    id, name\nFROM users\nWHERE name = 'John'\nAND age IN (1, 2)\n"
+            "ORDER BY name ASC, age DESC\nLIMIT 10 OFFSET 20\n",
+        )
+        self.assertEqual(params, [])
+
+        sql, params = self.translator.render(node, parameterized=True)
+        self.assertIn("WHERE name = %s\nAND age IN (%s, %s)", sql)
+        self.assertEqual(params, ["John", 1, 2])
+
+    def test_render_predicate_tree(self):
+        """Test nested predicate nodes are parenthesized and parameters stay in order"""
+        where = AndNode(
+            [
+                ComparisonNode("age", PgFilterOp.GREATER_THAN, [Param(18, self.table.age)]),
+                OrNode(
+                    [
+                        ComparisonNode("name", PgFilterOp.EQUAL, [Param("John", self.table.username)]),
+                        NotNode(
+                            ComparisonNode("id", PgFilterOp.IN, [Param(1, self.table.id), Param(2, self.table.id)])
+                        ),
+                    ]
+                ),
+            ]
+        )
+        node = SelectNode(table=self.table, columns=[self.table.id], where=where)
+
+        sql, params = self.translator.render(node, parameterized=True)
+        self.assertIn("WHERE age > %s\nAND (name = %s OR NOT (id IN (%s, %s)))", sql)
+        self.assertEqual(params, [18, "John", 1, 2])
+
+        sql, _ = self.translator.render(node)
+        self.assertIn("WHERE age > 18\nAND (name = 'John' OR NOT (id IN (1, 2)))", sql)
+
+    def test_empty_groups(self):
+        """Test an empty OR group matches nothing and an empty AND group everything, rather than being dropped"""
+        nothing = WhereClause([OrGroup([])])
+        sql = self.composer.select([self.table.id], query_criteria=SqlQueryCriteria(where=nothing))
+        self.assertIn("FROM users\nWHERE FALSE", sql)
+        self.assertEqual(self.composer.delete(nothing), "\nDELETE FROM users\nWHERE FALSE\n;\n")
+
+        everything = SqlQueryCriteria(where=WhereClause([Where("age", PgFilterOp.GREATER_THAN, [18]), AndGroup([])]))
+        self.assertIn("WHERE age > 18\nAND TRUE", self.composer.select([self.table.id], query_criteria=everything))
+
+    def test_reuse_predicate_across_statements(self):
+        """Test one predicate tree rendered into a select and an update"""
+        where = ComparisonNode("id", PgFilterOp.EQUAL, [Param(7, self.table.id)])
+        update = self.composer.build_update({"age": 30})
+        update = UpdateNode(table=update.table, assignments=update.assignments, where=where)
+        select = SelectNode(table=self.table, columns=[self.table.age], where=where)
+
+        self.assertEqual(
+            self.translator.render(update, parameterized=True),
+            ("\nUPDATE users\nSET age = %s\nWHERE id = %s\n;\n", [30, 7]),
+        )
+        self.assertEqual(self.translator.render(select, parameterized=True)[1], [7])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from typing import Any
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import SqlQueryCriteria, Where, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_json import OrjsonCodec, StdlibJsonCodec, fastest_json_codec
+
+
+class EventTable(Table):
+    id = Column("id", PgDataTypes.BIGINT)
+    payload = Column("payload", PgDataTypes.JSONB)
+
+
+class CountingCodec(StdlibJsonCodec):
+    def __init__(self):
+        self.calls = {"dumps": 0, "loads": 0}
+
+    def dumps(self, value: Any) -> str:
+        self.calls["dumps"] += 1
+        return super().dumps(value)
+
+    def loads(self, text) -> Any:
+        self.calls["loads"] += 1
+        return super().loads(text)
+
+
+class TestJsonCodecs(unittest.TestCase):
+    def test_codecs(self):
+        """Test both codecs read str and bytes and reject invalid JSON with ValueError"""
+        for codec in (StdlibJsonCodec(), OrjsonCodec()):
+            self.assertEqual(codec.loads(b'{"a": [1, 2]}'), {"a": [1, 2]})
+            self.assertEqual(codec.loads(memoryview(b"[1]")), [1])
+            self.assertEqual(codec.loads(codec.dumps({"a": "é", 1: None})), {"a": "é", "1": None})
+            with self.assertRaises(ValueError):
+                codec.validate("{")
+        self.assertIsInstance(fastest_json_codec(), OrjsonCodec)
+
+
+class TestTranslatorJson(unittest.TestCase):
+    def setUp(self):
+        self.events = EventTable("events")
+        self.codec = CountingCodec()
+
+    def composer(self, **kwargs) -> SqlComposer:
+        return SqlComposer(PgSqlTranslator(json_codec=self.codec, **kwargs), self.events)
+
+    def test_literal_json(self):
+        """Test strings are validated once, skipped when trusted, and bytes are inlined without re-encoding"""
+        sql = self.composer().insert({"id": 1, "payload": '{"kind": "click"}'})
+        self.assertIn("""'{"kind": "click"}'""", sql)
+        self.assertEqual(self.codec.calls, {"dumps": 0, "loads": 1})
+
+        self.composer(validate_json=False).insert({"id": 1, "payload": b'{"kind": "view"}'})
+        self.assertEqual(self.codec.calls, {"dumps": 0, "loads": 1})
+
+        with self.assertRaises(ValueError):
+            self.composer().insert({"id": 1, "payload": b"{"})
+
+        self.assertIn("""'{"n": 1}'""", self.composer().insert({"id": 1, "payload": {"n": 1}}))
+        self.assertEqual(self.codec.calls["dumps"], 1)
+
+    def test_parameterized_json(self):
+        """Test JSON operands are bound as text encoded once, while key operands stay as they are"""
+        sql, params = self.composer(typed_params=True).update_with_params(
+            {"payload": {"kind": "click"}},
+            WhereClause(
+                [
+                    Where("payload", PgFilterOp.JSON_CONTAINS, [{"v": 2}]),
+                    Where("payload", PgFilterOp.JSON_HAS_ANY_KEY, [["kind", "v"]]),
+                ]
+            ),
+        )
+        self.assertEqual(
+            sql, "\nUPDATE events\nSET payload = %s::jsonb\nWHERE payload @> %s::jsonb\nAND payload ?| %s::text[]\n;\n"
+        )
+        self.assertEqual(params, ['{"kind": "click"}', '{"v": 2}', ["kind", "v"]])
+        self.assertEqual(self.codec.calls, {"dumps": 2, "loads": 0})
+
+        _, params = self.composer().insert_with_params({"id": 1, "payload": bytearray(b"[1]")})
+        self.assertEqual(params, [1, "[1]"])
+        _, params = self.composer().select_with_params(
+            [self.events.id],
+            query_criteria=SqlQueryCriteria(where=WhereClause([Where("payload", PgFilterOp.IS_DISTINCT_FROM, [None])])),
+        )
+        self.assertEqual(params, [None])
+
+    def test_decode(self):
+        """Test rows are decoded with the codec"""
+        rows = self.composer().decode_rows([("1", '{"a": 1}')], [self.events.id, self.events.payload])
+        self.assertEqual(rows, [{"id": 1, "payload": {"a": 1}}])
+        self.assertEqual(self.codec.calls["loads"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
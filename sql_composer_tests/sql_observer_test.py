@@ -0,0 +1,137 @@
+import unittest
+from typing import List
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import Where, WhereClause, SqlQueryCriteria
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_observer import ComposeEvent, MetricsAggregator, SqlObserver, observed
+from sql_composer.sql_translator import SqlTranslator
+
+
+class MockTable(Table):
+    id = Column("id", PgDataTypes.INT)
+    username = Column("name", PgDataTypes.TEXT)
+
+
+class RecordingObserver(SqlObserver):
+    def __init__(self):
+        self.events: List[ComposeEvent] = []
+
+    def on_compose(self, event: ComposeEvent) -> None:
+        self.events.append(event)
+
+
+class LegacyTranslator(SqlTranslator):
+    """A translator written before observers and placeholder styles, with an __init__ not calling super()"""
+
+    def __init__(self, quote: str = "'"):
+        self.quote = quote
+
+    def val_to_sql(self, column, value):
+        return f"{self.quote}{value}{self.quote}"
+
+    def where_to_sql(self, where, column):
+        return f"{where.field} = {self.val_to_sql(column, where.values[0])}"
+
+    def sort_to_sql(self, sort):
+        return f"{sort.field} {sort.sort_type.value}"
+
+    def page_criteria_to_sql(self, pagination):
+        return f"LIMIT {pagination.limit}"
+
+    @observed("criteria")
+    def query_criteria_to_sql(self, query_criteria, table):
+        return "WHERE TRUE"
+
+    @observed("criteria")
+    def query_criteria_to_sql_with_params(self, query_criteria, table):
+        return "WHERE TRUE", self.placeholders.bind([])
+
+
+class TestSqlObserver(unittest.TestCase):
+    def setUp(self):
+        self.table = MockTable("users")
+        self.criteria = SqlQueryCriteria(where=WhereClause([Where("id", PgFilterOp.IN, [1, 2, 3])]))
+
+    def test_no_observer(self):
+        """Test composing without an observer attached"""
+        composer = SqlComposer(PgSqlTranslator(), self.table)
+        sql, params = composer.select_with_params(self.table.columns, query_criteria=self.criteria)
+        self.assertIn("id IN (%s, %s, %s)", sql)
+        self.assertEqual(params, [1, 2, 3])
+
+    def test_translator_without_super_init(self):
+        """Test translator subclasses not calling SqlTranslator.__init__() get the default observer and placeholders"""
+        translator = LegacyTranslator()
+        self.assertEqual(translator.query_criteria_to_sql(self.criteria, self.table), "WHERE TRUE")
+        self.assertEqual(translator.query_criteria_to_sql_with_params(self.criteria, self.table), ("WHERE TRUE", []))
+
+        translator.observer = RecordingObserver()
+        translator.query_criteria_to_sql(self.criteria, self.table)
+        self.assertEqual([e.kind for e in translator.observer.events], ["criteria"])
+        self.assertIsNone(LegacyTranslator().observer)
+
+    def test_composer_reports_events(self):
+        """Test SqlComposer reports kind, table, parameter count and SQL size"""
+        observer = RecordingObserver()
+        composer = SqlComposer(PgSqlTranslator(), self.table, observer=observer)
+
+        sql, _ = composer.select_with_params(self.table.columns, query_criteria=self.criteria)
+        composer.delete()
+
+        self.assertEqual([e.kind for e in observer.events], ["select", "delete"])
+        select_event = observer.events[0]
+        self.assertEqual(select_event.table, "users")
+        self.assertEqual(select_event.param_count, 3)
+        self.assertEqual(select_event.sql_bytes, len(sql.encode("utf-8")))
+        self.assertTrue(select_event.parameterized)
+        self.assertFalse(observer.events[1].parameterized)
+        self.assertIsNone(select_event.cache_hit)
+
+    def test_translator_reports_events(self):
+        """Test PgSqlTranslator reports criteria compositions with the table passed in"""
+        observer = RecordingObserver()
+        translator = PgSqlTranslator(observer=observer)
+
+        translator.query_criteria_to_sql_with_params(self.criteria, self.table)
+
+        self.assertEqual(len(observer.events), 1)
+        self.assertEqual(observer.events[0].kind, "criteria")
+        self.assertEqual(observer.events[0].table, "users")
+
+    def test_metrics_aggregator(self):
+        """Test MetricsAggregator counters, histogram and cache results"""
+        aggregator = MetricsAggregator(buckets=(0.001, 0.01))
+        aggregator.on_compose(ComposeEvent("select", "users", 0.0005, 2, 40, True, cache_hit=True))
+        aggregator.on_compose(ComposeEvent("select", "users", 0.005, 1, 30, True, cache_hit=False))
+        aggregator.on_compose(ComposeEvent("select", "users", 0.5, 0, 20, False))
+
+        stats = aggregator.get("select", "users")
+        assert stats is not None
+        self.assertEqual(stats.count, 3)
+        self.assertEqual(stats.bucket_counts, [1, 1, 1])
+        self.assertEqual(stats.param_count, 3)
+        self.assertEqual(stats.sql_bytes, 90)
+        self.assertEqual((stats.cache_hits, stats.cache_misses), (1, 1))
+        self.assertIsNone(aggregator.get("insert", "users"))
+
+    def test_metrics_aggregator_prometheus_export(self):
+        """Test Prometheus text export of aggregated metrics"""
+        aggregator = MetricsAggregator(buckets=(0.001, 0.01))
+        composer = SqlComposer(PgSqlTranslator(), self.table, observer=aggregator)
+        composer.insert_with_params({"id": 1, "name": "John"})
+
+        text = aggregator.to_prometheus()
+
+        self.assertIn("# TYPE sql_composer_compose_total counter", text)
+        self.assertIn('sql_composer_compose_total{kind="insert",table="users"} 1', text)
+        self.assertIn('sql_composer_compose_seconds_bucket{kind="insert",table="users",le="+Inf"} 1', text)
+        self.assertIn('sql_composer_compose_seconds_count{kind="insert",table="users"} 1', text)
+        self.assertIn('sql_composer_params_total{kind="insert",table="users"} 2', text)
+        self.assertIn('sql_composer_cache_requests_total{kind="insert",table="users",result="miss"} 0', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import Aggregate, AggregateFunc, SqlQueryCriteria, Where, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_placeholders import NamedPlaceholders, NumberedPlaceholders, QmarkPlaceholders
+
+
+class OrderTable(Table):
+    id = Column("id", PgDataTypes.INT)
+    status = Column("status", PgDataTypes.TEXT)
+    total = Column("total", PgDataTypes.NUMERIC)
+
+
+class TestPlaceholders(unittest.TestCase):
+    def setUp(self):
+        self.orders = OrderTable("orders")
+        self.criteria = SqlQueryCriteria(
+            where=WhereClause(
+                [Where("status", PgFilterOp.IN, ["paid", "shipped"]), Where("total", PgFilterOp.BETWEEN, [10, 20])]
+            )
+        )
+
+    def composer(self, placeholders) -> SqlComposer:
+        return SqlComposer(PgSqlTranslator(placeholders=placeholders), self.orders)
+
+    def test_numbered(self):
+        """Test $n placeholders count across the whole statement, HAVING expressions included"""
+        composer = self.composer(NumberedPlaceholders())
+        sql, params = composer.select_with_params([self.orders.id], query_criteria=self.criteria)
+        self.assertEqual(sql, "\nSELECT\n    id\nFROM orders\nWHERE status IN ($1, $2)\nAND total BETWEEN $3 AND $4\n")
+        self.assertEqual(params, ["paid", "shipped", 10, 20])
+
+        paid = WhereClause([Where("status", PgFilterOp.EQUAL, ["paid"])])
+        sql, params = composer.aggregate_with_params(
+            [Aggregate(AggregateFunc.SUM, self.orders.total, alias="paid_total", filter=paid)],
+            group_by=[self.orders.status],
+            having=WhereClause([Where("paid_total", PgFilterOp.GREATER_THAN, [100])]),
+            query_criteria=SqlQueryCriteria(where=WhereClause([Where("id", PgFilterOp.GREATER_THAN, [0])])),
+        )
+        self.assertEqual(
+            sql,
+            "\nSELECT\n    status, SUM(total) FILTER (WHERE status = $1) AS paid_total\nFROM orders"
+            "\nWHERE id > $2\nGROUP BY status\nHAVING SUM(total) FILTER (WHERE status = $3) > $4\n",
+        )
+        self.assertEqual(params, ["paid", 0, "paid", 100])
+
+        sql, params = composer.update_with_params(
+            {"status": "void"}, WhereClause([Where("id", PgFilterOp.EQUAL, [7])]), returning=[self.orders.id]
+        )
+        self.assertEqual(sql, "\nUPDATE orders\nSET status = $1\nWHERE id = $2\nRETURNING id\n;\n")
+        self.assertEqual(params, ["void", 7])
+
+    def test_named(self):
+        """Test named placeholders come with the parameters as a dict"""
+        composer = self.composer(NamedPlaceholders())
+        sql, params = composer.insert_with_params({"id": 1, "status": "new"})
+        self.assertEqual(sql, "\nINSERT INTO orders\n(id,status)\nVALUES\n(%(p1)s, %(p2)s)\n;\n")
+        self.assertEqual(params, {"p1": 1, "p2": "new"})
+        self.assertEqual(composer.translator.query_criteria_to_sql_with_params(None, self.orders), ("", {}))
+
+    def test_qmark(self):
+        """Test qmark placeholders, and that literal rendering is unaffected"""
+        composer = self.composer(QmarkPlaceholders())
+        sql, params = composer.delete_with_params(WhereClause([Where("id", PgFilterOp.IN, [1, 2])]))
+        self.assertEqual(sql, "\nDELETE FROM orders\nWHERE id IN (?, ?)\n;\n")
+        self.assertEqual(params, [1, 2])
+        self.assertIn("WHERE id IN (1, 2)", composer.delete(WhereClause([Where("id", PgFilterOp.IN, [1, 2])])))
+
+    def test_format(self):
+        """Test hand-written helper queries get the markers and bound parameters of the style"""
+        sql = "SELECT reltuples FROM pg_class WHERE relname = {} AND relkind = {}"
+        self.assertEqual(
+            NumberedPlaceholders().format(sql, ["orders", "r"]),
+            ("SELECT reltuples FROM pg_class WHERE relname = $1 AND relkind = $2", ["orders", "r"]),
+        )
+        self.assertEqual(
+            NamedPlaceholders().format(sql, ["orders", "r"]),
+            ("SELECT reltuples FROM pg_class WHERE relname = %(p1)s AND relkind = %(p2)s", {"p1": "orders", "p2": "r"}),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
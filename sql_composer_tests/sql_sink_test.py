@@ -0,0 +1,138 @@
+import io
+import unittest
+from typing import Iterator, List
+from sql_composer.db_models import Column, Table
+from sql_composer.db_conditions import Where, WhereClause
+from sql_composer.pg.pg_data_types import PgDataTypes
+from sql_composer.pg.pg_filter_op import PgFilterOp
+from sql_composer.pg.pg_translator import PgSqlTranslator
+from sql_composer.sql_composer import SqlComposer
+from sql_composer.sql_observer import ComposeEvent, SqlObserver
+from sql_composer.sql_sink import SqlSink
+
+
+class SeedTable(Table):
+    id = Column("id", PgDataTypes.BIGINT)
+    label = Column("label", PgDataTypes.TEXT)
+
+
+class RecordingSink:
+    """A writable taking bytes, like `socket.makefile("wb")`, that records each write"""
+
+    def __init__(self):
+        self.writes: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        if not isinstance(data, bytes):
+            raise TypeError("a bytes-like object is required")
+        self.writes.append(data)
+        return len(data)
+
+
+class RecordingObserver(SqlObserver):
+    def __init__(self):
+        self.events: List[ComposeEvent] = []
+
+    def on_compose(self, event: ComposeEvent) -> None:
+        self.events.append(event)
+
+
+class TestSqlSink(unittest.TestCase):
+    def test_text_and_binary_targets(self):
+        """Test text targets are written str and binary targets the encoded text"""
+        text, binary, recording = io.StringIO(), io.BytesIO(), RecordingSink()
+        for target in (text, binary, recording):
+            sink = SqlSink(target)
+            sink.write("'é'")
+            sink.write("")
+            sink.write(";")
+        self.assertEqual(text.getvalue(), "'é';")
+        self.assertEqual(binary.getvalue(), "'é';".encode("utf-8"))
+        self.assertEqual(recording.writes, ["'é'".encode("utf-8"), b";"])
+
+        with self.assertRaises(ValueError):
+            SqlSink(object())
+
+
+class TestRenderTo(unittest.TestCase):
+    def setUp(self):
+        self.seeds = SeedTable("seeds")
+        self.composer = SqlComposer(PgSqlTranslator(), self.seeds)
+
+    def test_insert_and_update_match_render(self):
+        """Test streamed statements are the same SQL the string variants return"""
+        out = io.StringIO()
+        self.composer.insert_to(out, {"id": 1, "label": "a"}, returning=[self.seeds.id])
+        self.assertEqual(out.getvalue(), self.composer.insert({"id": 1, "label": "a"}, returning=[self.seeds.id]))
+
+        where = WhereClause([Where("id", PgFilterOp.EQUAL, [1])])
+        out = io.BytesIO()
+        self.composer.update_to(out, {"label": "b"}, where)
+        self.assertEqual(out.getvalue().decode("utf-8"), self.composer.update({"label": "b"}, where))
+
+        out = io.StringIO()
+        self.composer.update_to(out, {}, where)
+        self.assertEqual(out.getvalue(), "")
+
+    def test_insert_many_streams_rows(self):
+        """Test a multi-row INSERT is written row by row while the rows are generated"""
+        consumed: List[int] = []
+        sink = RecordingSink()
+
+        def rows() -> Iterator[dict]:
+            for i in range(3):
+                # The previous row must already be written when the next one is generated
+                self.assertEqual(len(sink.writes), i)
+                consumed.append(i)
+                yield {"id": i, "label": f"row {i}"}
+
+        self.composer.insert_many_to(sink, rows())
+        self.assertEqual(consumed, [0, 1, 2])
+        self.assertEqual(
+            b"".join(sink.writes).decode("utf-8"),
+            "\nINSERT INTO seeds\n(id,label)\nVALUES\n(0, 'row 0'),\n(1, 'row 1'),\n(2, 'row 2')\n;\n",
+        )
+        rows_sql = self.composer.insert_many({"id": i, "label": f"row {i}"} for i in range(3))
+        self.assertEqual(b"".join(sink.writes).decode("utf-8"), rows_sql)
+
+    def test_streamed_statements_are_observed(self):
+        """Test streamed statements report their kind with empty SQL, and a rejected row leaves a truncated INSERT"""
+        observer = RecordingObserver()
+        composer = SqlComposer(PgSqlTranslator(), self.seeds, observer=observer)
+        out = io.StringIO()
+        composer.insert_to(out, {"id": 1, "label": "a"})
+        composer.insert_many_to(out, [{"id": 2, "label": "b"}])
+        composer.update_to(out, {"label": "c"})
+        self.assertEqual(
+            [(e.kind, e.table, e.sql, e.sql_bytes) for e in observer.events],
+            [
+                ("insert", "seeds", "", 0),
+                ("insert", "seeds", "", 0),
+                ("update", "seeds", "", 0),
+            ],
+        )
+
+        out = io.StringIO()
+        with self.assertRaises(ValueError):
+            composer.insert_many_to(out, [{"id": 1, "label": "a"}, {"id": 2}])
+        self.assertEqual(out.getvalue(), "\nINSERT INTO seeds\n(id,label)\nVALUES\n(1, 'a')")
+        self.assertEqual(len(observer.events), 3)
+
+    def test_insert_many_with_params(self):
+        """Test the parameterized multi-row INSERT binds every row's values in order"""
+        sql, params = self.composer.insert_many_with_params([{"id": 1, "label": "a"}, {"label": "b", "id": 2}])
+        self.assertEqual(sql, "\nINSERT INTO seeds\n(id,label)\nVALUES\n(%s, %s),\n(%s, %s)\n;\n")
+        self.assertEqual(params, [1, "a", 2, "b"])
+
+    def test_insert_many_rejects_mismatched_rows(self):
+        """Test rows must set the columns of the first row, and there must be a row"""
+        with self.assertRaises(ValueError):
+            self.composer.insert_many([])
+        with self.assertRaises(ValueError):
+            self.composer.insert_many([{"id": 1, "label": "a"}, {"id": 2}])
+        with self.assertRaises(ValueError):
+            self.composer.insert_many([{"id": 1}, {"id": 2, "label": "b"}])
+
+
+if __name__ == "__main__":
+    unittest.main()